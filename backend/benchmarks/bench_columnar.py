@@ -0,0 +1,109 @@
+"""
+Row vs columnar (?format=columnar) payloads for the dashboard and summary.
+
+For each history length this builds the dashboard (window = --window days)
+and the daily summary for a synthetic user, then times what happens after
+the handler has its data: the columnar conversion (for "columnar"), the
+route's response-model serialization and orjson rendering. It reports the
+median time and the body size, raw and gzip-compressed as the compression
+middleware would send it.
+
+Usage:
+    python -m backend.benchmarks.bench_columnar
+    python -m backend.benchmarks.bench_columnar --histories 365 3650 --window 365 --repeat 20
+"""
+
+import logging
+from backend.benchmarks import fake_supabase
+
+client = fake_supabase.install()
+
+# The services log every query at INFO
+logging.disable(logging.INFO)
+
+import argparse
+import asyncio
+import gzip
+import statistics
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+from fastapi.routing import serialize_response
+
+from backend.benchmarks.bench_dashboard import seed_history
+from backend.benchmarks.bench_serialization import route_for, response_class_for, DEFAULT_HISTORIES
+from backend.middleware.compression import GZIP_LEVEL
+from backend.services import columnar
+from backend.services.rollup_service import rollup_service
+from backend.services.dashboard_context import load_dashboard_context
+from backend.routers import emotions as emotions_router
+
+# Route path -> columnar conversion of the handler's row payload
+ENDPOINTS: Dict[str, Callable[[Any], Any]] = {
+    "/emotions/dashboard/{user_id}": columnar.columnar_dashboard,
+    "/emotions/summary/{user_id}": columnar.columnar_rollups
+}
+
+async def time_render(route, payload: Any, convert: Optional[Callable[[Any], Any]], repeat: int) -> Dict[str, Any]:
+    """Median conversion + serialization + rendering time and the body size"""
+    response_class = response_class_for(route)
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = convert(payload) if convert else payload
+        content = await serialize_response(field=route.response_field, response_content=content)
+        body = response_class(content).body
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "bytes": len(body),
+        "gzip_bytes": len(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    }
+
+async def bench_history(days: int, window: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    user_id = f"BENCH{days}"
+    client.clear()
+    seed_history(user_id, days)
+    ctx = await load_dashboard_context(user_id, window)
+    payloads = {
+        "/emotions/dashboard/{user_id}": await emotions_router.build_dashboard(ctx),
+        "/emotions/summary/{user_id}": rollup_service.get_rollups_by_user(user_id, projection="full")
+    }
+
+    results = {}
+    for path, convert in ENDPOINTS.items():
+        route = route_for(path)
+        results[path] = {
+            "rows": await time_render(route, payloads[path], None, repeat),
+            "columnar": await time_render(route, payloads[path], convert, repeat)
+        }
+    return results
+
+def print_table(all_results: Dict[int, Dict[str, Dict[str, Any]]]):
+    header = f"{'history':>8}  {'endpoint':<30} {'format':<9} {'ms':>8} {'KiB':>8} {'gzip KiB':>9} {'size':>6}"
+    print(header)
+    print("-" * len(header))
+    for days, endpoints in all_results.items():
+        for path, formats in endpoints.items():
+            row_bytes = formats["rows"]["bytes"]
+            for name, r in formats.items():
+                print(
+                    f"{days:>8}  {path:<30} {name:<9} {r['median_ms']:>8.2f} {r['bytes'] / 1024:>8.1f} "
+                    f"{r['gzip_bytes'] / 1024:>9.1f} {r['bytes'] / row_bytes:>5.0%}"
+                )
+        print()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare row and columnar dashboard/summary payloads")
+    parser.add_argument("--histories", type=int, nargs="+", default=DEFAULT_HISTORIES, help="history lengths in days")
+    parser.add_argument("--window", type=int, default=365, help="dashboard window in days")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per endpoint and format")
+    args = parser.parse_args(argv)
+
+    all_results = {days: asyncio.run(bench_history(days, args.window, args.repeat)) for days in args.histories}
+    print(f"Columnar payload benchmark: dashboard window={args.window} days, repeat={args.repeat}\n")
+    print_table(all_results)
+
+if __name__ == "__main__":
+    main()
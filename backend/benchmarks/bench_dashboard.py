@@ -0,0 +1,181 @@
+"""
+Dashboard micro-benchmarks over synthetic histories.
+
+Runs the dashboard path from routers/emotions.py against an in-memory
+Supabase stand-in and reports, per history length and section, the median
+and p95 latency, the peak traced allocation and the number of rows involved.
+No network or credentials are needed.
+
+The stand-in filters by scanning its tables, so "fetch" latency grows with
+history length even for range-limited queries; the "rows" column is what
+the real database would transfer.
+
+Usage:
+    python -m backend.benchmarks.bench_dashboard
+    python -m backend.benchmarks.bench_dashboard --histories 90 365 --window 90 --repeat 20
+    python -m backend.benchmarks.bench_dashboard --save baseline.json
+    python -m backend.benchmarks.bench_dashboard --compare baseline.json
+"""
+
+import logging
+from backend.benchmarks import fake_supabase
+
+client = fake_supabase.install()
+
+# The services log every query at INFO
+logging.disable(logging.INFO)
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Dict, Any, List, Callable, Awaitable
+
+from backend.benchmarks.synthetic import generate_user_history, make_user
+from backend.routers import emotions as emotions_router
+from backend.services.dashboard_cache import dashboard_cache
+from backend.services.dashboard_context import load_dashboard_context
+from backend.services.rollup_service import build_rollup_rows
+
+DEFAULT_HISTORIES = [7, 90, 365, 3650, 10000]
+
+SECTIONS = [
+    "fetch",
+    "matrix",
+    "mood_improvement",
+    "mood_journey",
+    "emotional_landscape",
+    "progress",
+    "journal_entries",
+    "total",
+    "total_cached"
+]
+
+def seed_history(user_id: str, days: int):
+    """Load one synthetic user into the in-memory tables"""
+    journal_rows, emotion_rows = generate_user_history(user_id, days, seed=days)
+    client.tables["user"].append(make_user(user_id))
+    client.tables["journal_entry"].extend(journal_rows)
+    client.tables["emotions"].extend(emotion_rows)
+    client.tables["daily_mood_rollup"].extend(build_rollup_rows(emotion_rows))
+
+async def measure(run: Callable[[], Awaitable[Any]], repeat: int) -> Dict[str, Any]:
+    """Time `run` `repeat` times, then trace one more call for allocations and rows"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    client.reset_counters()
+    tracemalloc.start()
+    result = await run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "peak_kib": peak / 1024,
+        "rows_fetched": sum(client.rows_returned.values()),
+        "result": result
+    }
+
+async def bench_history(days: int, window: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Benchmark every dashboard section for one synthetic user"""
+    user_id = f"BENCH{days}"
+    client.clear()
+    seed_history(user_id, days)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    fetch = await measure(lambda: load_dashboard_context(user_id, window), repeat)
+    ctx = fetch.pop("result")
+    fetch["rows"] = fetch["rows_fetched"]
+    results["fetch"] = fetch
+
+    async def build_matrix():
+        ctx._matrix = None
+        return ctx.matrix
+
+    results["matrix"] = await measure(build_matrix, repeat)
+    results["matrix"]["rows"] = len(ctx.emotions)
+
+    helpers = {
+        "mood_improvement": (emotions_router.get_mood_improvement_data, len(ctx.emotions)),
+        "mood_journey": (emotions_router.get_mood_journey_data, len(ctx.emotions)),
+        "emotional_landscape": (emotions_router.get_emotional_landscape_data, len(ctx.emotions)),
+        "progress": (emotions_router.get_progress_data, len(ctx.emotions) + len(ctx.journal_dates)),
+        "journal_entries": (emotions_router.get_journal_entries_count, len(ctx.journal_dates))
+    }
+    for section, (helper, rows) in helpers.items():
+        results[section] = await measure(lambda helper=helper: helper(ctx), repeat)
+        results[section]["rows"] = rows
+
+    async def uncached():
+        dashboard_cache.clear()
+        return await emotions_router.get_dashboard_data(user_id, window)
+
+    results["total"] = await measure(uncached, repeat)
+    results["total"]["rows"] = results["total"]["rows_fetched"]
+
+    await emotions_router.get_dashboard_data(user_id, window)
+    results["total_cached"] = await measure(lambda: emotions_router.get_dashboard_data(user_id, window), repeat)
+    results["total_cached"]["rows"] = results["total_cached"]["rows_fetched"]
+
+    for section in results.values():
+        section.pop("result", None)
+        section.pop("rows_fetched", None)
+    return results
+
+def print_table(all_results: Dict[int, Dict[str, Dict[str, Any]]], baseline: Dict[str, Any] = None):
+    header = f"{'history':>8}  {'section':<20} {'median ms':>10} {'p95 ms':>9} {'peak KiB':>10} {'rows':>7}"
+    if baseline:
+        header += f" {'vs base':>9}"
+    print(header)
+    print("-" * len(header))
+    for days, sections in all_results.items():
+        for section in SECTIONS:
+            r = sections[section]
+            line = f"{days:>8}  {section:<20} {r['median_ms']:>10.3f} {r['p95_ms']:>9.3f} {r['peak_kib']:>10.1f} {r['rows']:>7}"
+            if baseline:
+                base = baseline.get(f"{days}/{section}")
+                if base and base["median_ms"] > 0:
+                    change = (r["median_ms"] - base["median_ms"]) / base["median_ms"] * 100
+                    line += f" {change:>+8.1f}%"
+                else:
+                    line += f" {'n/a':>9}"
+            print(line)
+        print()
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard path over synthetic histories")
+    parser.add_argument("--histories", type=int, nargs="+", default=DEFAULT_HISTORIES, help="history lengths in days")
+    parser.add_argument("--window", type=int, default=30, help="dashboard window in days")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per section")
+    parser.add_argument("--save", help="write results as JSON for later comparison")
+    parser.add_argument("--compare", help="baseline JSON written by --save")
+    args = parser.parse_args(argv)
+
+    all_results = {}
+    for days in args.histories:
+        all_results[days] = asyncio.run(bench_history(days, args.window, args.repeat))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print(f"Dashboard benchmark: window={args.window} days, repeat={args.repeat}\n")
+    print_table(all_results, baseline)
+
+    if args.save:
+        flat = {f"{days}/{section}": values for days, sections in all_results.items() for section, values in sections.items()}
+        with open(args.save, "w") as f:
+            json.dump(flat, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Response serialization benchmarks for the large read endpoints.
+
+For each endpoint and history length this times what FastAPI does after the
+handler returns: response-model validation/serialization followed by
+rendering the body. "before" is the stdlib JSONResponse with the response
+models the endpoints used to declare; "after" is the response model and
+response class each route uses now. Payloads come from the real service
+and dashboard code running against the in-memory Supabase stand-in.
+
+Usage:
+    python -m backend.benchmarks.bench_serialization
+    python -m backend.benchmarks.bench_serialization --histories 365 3650 --repeat 20
+"""
+
+import logging
+from backend.benchmarks import fake_supabase
+
+client = fake_supabase.install()
+
+# The services log every query at INFO
+logging.disable(logging.INFO)
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, Any, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from fastapi.utils import create_response_field
+
+from backend.benchmarks.bench_dashboard import seed_history
+from backend.main import app
+from backend.services.journals_service import journals_service
+from backend.services.emotions_service import emotions_service
+from backend.services.rollup_service import rollup_service
+from backend.services.dashboard_context import load_dashboard_context
+from backend.routers import emotions as emotions_router
+
+DEFAULT_HISTORIES = [365, 3650, 10000]
+
+# Route path -> response model the endpoint declared before the fast path
+ENDPOINTS = {
+    "/journal-entries/": List[dict],
+    "/emotions/": List[dict],
+    "/emotions/summary/{user_id}": None,
+    "/emotions/dashboard/{user_id}": None
+}
+
+def route_for(path: str) -> APIRoute:
+    return next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path and "GET" in r.methods)
+
+def response_class_for(route: APIRoute):
+    # Routes without their own class carry the app default in a placeholder
+    return getattr(route.response_class, "value", route.response_class)
+
+async def load_payloads(user_id: str, window: int) -> Dict[str, Any]:
+    """What each endpoint's handler returns for the synthetic user"""
+    ctx = await load_dashboard_context(user_id, window)
+    return {
+        "/journal-entries/": journals_service.get_journal_entries_in_range(user_id, projection="full", descending=True),
+        "/emotions/": emotions_service.get_emotions_in_range(user_id, projection="full", descending=True),
+        "/emotions/summary/{user_id}": rollup_service.get_rollups_by_user(user_id, projection="full"),
+        "/emotions/dashboard/{user_id}": await emotions_router.build_dashboard(ctx)
+    }
+
+async def time_render(field, response_class, payload: Any, repeat: int) -> Dict[str, Any]:
+    """Median and p95 of model serialization plus body rendering"""
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = await serialize_response(field=field, response_content=payload)
+        size = len(response_class(content).body)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "bytes": size
+    }
+
+async def bench_history(days: int, window: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    user_id = f"BENCH{days}"
+    client.clear()
+    seed_history(user_id, days)
+    payloads = await load_payloads(user_id, window)
+
+    results = {}
+    for path, before_model in ENDPOINTS.items():
+        route = route_for(path)
+        before_field = create_response_field(name="before", type_=before_model) if before_model else None
+        results[path] = {
+            "rows": len(payloads[path]) if isinstance(payloads[path], list) else len(payloads[path]["mood_journey"]["daily_moods"]),
+            "before": await time_render(before_field, JSONResponse, payloads[path], repeat),
+            "after": await time_render(route.response_field, response_class_for(route), payloads[path], repeat)
+        }
+    return results
+
+def print_table(all_results: Dict[int, Dict[str, Dict[str, Any]]]):
+    header = f"{'history':>8}  {'endpoint':<30} {'rows':>6} {'before ms':>10} {'after ms':>9} {'speedup':>8} {'KiB':>8}"
+    print(header)
+    print("-" * len(header))
+    for days, endpoints in all_results.items():
+        for path, r in endpoints.items():
+            before, after = r["before"]["median_ms"], r["after"]["median_ms"]
+            speedup = before / after if after > 0 else float("inf")
+            print(f"{days:>8}  {path:<30} {r['rows']:>6} {before:>10.2f} {after:>9.2f} {speedup:>7.1f}x {r['after']['bytes'] / 1024:>8.1f}")
+        print()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark response serialization for the large read endpoints")
+    parser.add_argument("--histories", type=int, nargs="+", default=DEFAULT_HISTORIES, help="history lengths in days")
+    parser.add_argument("--window", type=int, default=365, help="dashboard window in days")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per endpoint")
+    args = parser.parse_args(argv)
+
+    all_results = {days: asyncio.run(bench_history(days, args.window, args.repeat)) for days in args.histories}
+    print(f"Serialization benchmark: dashboard window={args.window} days, repeat={args.repeat}\n")
+    print_table(all_results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+In-memory stand-in for the supabase-py client used by the benchmarks.
+
+It implements the subset of the PostgREST query builder the services use
+(select/insert/upsert/update/delete with eq/neq/gte/lte/gt/lt/in_, filter
+and or_ filters, order, limit and range) over plain Python lists, and counts how many rows
+each table hands back so benchmarks can report transferred rows.
+
+Call install() before importing anything from backend.services: the
+service singletons connect to Supabase at import time.
+"""
+
+from typing import Dict, Any, List, Optional, Callable
+from collections import defaultdict
+import operator
+import os
+
+COMPARISONS = {
+    "eq": operator.eq, "neq": operator.ne,
+    "gt": operator.gt, "gte": operator.ge,
+    "lt": operator.lt, "lte": operator.le
+}
+
+def _split_top_level(text: str) -> List[str]:
+    """Split a PostgREST logical filter list on commas outside parentheses and quotes"""
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quoted and char == "\\":
+            current += text[i:i + 2]
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    parts.append(current)
+    return parts
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+def _compare(row_value, op: str, value) -> bool:
+    if row_value is None:
+        return False
+    if isinstance(row_value, (int, float)) and not isinstance(value, (int, float)):
+        value = type(row_value)(value)
+    return COMPARISONS[op](str(row_value) if isinstance(value, str) else row_value, value)
+
+def _parse_condition(text: str) -> Callable[[Dict[str, Any]], bool]:
+    """Predicate for one `column.op.value`, `and(...)` or `or(...)` term"""
+    for name, combine in (("and(", all), ("or(", any)):
+        if text.startswith(name) and text.endswith(")"):
+            terms = [_parse_condition(part) for part in _split_top_level(text[len(name):-1])]
+            return lambda row: combine(term(row) for term in terms)
+    column, op, value = text.split(".", 2)
+    value = _unquote(value)
+    return lambda row: _compare(row.get(column), op, value)
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class FakeQuery:
+    def __init__(self, client: "InMemoryClient", table: str):
+        self._client = client
+        self._table = table
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._range: Optional[tuple] = None
+        self._columns = "*"
+        self._op = "select"
+        self._payload: Any = None
+        self._on_conflict = ""
+        self._count = None
+
+    # Operations
+    def select(self, *columns: str, count: Optional[str] = None) -> "FakeQuery":
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, payload) -> "FakeQuery":
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "", **kwargs) -> "FakeQuery":
+        self._op, self._payload, self._on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload) -> "FakeQuery":
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self._op = "delete"
+        return self
+
+    # Filters
+    def _where(self, column: str, test: Callable[[Any], bool]) -> "FakeQuery":
+        self._filters.append(lambda row: row.get(column) is not None and test(row.get(column)))
+        return self
+
+    def eq(self, column: str, value) -> "FakeQuery":
+        return self._where(column, lambda v: str(v) == str(value))
+
+    def neq(self, column: str, value) -> "FakeQuery":
+        self._filters.append(lambda row: str(row.get(column)) != str(value))
+        return self
+
+    def gte(self, column: str, value) -> "FakeQuery":
+        return self._where(column, lambda v: v >= value)
+
+    def lte(self, column: str, value) -> "FakeQuery":
+        return self._where(column, lambda v: v <= value)
+
+    def gt(self, column: str, value) -> "FakeQuery":
+        return self._where(column, lambda v: v > value)
+
+    def lt(self, column: str, value) -> "FakeQuery":
+        return self._where(column, lambda v: v < value)
+
+    def in_(self, column: str, values) -> "FakeQuery":
+        wanted = {str(v) for v in values}
+        return self._where(column, lambda v: str(v) in wanted)
+
+    def filter(self, column: str, op: str, criteria) -> "FakeQuery":
+        self._filters.append(lambda row: _compare(row.get(column), op, criteria))
+        return self
+
+    def or_(self, filters: str, **kwargs) -> "FakeQuery":
+        self._filters.append(_parse_condition(f"or({filters})"))
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, **kwargs) -> "FakeQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "FakeQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self._range = (start, end)
+        return self
+
+    def execute(self) -> FakeResponse:
+        rows = self._client.tables[self._table]
+
+        if self._op == "insert":
+            return FakeResponse(self._client.insert_rows(self._table, self._payload))
+        if self._op == "upsert":
+            return FakeResponse(self._client.upsert_rows(self._table, self._payload, self._on_conflict))
+
+        matched = [row for row in rows if all(f(row) for f in self._filters)]
+
+        if self._op == "update":
+            for row in matched:
+                row.update(self._payload)
+            return FakeResponse([dict(row) for row in matched])
+        if self._op == "delete":
+            ids = {id(row) for row in matched}
+            self._client.tables[self._table] = [row for row in rows if id(row) not in ids]
+            return FakeResponse(matched)
+
+        total = len(matched)
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self._range:
+            matched = matched[self._range[0]:self._range[1] + 1]
+        if self._limit is not None:
+            matched = matched[:self._limit]
+
+        if self._columns.strip() == "*":
+            data = [dict(row) for row in matched]
+        else:
+            columns = [c.strip() for c in self._columns.split(",")]
+            data = [{c: row.get(c) for c in columns} for row in matched]
+
+        self._client.rows_returned[self._table] += len(data)
+        self._client.requests += 1
+        return FakeResponse(data, total if self._count else None)
+
+class InMemoryClient:
+    """Tables are lists of dict rows keyed by table name"""
+
+    # Auto-increment primary keys, as in the real schema
+    SERIAL_KEYS = {"journal_entry": "entry_id", "emotions": "id"}
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.rows_returned: Dict[str, int] = defaultdict(int)
+        self.requests = 0
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def reset_counters(self):
+        self.rows_returned = defaultdict(int)
+        self.requests = 0
+
+    def clear(self):
+        self.tables.clear()
+        self.reset_counters()
+
+    def insert_rows(self, table: str, payload) -> List[Dict[str, Any]]:
+        rows = payload if isinstance(payload, list) else [payload]
+        key = self.SERIAL_KEYS.get(table)
+        inserted = []
+        for row in rows:
+            row = dict(row)
+            if key and row.get(key) is None:
+                row[key] = max((r[key] for r in self.tables[table]), default=0) + 1
+            self.tables[table].append(row)
+            inserted.append(dict(row))
+        return inserted
+
+    def upsert_rows(self, table: str, payload, on_conflict: str) -> List[Dict[str, Any]]:
+        rows = payload if isinstance(payload, list) else [payload]
+        keys = [k.strip() for k in on_conflict.split(",") if k.strip()]
+        index = {tuple(str(r.get(k)) for k in keys): r for r in self.tables[table]} if keys else {}
+        written = []
+        for row in rows:
+            existing = index.get(tuple(str(row.get(k)) for k in keys)) if keys else None
+            if existing is not None:
+                existing.update(row)
+                written.append(dict(existing))
+            else:
+                written.extend(self.insert_rows(table, row))
+                if keys:
+                    index[tuple(str(row.get(k)) for k in keys)] = self.tables[table][-1]
+        return written
+
+client = InMemoryClient()
+
+def install() -> InMemoryClient:
+    """Route every Supabase client created from now on to the in-memory client"""
+    import supabase
+
+    # Placeholder settings so the service modules import without a real backend
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    for name in ("DB_HOST", "DB_USER", "DB_PASSWORD", "DB_NAME"):
+        os.environ.setdefault(name, "benchmark")
+
+    supabase.create_client = lambda *args, **kwargs: client
+    return client
@@ -0,0 +1,76 @@
+"""
+Synthetic journal and emotion histories for benchmarks.
+
+Histories are deterministic for a given seed: most days have one to three
+journal entries, most journaled days have an emotion row, and a few days
+are skipped entirely so streaks and gaps look realistic.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, timedelta
+import random
+
+EMOTION_NAMES = ("happy", "stressed", "anxious", "angry", "sad", "agitated", "neutral")
+
+SAMPLE_SENTENCES = (
+    "Had a long talk with my sister about the holidays.",
+    "Work was stressful and I could not focus on anything.",
+    "Went for a walk in the park and felt calmer afterwards.",
+    "Could not sleep again, kept thinking about the meeting.",
+    "Cooked dinner with friends, it was a really good evening.",
+    "Felt irritated all afternoon for no clear reason.",
+    "Therapy session today, we talked about my routines."
+)
+
+def generate_user_history(
+    user_id: str,
+    days: int,
+    seed: int = 0,
+    today: Optional[date] = None,
+    first_entry_id: int = 1
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (journal_entry rows, emotions rows) covering `days` days up to today"""
+    rng = random.Random(seed)
+    today = today or date.today()
+    entry_id = first_entry_id
+    journal_rows: List[Dict[str, Any]] = []
+    emotion_rows: List[Dict[str, Any]] = []
+
+    for days_ago in range(days - 1, -1, -1):
+        journal_date = (today - timedelta(days=days_ago)).isoformat()
+        # Keep the last few days journaled so the streak is non-trivial
+        if days_ago > 2 and rng.random() < 0.15:
+            continue
+
+        last_entry_id = entry_id
+        for _ in range(rng.randint(1, 3)):
+            journal_rows.append({
+                "entry_id": entry_id,
+                "user_id": user_id,
+                "entry_text": " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(2, 6))),
+                "AI_response": " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(2, 4))),
+                "journal_date": journal_date,
+                "episode_flag": 0
+            })
+            last_entry_id = entry_id
+            entry_id += 1
+
+        if rng.random() < 0.9:
+            row = {name: rng.randint(0, 10) for name in EMOTION_NAMES}
+            row.update({"user_id": user_id, "entry_id": last_entry_id, "journal_date": journal_date})
+            emotion_rows.append(row)
+
+    return journal_rows, emotion_rows
+
+def make_user(user_id: str) -> Dict[str, Any]:
+    """Minimal user row"""
+    return {
+        "user_id": user_id,
+        "email": f"{user_id.lower()}@example.com",
+        "password": "not-a-real-hash",
+        "first_name": "Bench",
+        "last_name": user_id,
+        "profile_picture": None,
+        "subscription_tier": "Free",
+        "monthly_entries_count": 0
+    }
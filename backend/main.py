@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from pydantic import BaseModel
@@ -18,6 +19,11 @@ from backend.routers import emotions
 # Import both schedulers
 from backend.tasks.emotion_scheduler import emotion_scheduler
 from backend.tasks.plan_scheduler import plan_scheduler
+from backend.tasks.entry_analysis import entry_analysis_queue
+from backend.services.base_service import shutdown_db_executor, run_db
+from backend.middleware.compression import CompressionMiddleware
+from backend.services.rate_limiter import gemini_rate_limiter
+from backend.services.analysis_cache import analysis_cache
 
 # Load environment variables
 load_dotenv(Path(__file__).resolve().parent / ".env")
@@ -31,6 +37,7 @@ async def lifespan(app: FastAPI):
     # Create background tasks for both schedulers
     emotion_task = asyncio.create_task(emotion_scheduler.start_scheduler())
     plan_task = asyncio.create_task(plan_scheduler.start_scheduler())
+    entry_analysis_task = asyncio.create_task(entry_analysis_queue.start())
     
     print("✓ Emotion analysis scheduler started")
     print("✓ Plan management scheduler started")
@@ -43,23 +50,31 @@ async def lifespan(app: FastAPI):
     # Stop both schedulers
     emotion_scheduler.stop_scheduler()
     plan_scheduler.stop_scheduler()
+    entry_analysis_queue.stop()
     
     # Cancel and await both tasks
     try:
         emotion_task.cancel()
         plan_task.cancel()
+        entry_analysis_task.cancel()
         await emotion_task
         await plan_task
+        await entry_analysis_task
     except asyncio.CancelledError:
         pass
     
+    # Release the database worker threads
+    shutdown_db_executor()
+    
     print("✓ All schedulers stopped successfully")
 
 # Update FastAPI app initialization
 app = FastAPI(
     title="Mood Tracker API", 
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes the large list and dashboard payloads several times faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -69,8 +84,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# gzip/brotli for large buffered responses; sizes and levels come from the environment
+app.add_middleware(CompressionMiddleware)
+
 # Database configuration
 DB_HOST = os.getenv("DB_HOST")
 DB_USER = os.getenv("DB_USER")
@@ -113,7 +132,13 @@ async def health_check():
 @app.get("/scheduler-status")
 async def scheduler_status():
     return {
-        "emotion_scheduler": {"running": emotion_scheduler.is_running if hasattr(emotion_scheduler, 'is_running') else "unknown"},
+        "emotion_scheduler": {
+            "running": emotion_scheduler.is_running if hasattr(emotion_scheduler, 'is_running') else "unknown",
+            "runs": emotion_scheduler.run_progress,
+            "rate_limiter": gemini_rate_limiter.stats(),
+            "analysis_cache": await run_db(analysis_cache.stats),
+            "write_time_analysis": entry_analysis_queue.stats()
+        },
         "plan_scheduler": {"running": plan_scheduler.is_running if hasattr(plan_scheduler, 'is_running') else "unknown"},
         "status": "healthy"
     }
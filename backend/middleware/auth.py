@@ -7,6 +7,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from ..schemas.db import get_db
 from ..utils.jwt_utils import get_current_user
+from ..services.base_service import run_db
 
 security = HTTPBearer()
 
@@ -43,8 +44,8 @@ async def get_current_user_dependency(
         LEFT JOIN subscription s ON u.user_id = s.user_id 
         WHERE u.user_id = :user_id
     """)
-    result = db.execute(query, {"user_id": payload.get("user_id")})
-    user = result.fetchone()
+    # Run the query off the event loop; the session is only used from this one call
+    user = await run_db(lambda: db.execute(query, {"user_id": payload.get("user_id")}).fetchone())
     if not user:
         raise HTTPException(
             status_code=401,
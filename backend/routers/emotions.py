@@ -1,349 +1,287 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Dict, Any, Union
 from datetime import date, datetime, timedelta
 import sys
 import os
+import asyncio
+import orjson
 import logging
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ..services.base_service import run_db
 from ..services.emotions_service import emotions_service
 from ..services.users_service import users_service
 from ..services.journals_service import journals_service
+from ..services.rollup_service import rollup_service
+from ..services.dashboard_cache import dashboard_cache
+from ..services.similar_days import similar_days_index
+from ..services.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from ..services.data_version import get_user_data_version, get_journal_token, make_etag, etag_matches
+from ..services import mood_analytics
+from ..services import columnar
+from ..services.dashboard_context import DashboardContext, load_dashboard_context, load_dashboard_contexts, STREAK_LOOKBACK_DAYS
 from ..tasks.emotion_scheduler import emotion_scheduler
+from ..schemas.emotion_schemas import (
+    DashboardBatchRequest, DashboardData, MoodRollupRecord, SummaryBucket, SimilarDaysData,
+    ColumnarDashboardData, ColumnarMoodRollups, ColumnarSummaryBuckets
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/emotions", tags=["emotions"])
 
+async def check_not_modified(
+    request: Optional[Request],
+    response: Optional[Response],
+    user_id: str,
+    *params
+) -> Optional[Response]:
+    """Return a 304 response if the client's ETag is current, otherwise tag the response"""
+    if request is None or response is None:
+        return None
+    version = await get_user_data_version(user_id)
+    # Lets the handler tag its cached payload with the version it was built from
+    request.state.data_version = version
+    # Relative date windows move at midnight even when the data does not
+    etag = make_etag(request.url.path, user_id, version, date.today().isoformat(), *params)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        logger.info(f"[EmotionsAPI] ✓ Not modified for user {user_id}")
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return None
+
 @router.get("/", response_model=List[dict])
 async def get_emotions(
     user_id: Optional[str] = Query(None),
-    journal_date: Optional[str] = Query(None)
+    journal_date: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    request: Request = None,
+    response: Response = None
 ):
     """Get emotion analysis results"""
     logger.info(f"[EmotionsAPI] GET emotions - user_id: {user_id}, journal_date: {journal_date}")
     
     try:
         if user_id:
-            emotions = emotions_service.get_emotions_by_user(user_id)
-            # Filter by date if provided
-            if journal_date:
-                emotions = [e for e in emotions if e.get('journal_date') == journal_date]
-            logger.info(f"[EmotionsAPI] Found {len(emotions)} emotion records")
-            return emotions
+            not_modified = await check_not_modified(request, response, user_id, journal_date, start_date, end_date, limit, cursor)
+            if not_modified is not None:
+                return not_modified
+
+        # A single journal_date narrows the range to that day
+        if journal_date:
+            start_date = end_date = journal_date
+
+        if user_id and limit is None and cursor is None:
+            # A user's full history, as before pagination
+            emotions = await run_db(
+                emotions_service.get_emotions_in_range,
+                user_id, start_date, end_date, projection="full", descending=True
+            )
         else:
-            # Get all emotions using Supabase
-            client = emotions_service.client
-            result = client.table("emotions").select("*").order("journal_date", desc=True).execute()
-            logger.info(f"[EmotionsAPI] Found {len(result.data)} emotion records")
-            return result.data or []
+            # Unfiltered listings are always paged so they never scan the whole table
+            emotions, next_cursor = await run_db(
+                emotions_service.get_emotions_page,
+                user_id, start_date, end_date, limit=limit, cursor=cursor, projection="full"
+            )
+            if next_cursor and response is not None:
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        logger.info(f"[EmotionsAPI] Found {len(emotions)} emotion records")
+        return emotions
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"[EmotionsAPI] ✗ Error getting emotions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/dashboard/{user_id}")
+def empty_dashboard(days: int) -> Dict[str, Any]:
+    """Dashboard payload for a user that does not exist"""
+    return {
+        "mood_improvement": {"percentage": 0, "trend": "neutral", "message": "No data available", "days_compared": 0},
+        "mood_journey": {"daily_moods": [], "statistics": {"average_mood": 3, "lowest_mood": 0, "highest_mood": 0, "total_days": 0}},
+        "emotional_landscape": {"emotions": [], "dominant_emotion": "Neutral"},
+        "progress": {
+            "good_days": {"count": 0, "total": 0, "percentage": 0},
+            "journaling_streak": {"current_days": 0, "this_period": 0},
+            "mood_stability": {"percentage": 0, "status": "no_data"},
+            "total_entries": 0
+        },
+        "journal_entries": {"this_week": 0, "total_period": 0, "average_per_week": 0},
+        "period": {
+            "start_date": (date.today() - timedelta(days=days-1)).isoformat(),
+            "end_date": date.today().isoformat(),
+            "days": days
+        }
+    }
+
+async def build_dashboard(ctx: DashboardContext, version: Optional[str] = None) -> Dict[str, Any]:
+    """Assemble every dashboard section from a loaded context, caching it under the given data version"""
+    logger.info(f"[EmotionsAPI] Processing data for user {ctx.user_id} from {ctx.start_date} to {ctx.end_date}")
+    
+    # Get mood improvement data
+    mood_improvement = await get_mood_improvement_data(ctx)
+    
+    # Get mood journey data  
+    mood_journey = await get_mood_journey_data(ctx)
+    
+    # Get emotional landscape
+    emotional_landscape = await get_emotional_landscape_data(ctx)
+    
+    # Get progress metrics
+    progress_data = await get_progress_data(ctx)
+    
+    # Get journal entry count
+    journal_entries = await get_journal_entries_count(ctx)
+    
+    dashboard_data = {
+        "mood_improvement": mood_improvement,
+        "mood_journey": mood_journey,
+        "emotional_landscape": emotional_landscape,
+        "progress": progress_data,
+        "journal_entries": journal_entries,
+        "period": {
+            "start_date": ctx.start_date.isoformat(),
+            "end_date": ctx.end_date.isoformat(),
+            "days": ctx.days
+        }
+    }
+    
+    dashboard_cache.set(ctx.user_id, ctx.days, dashboard_data, ctx.end_date, version=version)
+    
+    logger.info(f"[EmotionsAPI] Data summary: {journal_entries['total_period']} entries, {progress_data['good_days']['count']} good days")
+    return dashboard_data
+
+RESPONSE_FORMAT_PATTERN = f"^({'|'.join(columnar.RESPONSE_FORMATS)})$"
+
+@router.get("/dashboard/{user_id}", response_model=Union[DashboardData, ColumnarDashboardData])
 async def get_dashboard_data(
     user_id: str,
-    days: int = Query(30, description="Number of days to analyze")
+    days: int = Query(30, description="Number of days to analyze"),
+    response_format: str = Query("rows", alias="format", pattern=RESPONSE_FORMAT_PATTERN, description="columnar sends daily moods as parallel arrays"),
+    request: Request = None,
+    response: Response = None
 ):
     """Get comprehensive dashboard data for a user"""
     logger.info(f"[EmotionsAPI] GET dashboard data for user: {user_id}, days: {days}")
     
     try:
-        # Check if user exists
-        user = users_service.get_user_by_id(user_id)
+        # Answer revalidations from the data version alone, before any payload work
+        not_modified = await check_not_modified(request, response, user_id, days, response_format)
+        if not_modified is not None:
+            return not_modified
+
+        # Serve repeat opens from the cache while the user's persisted data version is unchanged,
+        # which also catches writes made through another worker
+        version = getattr(request.state, "data_version", None) if request is not None else None
+        cached = dashboard_cache.get(user_id, days, version=version)
+        if cached is not None:
+            logger.info(f"[EmotionsAPI] ✓ Dashboard cache hit for user {user_id}")
+            return columnar.columnar_dashboard(cached) if response_format == "columnar" else cached
+        
+        # Check the user and fetch emotions and journal entries once for every section, concurrently
+        user, ctx = await asyncio.gather(
+            run_db(users_service.get_user_by_id, user_id, projection="exists"),
+            load_dashboard_context(user_id, days)
+        )
         if not user:
             logger.warning(f"[EmotionsAPI] User {user_id} not found")
             # Return empty data structure instead of error for better UX
-            return {
-                "mood_improvement": {"percentage": 0, "trend": "neutral", "message": "No data available", "days_compared": 0},
-                "mood_journey": {"daily_moods": [], "statistics": {"average_mood": 3, "lowest_mood": 0, "highest_mood": 0, "total_days": 0}},
-                "emotional_landscape": {"emotions": [], "dominant_emotion": "Neutral"},
-                "progress": {
-                    "good_days": {"count": 0, "total": 0, "percentage": 0},
-                    "journaling_streak": {"current_days": 0, "this_period": 0},
-                    "mood_stability": {"percentage": 0, "status": "no_data"},
-                    "total_entries": 0
-                },
-                "journal_entries": {"this_week": 0, "total_period": 0, "average_per_week": 0},
-                "period": {
-                    "start_date": (date.today() - timedelta(days=days-1)).isoformat(),
-                    "end_date": date.today().isoformat(),
-                    "days": days
-                }
-            }
-        
-        end_date = date.today()
-        start_date = end_date - timedelta(days=days-1)
-        
-        logger.info(f"[EmotionsAPI] Processing data for user {user_id} from {start_date} to {end_date}")
-        
-        # Get mood improvement data
-        mood_improvement = await get_mood_improvement_data(user_id, days)
-        
-        # Get mood journey data  
-        mood_journey = await get_mood_journey_data(user_id, days)
-        
-        # Get emotional landscape
-        emotional_landscape = await get_emotional_landscape_data(user_id, days)
-        
-        # Get progress metrics
-        progress_data = await get_progress_data(user_id, days)
-        
-        # Get journal entry count
-        journal_entries = await get_journal_entries_count(user_id, days)
-        
-        dashboard_data = {
-            "mood_improvement": mood_improvement,
-            "mood_journey": mood_journey,
-            "emotional_landscape": emotional_landscape,
-            "progress": progress_data,
-            "journal_entries": journal_entries,
-            "period": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat(),
-                "days": days
-            }
-        }
+            dashboard_data = empty_dashboard(days)
+        else:
+            dashboard_data = await build_dashboard(ctx, version)
+            logger.info(f"[EmotionsAPI] ✓ Successfully retrieved dashboard data for user {user_id}")
         
-        logger.info(f"[EmotionsAPI] ✓ Successfully retrieved dashboard data for user {user_id}")
-        logger.info(f"[EmotionsAPI] Data summary: {journal_entries['total_period']} entries, {progress_data['good_days']['count']} good days")
-        return dashboard_data
+        return columnar.columnar_dashboard(dashboard_data) if response_format == "columnar" else dashboard_data
         
     except Exception as e:
         logger.error(f"[EmotionsAPI] ✗ Error getting dashboard data for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def get_mood_improvement_data(user_id: str, days: int) -> Dict[str, Any]:
+@router.post("/dashboard/batch")
+async def get_dashboard_batch(request: DashboardBatchRequest):
+    """Stream dashboards for many users as NDJSON, one line per user"""
+    logger.info(f"[EmotionsAPI] POST dashboard batch for {len(request.user_ids)} users, days: {request.days}")
+    
+    try:
+        user_ids = list(dict.fromkeys(request.user_ids))
+        # Same check as the single endpoint: a cached payload is only served for the user's current data version
+        versions = dict(zip(user_ids, await asyncio.gather(*(get_user_data_version(user_id) for user_id in user_ids))))
+        cached = {user_id: dashboard_cache.get(user_id, request.days, version=versions[user_id]) for user_id in user_ids}
+        missing = [user_id for user_id, data in cached.items() if data is None]
+        
+        # One query per table for every user that is not cached
+        users, contexts = await asyncio.gather(
+            run_db(users_service.get_users_by_ids, missing, projection="exists"),
+            load_dashboard_contexts(missing, request.days)
+        )
+        known_users = {user["user_id"] for user in users}
+        logger.info(f"[EmotionsAPI] Batch: {len(user_ids) - len(missing)} cached, {len(known_users)} loaded, {len(missing) - len(known_users)} not found")
+    except Exception as e:
+        logger.error(f"[EmotionsAPI] ✗ Error loading dashboard batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def stream_dashboards():
+        for user_id in user_ids:
+            if cached[user_id] is not None:
+                data = cached[user_id]
+            elif user_id in known_users:
+                data = await build_dashboard(contexts[user_id], versions[user_id])
+            else:
+                data = empty_dashboard(request.days)
+            yield orjson.dumps({"user_id": user_id, "dashboard": data}) + b"\n"
+    
+    return StreamingResponse(stream_dashboards(), media_type="application/x-ndjson")
+
+async def get_mood_improvement_data(ctx: DashboardContext) -> Dict[str, Any]:
     """Calculate mood improvement percentage and trend"""
     try:
-        # Get emotions for the period using Supabase
-        emotions = emotions_service.get_emotions_by_user(user_id)
-        
-        # Filter by date range
-        start_date = date.today() - timedelta(days=days-1)
-        emotions = [e for e in emotions if datetime.fromisoformat(e['journal_date']).date() >= start_date]
-        emotions.sort(key=lambda x: x['journal_date'])
-        
-        if len(emotions) < 2:
-            return {
-                "percentage": 0,
-                "trend": "neutral",
-                "message": "Need more data",
-                "days_compared": 0
-            }
-        
-        # Calculate mood scores (positive emotions - negative emotions)
-        def calculate_mood_score(emotion_row):
-            positive = emotion_row.get('happy', 0) + emotion_row.get('neutral', 0)
-            negative = emotion_row.get('sad', 0) + emotion_row.get('anxious', 0) + emotion_row.get('stressed', 0) + emotion_row.get('angry', 0) + emotion_row.get('agitated', 0)
-            return positive - negative
-        
-        # Compare first half vs second half
-        mid_point = len(emotions) // 2
-        first_half = emotions[:mid_point]
-        second_half = emotions[mid_point:]
-        
-        first_half_avg = sum(calculate_mood_score(e) for e in first_half) / len(first_half)
-        second_half_avg = sum(calculate_mood_score(e) for e in second_half) / len(second_half)
-        
-        # Calculate improvement percentage
-        if first_half_avg != 0:
-            improvement = ((second_half_avg - first_half_avg) / abs(first_half_avg)) * 100
-        else:
-            improvement = 0
-        
-        trend = "improving" if improvement > 5 else "declining" if improvement < -5 else "stable"
-        
-        return {
-            "percentage": round(improvement, 1),
-            "trend": trend,
-            "message": f"{abs(round(improvement))}% {'better' if improvement > 0 else 'change'} than last period",
-            "days_compared": len(emotions)
-        }
+        return mood_analytics.mood_improvement(ctx.matrix)
         
     except Exception as e:
         logger.error(f"[EmotionsAPI] Error calculating mood improvement: {e}")
         return {"percentage": 0, "trend": "neutral", "message": "Error calculating", "days_compared": 0}
 
-async def get_mood_journey_data(user_id: str, days: int) -> Dict[str, Any]:
+async def get_mood_journey_data(ctx: DashboardContext) -> Dict[str, Any]:
     """Get mood journey data for calendar/chart visualization"""
     try:
-        # Get emotions using Supabase
-        emotions = emotions_service.get_emotions_by_user(user_id)
-        
-        # Filter by date range
-        start_date = date.today() - timedelta(days=days-1)
-        emotions = [e for e in emotions if datetime.fromisoformat(e['journal_date']).date() >= start_date]
-        emotions.sort(key=lambda x: x['journal_date'])
-        
-        mood_data = []
-        mood_scores = []
-        
-        for emotion in emotions:
-            # Calculate overall mood score (1-5 scale)
-            positive = emotion.get('happy', 0) + emotion.get('neutral', 0)
-            negative = emotion.get('sad', 0) + emotion.get('anxious', 0) + emotion.get('stressed', 0) + emotion.get('angry', 0) + emotion.get('agitated', 0)
-            total = positive + negative
-            
-            if total > 0:
-                mood_score = (positive / total) * 5  # Scale to 1-5
-            else:
-                mood_score = 3  # Neutral
-            
-            mood_data.append({
-                "date": emotion['journal_date'],
-                "mood_score": round(mood_score, 1),
-                "dominant_emotion": get_dominant_emotion(emotion),
-                "emotions": {
-                    "happy": emotion.get('happy', 0),
-                    "sad": emotion.get('sad', 0),
-                    "anxious": emotion.get('anxious', 0),
-                    "stressed": emotion.get('stressed', 0),
-                    "angry": emotion.get('angry', 0),
-                    "agitated": emotion.get('agitated', 0),
-                    "neutral": emotion.get('neutral', 0)
-                }
-            })
-            mood_scores.append(mood_score)
-        
-        # Calculate statistics
-        if mood_scores:
-            avg_mood = sum(mood_scores) / len(mood_scores)
-            min_mood = min(mood_scores)
-            max_mood = max(mood_scores)
-        else:
-            avg_mood = min_mood = max_mood = 3
-        
-        return {
-            "daily_moods": mood_data,
-            "statistics": {
-                "average_mood": round(avg_mood, 1),
-                "lowest_mood": round(min_mood, 1),
-                "highest_mood": round(max_mood, 1),
-                "total_days": len(mood_data)
-            }
-        }
+        return mood_analytics.mood_journey(ctx.matrix)
         
     except Exception as e:
         logger.error(f"[EmotionsAPI] Error getting mood journey: {e}")
         return {"daily_moods": [], "statistics": {"average_mood": 3, "lowest_mood": 3, "highest_mood": 3, "total_days": 0}}
 
-async def get_emotional_landscape_data(user_id: str, days: int) -> Dict[str, Any]:
+async def get_emotional_landscape_data(ctx: DashboardContext) -> Dict[str, Any]:
     """Get emotional landscape percentages"""
     try:
-        # Get emotions using Supabase
-        emotions = emotions_service.get_emotions_by_user(user_id)
-        
-        # Filter by date range
-        start_date = date.today() - timedelta(days=days-1)
-        emotions = [e for e in emotions if datetime.fromisoformat(e['journal_date']).date() >= start_date]
-        
-        if not emotions:
-            return {
-                "emotions": [
-                    {"name": "Happy", "percentage": 20, "color": "#10B981"},
-                    {"name": "Calm", "percentage": 20, "color": "#3B82F6"},
-                    {"name": "Sad", "percentage": 20, "color": "#8B5CF6"},
-                    {"name": "Anxious", "percentage": 20, "color": "#F59E0B"},
-                    {"name": "Angry", "percentage": 20, "color": "#EF4444"}
-                ],
-                "dominant_emotion": "Neutral"
-            }
-        
-        # Calculate averages
-        avg_happy = sum(e.get('happy', 0) for e in emotions) / len(emotions)
-        avg_sad = sum(e.get('sad', 0) for e in emotions) / len(emotions)
-        avg_anxious = sum(e.get('anxious', 0) for e in emotions) / len(emotions)
-        avg_stressed = sum(e.get('stressed', 0) for e in emotions) / len(emotions)
-        avg_angry = sum(e.get('angry', 0) for e in emotions) / len(emotions)
-        avg_agitated = sum(e.get('agitated', 0) for e in emotions) / len(emotions)
-        avg_neutral = sum(e.get('neutral', 0) for e in emotions) / len(emotions)
-        
-        # Calculate total and percentages
-        total = avg_happy + avg_sad + avg_anxious + avg_stressed + avg_angry + avg_agitated + avg_neutral
-        
-        if total == 0:
-            total = 1  # Avoid division by zero
-        
-        emotions_data = [
-            {
-                "name": "Happy",
-                "percentage": round((avg_happy / total) * 100, 1),
-                "color": "#10B981"
-            },
-            {
-                "name": "Calm", 
-                "percentage": round((avg_neutral / total) * 100, 1),
-                "color": "#3B82F6"
-            },
-            {
-                "name": "Sad",
-                "percentage": round((avg_sad / total) * 100, 1),
-                "color": "#8B5CF6"
-            },
-            {
-                "name": "Anxious",
-                "percentage": round((avg_anxious / total) * 100, 1),
-                "color": "#F59E0B"
-            },
-            {
-                "name": "Angry",
-                "percentage": round(((avg_angry + avg_agitated) / total) * 100, 1),
-                "color": "#EF4444"
-            }
-        ]
-        
-        # Find dominant emotion
-        dominant = max(emotions_data, key=lambda x: x["percentage"])
-        
-        return {
-            "emotions": emotions_data,
-            "dominant_emotion": dominant["name"]
-        }
+        return mood_analytics.emotional_landscape(ctx.matrix)
         
     except Exception as e:
         logger.error(f"[EmotionsAPI] Error getting emotional landscape: {e}")
         return {"emotions": [], "dominant_emotion": "Unknown"}
 
-async def get_progress_data(user_id: str, days: int) -> Dict[str, Any]:
+async def get_progress_data(ctx: DashboardContext) -> Dict[str, Any]:
     """Get progress metrics"""
     try:
-        # Get journal entries count using Supabase
-        journal_entries = journals_service.get_journal_entries_by_user(user_id)
-        
-        # Filter by date range
-        start_date = date.today() - timedelta(days=days-1)
-        journal_entries = [e for e in journal_entries if datetime.fromisoformat(e['journal_date']).date() >= start_date]
-        journal_count = len(journal_entries)
-        
-        # Get emotions using Supabase
-        emotions = emotions_service.get_emotions_by_user(user_id)
-        emotions = [e for e in emotions if datetime.fromisoformat(e['journal_date']).date() >= start_date]
-        
-        good_days = 0
-        total_analyzed_days = len(emotions)
+        # Journal entries in the period
+        journal_count = ctx.journal_count_since(ctx.start_date)
         
-        for emotion in emotions:
-            positive = emotion.get('happy', 0) + emotion.get('neutral', 0)
-            negative = emotion.get('sad', 0) + emotion.get('anxious', 0) + emotion.get('stressed', 0) + emotion.get('angry', 0) + emotion.get('agitated', 0)
-            if positive > negative:
-                good_days += 1
+        # Days where positive emotions outweighed negative ones
+        good_days = mood_analytics.good_days(ctx.matrix)
         
         # Calculate streaks
-        current_streak = await calculate_current_streak(user_id)
+        current_streak = await calculate_current_streak(ctx)
         
         # Calculate mood stability (consistency in emotions)
-        mood_stability = await calculate_mood_stability(emotions)
+        mood_stability = await calculate_mood_stability(ctx.matrix)
         
         return {
-            "good_days": {
-                "count": good_days,
-                "total": total_analyzed_days,
-                "percentage": round((good_days / max(total_analyzed_days, 1)) * 100, 1)
-            },
+            "good_days": good_days,
             "journaling_streak": {
                 "current_days": current_streak,
                 "this_period": journal_count
@@ -364,24 +302,20 @@ async def get_progress_data(user_id: str, days: int) -> Dict[str, Any]:
             "total_entries": 0
         }
 
-async def calculate_current_streak(user_id: str) -> int:
+async def calculate_current_streak(ctx: DashboardContext) -> int:
     """Calculate current journaling streak"""
     try:
-        # Get journal entries using Supabase
-        journal_entries = journals_service.get_journal_entries_by_user(user_id)
-        
         # Get unique dates and sort
-        dates = sorted(set(e['journal_date'] for e in journal_entries), reverse=True)[:30]
+        dates = sorted(set(ctx.journal_dates), reverse=True)[:STREAK_LOOKBACK_DAYS]
         
         if not dates:
             return 0
         
         # Check for consecutive days from today backwards
         streak = 0
-        current_date = date.today()
+        current_date = ctx.end_date
         
-        for check_date_str in dates:
-            check_date = datetime.fromisoformat(check_date_str).date()
+        for check_date in dates:
             if check_date == current_date:
                 streak += 1
                 current_date -= timedelta(days=1)
@@ -394,79 +328,34 @@ async def calculate_current_streak(user_id: str) -> int:
         logger.error(f"[EmotionsAPI] Error calculating streak: {e}")
         return 0
 
-async def calculate_mood_stability(emotions) -> int:
+async def calculate_mood_stability(matrix: mood_analytics.EmotionMatrix) -> int:
     """Calculate mood stability percentage"""
     try:
-        if len(emotions) < 3:
-            return 85  # Default for insufficient data
-        
-        # Calculate variance in mood scores
-        mood_scores = []
-        for emotion in emotions:
-            positive = emotion.get('happy', 0) + emotion.get('neutral', 0)
-            negative = emotion.get('sad', 0) + emotion.get('anxious', 0) + emotion.get('stressed', 0) + emotion.get('angry', 0) + emotion.get('agitated', 0)
-            total = positive + negative
-            if total > 0:
-                mood_score = positive / total
-            else:
-                mood_score = 0.5
-            mood_scores.append(mood_score)
-        
-        # Calculate coefficient of variation (lower = more stable)
-        avg_mood = sum(mood_scores) / len(mood_scores)
-        variance = sum((x - avg_mood) ** 2 for x in mood_scores) / len(mood_scores)
-        std_dev = variance ** 0.5
-        
-        if avg_mood > 0:
-            cv = std_dev / avg_mood
-            # Convert to stability percentage (inverse of variation)
-            stability = max(0, min(100, (1 - cv) * 100))
-        else:
-            stability = 50
-        
-        return round(stability)
+        return mood_analytics.mood_stability(matrix)
         
     except Exception as e:
         logger.error(f"[EmotionsAPI] Error calculating mood stability: {e}")
         return 50
 
-async def get_journal_entries_count(user_id: str, days: int) -> Dict[str, Any]:
+async def get_journal_entries_count(ctx: DashboardContext) -> Dict[str, Any]:
     """Get journal entries statistics"""
     try:
-        # Get journal entries using Supabase
-        journal_entries = journals_service.get_journal_entries_by_user(user_id)
-        
         # Filter by date ranges
-        this_week_start = date.today() - timedelta(days=6)
-        period_start = date.today() - timedelta(days=days-1)
+        this_week_start = ctx.end_date - timedelta(days=6)
         
-        this_week_count = len([e for e in journal_entries if datetime.fromisoformat(e['journal_date']).date() >= this_week_start])
-        total_count = len([e for e in journal_entries if datetime.fromisoformat(e['journal_date']).date() >= period_start])
+        this_week_count = ctx.journal_count_since(this_week_start)
+        total_count = ctx.journal_count_since(ctx.start_date)
         
         return {
             "this_week": this_week_count,
             "total_period": total_count,
-            "average_per_week": round((total_count / max(days / 7, 1)), 1)
+            "average_per_week": round((total_count / max(ctx.days / 7, 1)), 1)
         }
         
     except Exception as e:
         logger.error(f"[EmotionsAPI] Error getting journal entries count: {e}")
         return {"this_week": 0, "total_period": 0, "average_per_week": 0}
 
-def get_dominant_emotion(emotion_row) -> str:
-    """Get the dominant emotion from an emotion row"""
-    emotions = {
-        "happy": emotion_row.get('happy', 0),
-        "sad": emotion_row.get('sad', 0),
-        "anxious": emotion_row.get('anxious', 0),
-        "stressed": emotion_row.get('stressed', 0),
-        "angry": emotion_row.get('angry', 0),
-        "agitated": emotion_row.get('agitated', 0),
-        "neutral": emotion_row.get('neutral', 0)
-    }
-    
-    return max(emotions.items(), key=lambda x: x[1])[0]
-
 @router.post("/analyze")
 async def trigger_emotion_analysis(
     user_id: Optional[str] = Query(None),
@@ -496,35 +385,86 @@ async def trigger_emotion_analysis(
         logger.error(f"[EmotionsAPI] ✗ Error triggering analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/summary/{user_id}")
+@router.get(
+    "/summary/{user_id}",
+    response_model=Union[List[SummaryBucket], List[MoodRollupRecord], ColumnarSummaryBuckets, ColumnarMoodRollups]
+)
 async def get_emotion_summary(
     user_id: str,
     start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None)
+    end_date: Optional[str] = Query(None),
+    bucket: Optional[str] = Query(None, pattern="^(day|week|month)$", description="Aggregate into day, week or month buckets"),
+    response_format: str = Query("rows", alias="format", pattern=RESPONSE_FORMAT_PATTERN, description="columnar sends parallel arrays instead of one object per row"),
+    request: Request = None,
+    response: Response = None
 ):
     """Get emotion summary for a user over a date range"""
     logger.info(f"[EmotionsAPI] GET summary for user: {user_id}, start_date: {start_date}, end_date: {end_date}")
     
     try:
-        # Get emotions using Supabase
-        emotions = emotions_service.get_emotions_by_user(user_id)
-        
-        # Filter by date range if provided
-        if start_date:
-            emotions = [e for e in emotions if e['journal_date'] >= start_date]
-        if end_date:
-            emotions = [e for e in emotions if e['journal_date'] <= end_date]
-        
-        emotions.sort(key=lambda x: x['journal_date'])
+        not_modified = await check_not_modified(request, response, user_id, start_date, end_date, bucket, response_format)
+        if not_modified is not None:
+            return not_modified
+
+        if bucket:
+            # Only the score columns are fetched; the output size depends on the bucket count, not the range
+            rows = await run_db(rollup_service.get_rollups_or_derive, user_id, start_date, end_date, projection="analytics")
+            buckets = mood_analytics.bucket_summary(mood_analytics.EmotionMatrix.from_rows(rows), bucket)
+            logger.info(f"[EmotionsAPI] ✓ Summarized {len(rows)} days into {len(buckets)} {bucket} buckets")
+            return columnar.columnar_buckets(buckets) if response_format == "columnar" else buckets
+
+        # One row per day from daily_mood_rollup (see MoodRollupRecord), filtered and sorted by the database
+        emotions = await run_db(rollup_service.get_rollups_or_derive, user_id, start_date, end_date, projection="full")
         
         logger.info(f"[EmotionsAPI] Found {len(emotions)} emotion records for summary")
         logger.info(f"[EmotionsAPI] ✓ Successfully retrieved emotion summary")
-        return emotions
+        return columnar.columnar_rollups(emotions) if response_format == "columnar" else emotions
         
     except Exception as e:
         logger.error(f"[EmotionsAPI] ✗ Error getting emotion summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/similar/{user_id}", response_model=SimilarDaysData)
+async def get_similar_days(
+    user_id: str,
+    day: Optional[str] = Query(None, alias="date", description="Journal date (YYYY-MM-DD), defaults to today"),
+    limit: int = Query(5, ge=1, le=50)
+):
+    """Get the user's past days whose conversations are most similar to a given day"""
+    logger.info(f"[EmotionsAPI] GET similar days for user: {user_id}, date: {day}")
+    
+    try:
+        target_date = date.fromisoformat(day) if day else date.today()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    
+    try:
+        data_version = await run_db(get_journal_token, user_id)
+        matches = await run_db(
+            similar_days_index.similar_days, user_id, str(target_date), limit, journals_service.get_search_documents, data_version
+        )
+        if matches is None:
+            raise HTTPException(status_code=404, detail="No journal entries for this day")
+        
+        rollups = await run_db(
+            rollup_service.get_rollups_or_derive, user_id, min(d for d, _ in matches), projection="analytics", dates=[d for d, _ in matches]
+        ) if matches else []
+        scores = {str(row["journal_date"])[:10]: {column: row.get(column) for column in mood_analytics.EMOTION_COLUMNS} for row in rollups}
+        
+        logger.info(f"[EmotionsAPI] ✓ Found {len(matches)} similar days")
+        return {
+            "date": str(target_date),
+            "similar_days": [
+                {"date": d, "similarity": round(similarity, 4), "emotions": scores.get(d)}
+                for d, similarity in matches
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"[EmotionsAPI] ✗ Error getting similar days: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Health check endpoint for emotions
 @router.get("/health")
 async def emotions_health_check():
@@ -538,6 +478,8 @@ async def emotions_health_check():
         result = {
             "status": "healthy",
             "scheduler_running": scheduler_status,
+            "dashboard_cache": dashboard_cache.stats(),
+            "mood_rollup": rollup_service.stats(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -1,24 +1,54 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response, BackgroundTasks
+from pydantic import ValidationError
 from typing import List, Optional
+from datetime import date
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from ..schemas.journal_schemas import JournalEntryCreate, JournalEntry
+from ..schemas.journal_schemas import JournalEntryCreate, JournalEntry, JournalEntryBulkCreate
+from ..services.base_service import run_db
+from ..services.pagination import InvalidCursor, NEXT_CURSOR_HEADER
 from ..services.journals_service import journals_service
+from ..services.data_version import record_journal_write
+from ..tasks.emotion_scheduler import emotion_scheduler
+from ..tasks.entry_analysis import entry_analysis_queue
 router = APIRouter(prefix="/journal-entries", tags=["journal_entries"])
 
+def queue_entry_analysis(user_id: str, journal_date):
+    """Have the written entry's day re-analyzed in the background"""
+    try:
+        entry_analysis_queue.enqueue(user_id, date.fromisoformat(str(journal_date)[:10]))
+    except ValueError:
+        pass
+
 @router.get("/", response_model=List[dict])
-async def get_journal_entries(user_id: Optional[str] = Query(None)):
-    """Get all journal entries or filter by user_id"""
+async def get_journal_entries(
+    response: Response,
+    user_id: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page")
+):
+    """Get all journal entries or filter by user_id and date range"""
     try:
-        if user_id:
-            entries = journals_service.get_journal_entries_by_user(user_id)
-            return entries
-        else:
-            # Get all entries using Supabase
-            client = journals_service.client
-            result = client.table("journal_entry").select("*").order("journal_date", desc=True).execute()
-            return result.data or []
+        if user_id and limit is None and cursor is None:
+            # A user's full history, as before pagination
+            return await run_db(
+                journals_service.get_journal_entries_in_range,
+                user_id, start_date, end_date, projection="full", descending=True
+            )
+        
+        # Unfiltered listings are always paged so they never scan the whole table
+        entries, next_cursor = await run_db(
+            journals_service.get_journal_entries_page,
+            user_id, start_date, end_date, limit=limit, cursor=cursor, projection="full"
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return entries
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -34,7 +64,8 @@ async def create_journal_entry(entry: JournalEntryCreate):
             "episode_flag": entry.episode_flag if entry.episode_flag is not None else 0
         }
         
-        created_entry = journals_service.create_journal_entry(entry_data)
+        created_entry = await run_db(journals_service.create_journal_entry, entry_data)
+        queue_entry_analysis(entry.user_id, entry.journal_date)
         
         return {
             "entry_id": created_entry.get("entry_id"),
@@ -47,11 +78,85 @@ async def create_journal_entry(entry: JournalEntryCreate):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=dict)
+async def import_journal_entries(bulk: JournalEntryBulkCreate, background_tasks: BackgroundTasks):
+    """Import many journal entries at once, reporting errors per item"""
+    errors = []
+    valid_rows = []
+    valid_indexes = []
+    for index, item in enumerate(bulk.entries):
+        try:
+            entry = JournalEntryCreate(**item)
+            date.fromisoformat(entry.journal_date)
+        except (ValidationError, ValueError, TypeError) as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        valid_indexes.append(index)
+        valid_rows.append({
+            "user_id": entry.user_id,
+            "entry_text": entry.entry_text,
+            "AI_response": entry.AI_response if entry.AI_response is not None else "",
+            "journal_date": entry.journal_date,
+            "episode_flag": entry.episode_flag if entry.episode_flag is not None else 0
+        })
+    
+    try:
+        created_rows, insert_errors = await run_db(journals_service.create_journal_entries, valid_rows)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    created = []
+    user_days = set()
+    for position, (index, row) in enumerate(zip(valid_indexes, created_rows)):
+        if position in insert_errors:
+            errors.append({"index": index, "error": insert_errors[position]})
+        elif row:
+            created.append({"index": index, "entry_id": row.get("entry_id")})
+            user_days.add((valid_rows[position]["user_id"], valid_rows[position]["journal_date"]))
+    errors.sort(key=lambda error: error["index"])
+    
+    # Analyze every imported day in one background batch once the response is sent
+    if bulk.analyze and user_days:
+        pairs = sorted((user_id, date.fromisoformat(journal_date)) for user_id, journal_date in user_days)
+        background_tasks.add_task(emotion_scheduler.analyze_user_days, pairs)
+    
+    return {
+        "created": len(created),
+        "failed": len(errors),
+        "entries": created,
+        "errors": errors,
+        "analysis_queued": len(user_days) if bulk.analyze else 0
+    }
+
+@router.get("/search", response_model=List[dict])
+async def search_journal_entries(
+    response: Response,
+    user_id: str = Query(...),
+    q: str = Query(..., min_length=1, max_length=500),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page")
+):
+    """Search a user's journal entries and AI responses, best match first"""
+    try:
+        entries, next_cursor = await run_db(
+            journals_service.search_journal_entries,
+            user_id, q, start_date, end_date, limit=limit, cursor=cursor, projection="full"
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return entries
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{entry_id}", response_model=dict)
 async def get_journal_entry(entry_id: int):
     """Get a specific journal entry by ID"""
     try:
-        entry = journals_service.get_journal_entry_by_id(entry_id)
+        entry = await run_db(journals_service.get_journal_entry_by_id, entry_id, projection="full")
         
         if not entry:
             raise HTTPException(status_code=404, detail="Journal entry not found")
@@ -67,7 +172,7 @@ async def update_journal_entry(entry_id: int, entry_update: JournalEntryCreate):
     """Update a journal entry"""
     try:
         # Check if entry exists
-        existing_entry = journals_service.get_journal_entry_by_id(entry_id)
+        existing_entry = await run_db(journals_service.get_journal_entry_by_id, entry_id, projection="dates")
         if not existing_entry:
             raise HTTPException(status_code=404, detail="Journal entry not found")
         
@@ -79,7 +184,14 @@ async def update_journal_entry(entry_id: int, entry_update: JournalEntryCreate):
             "episode_flag": entry_update.episode_flag or 0
         }
         
-        journals_service.update_journal_entry(entry_id, entry_data)
+        await run_db(journals_service.update_journal_entry, entry_id, entry_data)
+        # Both the day the entry left and the day it is on now need new scores
+        queue_entry_analysis(existing_entry.get("user_id"), existing_entry.get("journal_date"))
+        queue_entry_analysis(entry_update.user_id, entry_update.journal_date)
+        
+        # The update already recorded a write for the new owner; if the entry moved, the previous owner's data changed too
+        if str(existing_entry.get("user_id")) != str(entry_update.user_id):
+            await run_db(record_journal_write, existing_entry.get("user_id"))
         return {"message": "Journal entry updated successfully"}
     except HTTPException:
         raise
@@ -91,12 +203,13 @@ async def delete_journal_entry(entry_id: int):
     """Delete a journal entry"""
     try:
         # First check if entry exists
-        existing_entry = journals_service.get_journal_entry_by_id(entry_id)
+        existing_entry = await run_db(journals_service.get_journal_entry_by_id, entry_id, projection="dates")
         if not existing_entry:
             raise HTTPException(status_code=404, detail="Journal entry not found")
         
         # Delete the entry
-        journals_service.delete_journal_entry(entry_id)
+        await run_db(journals_service.delete_journal_entry, entry_id)
+        queue_entry_analysis(existing_entry.get("user_id"), existing_entry.get("journal_date"))
         
         return {"message": "Journal entry deleted successfully"}
     except HTTPException:
@@ -9,6 +9,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+from ..services.base_service import run_db
 from ..services.users_service import users_service
 import logging
 
@@ -53,10 +54,12 @@ async def activate_plan(request: PlanActivationRequest):
         
         # Check if user exists - only select columns that exist in the database
         try:
-            response = users_service.client.table("user") \
-                .select("user_id, subscription_tier, subscription_expires_at, monthly_entries_count") \
-                .eq("user_id", request.user_id) \
-                .execute()
+            response = await run_db(
+                users_service.client.table("user")
+                .select("user_id, subscription_tier, subscription_expires_at, monthly_entries_count")
+                .eq("user_id", request.user_id)
+                .execute
+            )
         except Exception as db_error:
             logger.error(f"[Plans API] Database error checking user: {db_error}")
             raise HTTPException(
@@ -118,10 +121,12 @@ async def activate_plan(request: PlanActivationRequest):
         # Update user in Supabase
         try:
             logger.info(f"[Plans API] Updating user with data: {update_data}")
-            response = users_service.client.table("user") \
-                .update(update_data) \
-                .eq("user_id", request.user_id) \
-                .execute()
+            response = await run_db(
+                users_service.client.table("user")
+                .update(update_data)
+                .eq("user_id", request.user_id)
+                .execute
+            )
         except Exception as db_error:
             logger.error(f"[Plans API] Database error updating user: {db_error}")
             raise HTTPException(
@@ -208,10 +213,12 @@ async def get_user_plan(user_id: str):
     """
     try:
         # Only select columns that exist in the database
-        response = users_service.client.table("user") \
-            .select("subscription_tier, subscription_expires_at, monthly_entries_count") \
-            .eq("user_id", user_id) \
-            .execute()
+        response = await run_db(
+            users_service.client.table("user")
+            .select("subscription_tier, subscription_expires_at, monthly_entries_count")
+            .eq("user_id", user_id)
+            .execute
+        )
         
         if not response.data:
             raise HTTPException(status_code=404, detail="User not found")
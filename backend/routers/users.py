@@ -1,25 +1,37 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from ..schemas.user_schemas import UserCreate, User
+from ..services.base_service import run_db
+from ..services.pagination import InvalidCursor, NEXT_CURSOR_HEADER
 from ..services.users_service import users_service
+from ..services.history_export import export_history, EXPORT_FORMATS
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/", response_model=List[dict])
-async def get_users(email: Optional[str] = Query(None)):
+async def get_users(
+    response: Response,
+    email: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page")
+):
     """Get all users or filter by email"""
     try:
         if email:
-            user = users_service.get_user_by_email(email)
+            user = await run_db(users_service.get_user_by_email, email, projection="full")
             return [user] if user else []
         else:
-            # Get all users using Supabase
-            client = users_service.client
-            result = client.table("user").select("*").execute()
-            return result.data or []
+            # Page through users by user_id instead of returning the whole table
+            users, next_cursor = await run_db(users_service.get_users_page, limit=limit, cursor=cursor, projection="full")
+            if next_cursor:
+                response.headers[NEXT_CURSOR_HEADER] = next_cursor
+            return users
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -42,7 +54,7 @@ async def create_user(user: UserCreate):
             "diagnosis_status": user.diagnosis_status
         }
         
-        created_user = users_service.create_user(user_data)
+        created_user = await run_db(users_service.create_user, user_data)
         
         return {
             "user_id": user.user_id,
@@ -56,7 +68,7 @@ async def create_user(user: UserCreate):
 async def get_user(user_id: str):
     """Get a specific user by ID"""
     try:
-        user = users_service.get_user_by_id(user_id)
+        user = await run_db(users_service.get_user_by_id, user_id, projection="full")
         
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
@@ -67,12 +79,34 @@ async def get_user(user_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{user_id}/export")
+async def export_user_history(
+    user_id: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv")
+):
+    """Stream a user's full journal and emotion history"""
+    try:
+        user = await run_db(users_service.get_user_by_id, user_id, projection="exists")
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    filename = f"history-{user_id}.{export_format}"
+    return StreamingResponse(
+        export_history(user_id, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.put("/{user_id}", response_model=dict)
 async def update_user(user_id: str, user_update: UserCreate):
     """Update a user"""
     try:
         # Check if user exists
-        existing_user = users_service.get_user_by_id(user_id)
+        existing_user = await run_db(users_service.get_user_by_id, user_id, projection="exists")
         if not existing_user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -90,7 +124,7 @@ async def update_user(user_id: str, user_update: UserCreate):
             "diagnosis_status": user_update.diagnosis_status
         }
         
-        users_service.update_user(user_id, user_data)
+        await run_db(users_service.update_user, user_id, user_data)
         return {"message": "User updated successfully"}
     except HTTPException:
         raise
@@ -102,12 +136,12 @@ async def delete_user(user_id: str):
     """Delete a user"""
     try:
         # First check if user exists
-        existing_user = users_service.get_user_by_id(user_id)
+        existing_user = await run_db(users_service.get_user_by_id, user_id, projection="exists")
         if not existing_user:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Delete the user
-        users_service.delete_user(user_id)
+        await run_db(users_service.delete_user, user_id)
         
         return {"message": "User deleted successfully"}
     except HTTPException:
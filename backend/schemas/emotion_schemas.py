@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, validator
+from typing import Optional, Dict, Any, List, Union
 from datetime import date
 
 class EmotionBase(BaseModel):
@@ -21,25 +21,173 @@ class EmotionResponse(EmotionBase):
     class Config:
         from_attributes = True
 
-class DashboardData(BaseModel):
-    mood_improvement: Dict[str, Any]
-    mood_journey: Dict[str, Any]
-    emotional_landscape: Dict[str, Any]
-    progress: Dict[str, Any]
-    journal_entries: Dict[str, Any]
-    period: Dict[str, Any]
+# Scores keep their int/float type on the way out (smart union), so responses match the computed payload
+Number = Union[int, float]
 
 class MoodImprovementData(BaseModel):
-    percentage: float
+    percentage: Number
     trend: str
     message: str
     days_compared: int
 
+class DailyMood(BaseModel):
+    date: str
+    mood_score: Number
+    dominant_emotion: str
+    emotions: Dict[str, int]
+
+class MoodStatistics(BaseModel):
+    average_mood: Number
+    lowest_mood: Number
+    highest_mood: Number
+    total_days: int
+
+class MoodJourneyData(BaseModel):
+    daily_moods: List[DailyMood]
+    statistics: MoodStatistics
+
 class EmotionalLandscapeItem(BaseModel):
     name: str
-    percentage: float
+    percentage: Number
     color: str
 
 class EmotionalLandscapeData(BaseModel):
     emotions: List[EmotionalLandscapeItem]
     dominant_emotion: str
+
+class GoodDaysData(BaseModel):
+    count: int
+    total: int
+    percentage: Number
+
+class JournalingStreakData(BaseModel):
+    current_days: int
+    this_period: int
+
+class MoodStabilityData(BaseModel):
+    percentage: Number
+    status: str
+
+class ProgressData(BaseModel):
+    good_days: GoodDaysData
+    journaling_streak: JournalingStreakData
+    mood_stability: MoodStabilityData
+    total_entries: int
+
+class JournalEntriesStats(BaseModel):
+    this_week: int
+    total_period: int
+    average_per_week: Number
+
+class DashboardPeriod(BaseModel):
+    start_date: str
+    end_date: str
+    days: int
+
+class DashboardData(BaseModel):
+    mood_improvement: MoodImprovementData
+    mood_journey: MoodJourneyData
+    emotional_landscape: EmotionalLandscapeData
+    progress: ProgressData
+    journal_entries: JournalEntriesStats
+    period: DashboardPeriod
+
+class MoodRollupRecord(BaseModel):
+    """One daily_mood_rollup row as returned by /emotions/summary"""
+    user_id: str
+    journal_date: str
+    entry_id: Optional[int] = None
+    happy: int = 0
+    stressed: int = 0
+    anxious: int = 0
+    angry: int = 0
+    sad: int = 0
+    agitated: int = 0
+    neutral: int = 0
+    positive: Optional[int] = None
+    negative: Optional[int] = None
+    mood_score: Optional[Number] = None
+    dominant_emotion: Optional[str] = None
+    updated_at: Optional[str] = None
+
+    class Config:
+        extra = "allow"
+
+class BucketStats(BaseModel):
+    mean: float
+    min: Number
+    max: Number
+
+class SummaryBucket(BaseModel):
+    """Aggregated summary rows returned by /emotions/summary with ?bucket="""
+    bucket_start: str
+    count: int
+    emotions: Dict[str, BucketStats]
+    mood_score: BucketStats
+
+class ColumnarDailyMoods(BaseModel):
+    """daily_moods as parallel arrays; day i is base_date + day_offsets[i]"""
+    base_date: Optional[str] = None
+    day_offsets: List[int]
+    emotion_names: List[str]
+    mood_scores: List[Number]
+    dominant_emotions: List[Optional[int]]
+    emotions: Dict[str, List[int]]
+
+class ColumnarMoodJourneyData(BaseModel):
+    daily_moods: ColumnarDailyMoods
+    statistics: MoodStatistics
+
+class ColumnarDashboardData(DashboardData):
+    """Dashboard returned with ?format=columnar"""
+    mood_journey: ColumnarMoodJourneyData
+
+class ColumnarMoodRollups(BaseModel):
+    """Daily summary returned with ?format=columnar"""
+    base_date: Optional[str] = None
+    day_offsets: List[int]
+    emotion_names: List[str]
+    emotions: Dict[str, List[int]]
+    mood_scores: List[Optional[Number]]
+    dominant_emotions: List[Optional[int]]
+    positive: List[Optional[int]]
+    negative: List[Optional[int]]
+
+class ColumnarBucketStats(BaseModel):
+    mean: List[float]
+    min: List[Number]
+    max: List[Number]
+
+class ColumnarSummaryBuckets(BaseModel):
+    """Bucketed summary returned with ?bucket=...&format=columnar"""
+    bucket_starts: List[str]
+    counts: List[int]
+    emotions: Dict[str, ColumnarBucketStats]
+    mood_score: ColumnarBucketStats
+
+class SimilarDay(BaseModel):
+    date: str
+    similarity: float
+    emotions: Optional[Dict[str, Number]] = None
+
+class SimilarDaysData(BaseModel):
+    date: str
+    similar_days: List[SimilarDay]
+
+class DashboardBatchRequest(BaseModel):
+    user_ids: List[str]
+    days: int = 30
+
+    @validator('user_ids')
+    def validate_user_ids(cls, v):
+        if not v:
+            raise ValueError('At least one user_id is required')
+        if len(v) > 1000:
+            raise ValueError('At most 1000 users per batch')
+        return v
+
+    @validator('days')
+    def validate_days(cls, v):
+        if v < 1:
+            raise ValueError('days must be at least 1')
+        return v
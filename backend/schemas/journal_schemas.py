@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, validator
+from typing import Optional, List, Dict, Any
 
 class JournalEntryBase(BaseModel):
     user_id: str
@@ -14,4 +14,17 @@ class JournalEntryCreate(JournalEntryBase):
 class JournalEntry(JournalEntryBase):
     entry_id: int
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class JournalEntryBulkCreate(BaseModel):
+    # Items are validated one by one so a bad entry is reported instead of failing the batch
+    entries: List[Dict[str, Any]]
+    analyze: bool = False
+
+    @validator('entries')
+    def validate_entries(cls, v):
+        if not v:
+            raise ValueError('At least one entry is required')
+        if len(v) > 10000:
+            raise ValueError('At most 10000 entries per import')
+        return v
@@ -0,0 +1,162 @@
+"""
+Persistent cache of emotion analysis results.
+
+Results are keyed by a hash of the model, the prompt version and the
+normalized conversation text, so the same conversation is only ever sent to
+Gemini once: manual re-analysis, catch-up runs after a failed save and the
+startup health check are answered locally. The store is a local SQLite file
+that survives restarts; once it holds more than ANALYSIS_CACHE_MAX_ENTRIES
+results the least recently used ones are evicted.
+
+Every method does blocking file I/O: call them from async code through
+run_db, and use get_many/set_many to look up or store a batch at once.
+"""
+
+from typing import Optional, Dict, Any, Iterable
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import logging
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_PATH = os.getenv(
+    "ANALYSIS_CACHE_PATH",
+    str(Path(__file__).resolve().parent.parent / ".cache" / "analysis_cache.sqlite3")
+)
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 100000))
+# Eviction runs once per this many writes rather than on every insert
+EVICTION_CHECK_INTERVAL = 100
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Conversation text with Unicode and whitespace differences removed"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+def cache_key(conversation_text: str, model: str, prompt_version: str) -> str:
+    payload = f"{model}\n{prompt_version}\n{normalize_text(conversation_text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AnalysisCache:
+    """SQLite-backed map from conversation hash to emotion scores, with LRU eviction by entry count"""
+
+    def __init__(self, path: str = ANALYSIS_CACHE_PATH, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached scores for a key, or None"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached scores for every key that has them, in one query"""
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                found: Dict[str, Dict[str, Any]] = {}
+                # Stay below SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    for key, scores in conn.execute(f"SELECT key, scores FROM analysis_cache WHERE key IN ({placeholders})", chunk):
+                        found[key] = json.loads(scores)
+                if found:
+                    now = time.time()
+                    conn.executemany("UPDATE analysis_cache SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+                    conn.commit()
+                self.hits += len(found)
+                self.misses += len(keys) - len(found)
+                return found
+        except (sqlite3.Error, ValueError) as e:
+            # A broken cache must never stop an analysis; it just costs an API call
+            logger.warning(f"[AnalysisCache] ⚠️ Lookup failed: {e}")
+            return {}
+
+    def set(self, key: str, scores: Dict[str, Any]):
+        """Store scores for a key, evicting the least recently used entries past the size bound"""
+        self.set_many({key: scores})
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]):
+        """Store several results in one transaction"""
+        if not self.enabled or not items:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_cache (key, scores, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    [(key, json.dumps(scores), now, now) for key, scores in items.items()]
+                )
+                previous = self._writes
+                self._writes += len(items)
+                if self._writes // EVICTION_CHECK_INTERVAL != previous // EVICTION_CHECK_INTERVAL:
+                    self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"[AnalysisCache] ⚠️ Store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        size = 0
+        if self.enabled:
+            try:
+                with self._lock:
+                    size = self._connect().execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        return {"size": size, "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the store on first use; caller holds the lock"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, scores TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS analysis_cache_last_used ON analysis_cache (last_used)")
+            conn.commit()
+            self._conn = conn
+            self._evict(conn)
+            conn.commit()
+        return self._conn
+
+    def _evict(self, conn: sqlite3.Connection):
+        excess = conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN (SELECT key FROM analysis_cache ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            logger.info(f"[AnalysisCache] Evicted {excess} least recently used results")
+
+# Create singleton instance
+analysis_cache = AnalysisCache()
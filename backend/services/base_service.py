@@ -1,10 +1,51 @@
-from typing import Dict, Any, Union
+from typing import Dict, Any, List, Union, Callable, TypeVar, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
 from backend.services.supabase_client import get_supabase_client
 from supabase import Client
+import asyncio
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# supabase-py and SQLAlchemy are synchronous; async code runs their calls on this
+# bounded pool so network I/O never blocks the event loop
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", 16))
+
+# PostgREST caps each response (Supabase defaults to 1000 rows), so bulk reads page through results
+PAGE_SIZE = int(os.getenv("SUPABASE_PAGE_SIZE", 1000))
+# Values per in_() filter; every value goes into the request URL, so long lists are split across requests
+IN_FILTER_CHUNK_SIZE = int(os.getenv("SUPABASE_IN_CHUNK_SIZE", 100))
+# Created on first use and again after a shutdown, so an app started twice in one
+# process (tests, reloads) gets a live pool each time
+_db_executor: Optional[ThreadPoolExecutor] = None
+_db_executor_lock = threading.Lock()
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """The database worker pool, created if there is none"""
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is None:
+            _db_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db")
+        return _db_executor
+
+async def run_db(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking database call on the worker pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    """Stop the database worker pool (called on application shutdown); the next run_db starts a new one"""
+    global _db_executor
+    with _db_executor_lock:
+        executor, _db_executor = _db_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 class BaseService:
     def __init__(self):
         try:
@@ -25,3 +66,32 @@ class BaseService:
         error_msg = f"Error {operation}: {str(error)}"
         logger.error(f"[{self.__class__.__name__}] {error_msg}")
         raise Exception(error_msg)
+    
+    def _fetch_all_pages(self, build_query: Callable[[], Any], page_size: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+        """Run an ordered select page by page and return every row"""
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = build_query().range(offset, offset + page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            offset += page_size
+    
+    def _fetch_in_chunks(
+        self,
+        build_query: Callable[[List[Any]], Any],
+        values: Iterable[Any],
+        chunk_size: int = IN_FILTER_CHUNK_SIZE
+    ) -> List[Dict[str, Any]]:
+        """Run an ordered select filtered by in_(chunk) for each chunk of the values and return every row.
+
+        Values are deduplicated and sorted first, so a query ordered by the
+        filtered column returns rows in that order across chunks too.
+        """
+        values = sorted(dict.fromkeys(values), key=str)
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            rows.extend(self._fetch_all_pages(lambda: build_query(chunk)))
+        return rows
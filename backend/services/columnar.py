@@ -0,0 +1,75 @@
+"""
+Columnar ("format=columnar") variants of the dashboard and summary payloads.
+
+The row format repeats every key for every day. The columnar format sends
+one array per field instead: dates as day offsets from a base date, mood
+scores, the dominant emotion as an index into `emotion_names`, and one
+small-int array per emotion. Day i of the period is base_date + day_offsets[i].
+"""
+
+from typing import Dict, Any, List, Optional
+from datetime import date
+from backend.services.mood_analytics import EMOTION_COLUMNS
+
+RESPONSE_FORMATS = ("rows", "columnar")
+
+_EMOTION_INDEX = {name: i for i, name in enumerate(EMOTION_COLUMNS)}
+
+def _date_columns(dates: List[Any]) -> Dict[str, Any]:
+    """Base date and per-row day offsets from it"""
+    if not dates:
+        return {"base_date": None, "day_offsets": []}
+    ordinals = [date.fromisoformat(str(d)[:10]).toordinal() for d in dates]
+    base = ordinals[0]
+    return {
+        "base_date": date.fromordinal(base).isoformat(),
+        "day_offsets": [ordinal - base for ordinal in ordinals]
+    }
+
+def _emotion_index(name: Optional[str]) -> Optional[int]:
+    return _EMOTION_INDEX.get(name) if name is not None else None
+
+def columnar_daily_moods(daily_moods: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """mood_journey.daily_moods as parallel arrays"""
+    return {
+        **_date_columns([day["date"] for day in daily_moods]),
+        "emotion_names": list(EMOTION_COLUMNS),
+        "mood_scores": [day["mood_score"] for day in daily_moods],
+        "dominant_emotions": [_emotion_index(day["dominant_emotion"]) for day in daily_moods],
+        "emotions": {name: [day["emotions"].get(name, 0) for day in daily_moods] for name in EMOTION_COLUMNS}
+    }
+
+def columnar_dashboard(dashboard: Dict[str, Any]) -> Dict[str, Any]:
+    """Dashboard payload with the mood journey's daily points as columns; other sections are unchanged"""
+    mood_journey = dashboard["mood_journey"]
+    return {
+        **dashboard,
+        "mood_journey": {
+            "daily_moods": columnar_daily_moods(mood_journey["daily_moods"]),
+            "statistics": mood_journey["statistics"]
+        }
+    }
+
+def columnar_rollups(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Daily summary rows (oldest first) as parallel arrays"""
+    return {
+        **_date_columns([row["journal_date"] for row in rows]),
+        "emotion_names": list(EMOTION_COLUMNS),
+        "emotions": {name: [row.get(name) or 0 for row in rows] for name in EMOTION_COLUMNS},
+        "mood_scores": [row.get("mood_score") for row in rows],
+        "dominant_emotions": [_emotion_index(row.get("dominant_emotion")) for row in rows],
+        "positive": [row.get("positive") for row in rows],
+        "negative": [row.get("negative") for row in rows]
+    }
+
+def columnar_buckets(buckets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bucketed summary as parallel arrays, one mean/min/max triple of arrays per emotion"""
+    def stats(get) -> Dict[str, List[Any]]:
+        return {stat: [get(bucket)[stat] for bucket in buckets] for stat in ("mean", "min", "max")}
+
+    return {
+        "bucket_starts": [bucket["bucket_start"] for bucket in buckets],
+        "counts": [bucket["count"] for bucket in buckets],
+        "emotions": {name: stats(lambda bucket: bucket["emotions"][name]) for name in EMOTION_COLUMNS},
+        "mood_score": stats(lambda bucket: bucket["mood_score"])
+    }
@@ -0,0 +1,96 @@
+from typing import Optional, Dict, Any, Tuple, Set
+from collections import OrderedDict
+from datetime import date
+import threading
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", 1024))
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", 300))
+
+CacheKey = Tuple[str, int, date]
+
+class DashboardCache:
+    """In-process LRU cache of dashboard payloads with a TTL, invalidated per user on writes.
+
+    Writes made by another worker do not reach this cache, so a payload can
+    be stored with the user's data version and is only served for that version.
+    """
+
+    def __init__(self, max_size: int = DASHBOARD_CACHE_SIZE, ttl_seconds: float = DASHBOARD_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Optional[str], Dict[str, Any]]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(user_id: str, days: int, today: Optional[date] = None) -> CacheKey:
+        return (str(user_id), int(days), today or date.today())
+
+    def get(self, user_id: str, days: int, today: Optional[date] = None, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return a cached payload, or None if missing, expired or built for another data version"""
+        key = self.make_key(user_id, days, today)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, stored_version, payload = entry
+            if time.monotonic() - stored_at > self.ttl_seconds or (version is not None and stored_version != version):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def set(self, user_id: str, days: int, payload: Dict[str, Any], today: Optional[date] = None, version: Optional[str] = None):
+        """Store a payload, evicting the least recently used entries past the size bound"""
+        if self.max_size <= 0:
+            return
+        key = self.make_key(user_id, days, today)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), version, payload)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_user(self, user_id: Optional[str]):
+        """Drop every cached payload for a user"""
+        if not user_id:
+            return
+        with self._lock:
+            keys = self._keys_by_user.pop(str(user_id), set())
+            for key in keys:
+                self._entries.pop(key, None)
+        if keys:
+            logger.info(f"[DashboardCache] Invalidated {len(keys)} cached dashboards for user {user_id}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key: CacheKey):
+        """Remove one entry; caller holds the lock"""
+        self._entries.pop(key, None)
+        user_keys = self._keys_by_user.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[key[0]]
+
+# Create singleton instance
+dashboard_cache = DashboardCache()
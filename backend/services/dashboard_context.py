@@ -0,0 +1,138 @@
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timedelta
+import asyncio
+from backend.services.base_service import run_db
+from backend.services.rollup_service import rollup_service
+from backend.services.journals_service import journals_service
+from backend.services.mood_analytics import EmotionMatrix
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The journaling streak looks back at most this many distinct days
+STREAK_LOOKBACK_DAYS = 30
+
+class DashboardContext:
+    """Rows needed to build one dashboard, fetched once and parsed once"""
+
+    def __init__(self, user_id: str, days: int, today: Optional[date] = None):
+        self.user_id = user_id
+        self.days = days
+        self.end_date = today or date.today()
+        self.start_date = self.end_date - timedelta(days=days-1)
+
+        # Daily mood rollup rows in the window, oldest first, with parsed dates alongside
+        self.emotions: List[Dict[str, Any]] = []
+        self.emotion_dates: List[date] = []
+
+        # Parsed journal dates (one per entry) covering the window and the streak lookback
+        self.journal_dates: List[date] = []
+
+        self._matrix: Optional[EmotionMatrix] = None
+
+    @property
+    def matrix(self) -> EmotionMatrix:
+        """Window emotions as a (days x 7) array, built on first use"""
+        if self._matrix is None:
+            self._matrix = EmotionMatrix.from_rows(self.emotions, self.emotion_dates)
+        return self._matrix
+
+    @property
+    def fetch_start(self) -> date:
+        """Earliest date any dashboard section needs"""
+        return min(self.start_date, self.end_date - timedelta(days=STREAK_LOOKBACK_DAYS - 1))
+
+    async def load(self) -> "DashboardContext":
+        """Fetch each table once for the requested window, concurrently"""
+        logger.info(f"[DashboardContext] Loading rows for user {self.user_id} since {self.fetch_start}")
+
+        emotion_rows, journal_rows = await asyncio.gather(
+            # Precomputed per-day rows instead of raw emotion records
+            run_db(rollup_service.get_rollups_by_user, self.user_id, self.start_date.isoformat(), projection="analytics"),
+            run_db(
+                journals_service.get_journal_entries_in_range,
+                self.user_id, start_date=self.fetch_start.isoformat(), projection="dates"
+            )
+        )
+
+        if not emotion_rows or rollup_service.has_failed(self.user_id):
+            # History not backfilled yet, or a rollup write failed: derive the rows from emotions
+            logger.info(f"[DashboardContext] Reading emotions for user {self.user_id} instead of mood rollups")
+            emotion_rows = await run_db(rollup_service.derive_rollups_for_users, [self.user_id], self.start_date.isoformat())
+
+        return self.set_rows(emotion_rows, journal_rows)
+
+    def set_rows(self, emotion_rows: List[Dict[str, Any]], journal_rows: List[Dict[str, Any]]) -> "DashboardContext":
+        """Parse already-fetched rows into the context"""
+        emotion_rows = sorted(emotion_rows, key=lambda x: x['journal_date'])
+        self.emotions = []
+        self.emotion_dates = []
+        self._matrix = None
+        for row in emotion_rows:
+            row_date = datetime.fromisoformat(row['journal_date']).date()
+            if row_date >= self.start_date:
+                self.emotions.append(row)
+                self.emotion_dates.append(row_date)
+
+        self.journal_dates = [datetime.fromisoformat(row['journal_date']).date() for row in journal_rows]
+
+        logger.info(f"[DashboardContext] Loaded {len(self.emotions)} emotion rows and {len(self.journal_dates)} journal rows")
+        return self
+
+    def journal_count_since(self, since: date) -> int:
+        """Number of journal entries dated on or after `since`"""
+        return sum(1 for d in self.journal_dates if d >= since)
+
+async def load_dashboard_context(user_id: str, days: int) -> DashboardContext:
+    """Build and populate a dashboard context for one request"""
+    return await DashboardContext(user_id, days).load()
+
+async def load_dashboard_contexts(user_ids: List[str], days: int) -> Dict[str, DashboardContext]:
+    """Build contexts for many users with one query per table and one shared emotion matrix"""
+    contexts = {user_id: DashboardContext(user_id, days) for user_id in dict.fromkeys(user_ids)}
+    if not contexts:
+        return contexts
+    template = next(iter(contexts.values()))
+
+    logger.info(f"[DashboardContext] Loading rows for {len(contexts)} users since {template.fetch_start}")
+
+    emotion_rows, journal_rows = await asyncio.gather(
+        run_db(rollup_service.get_rollups_for_users, list(contexts), template.start_date.isoformat(), projection="analytics"),
+        run_db(
+            journals_service.get_journal_entries_for_users,
+            list(contexts), start_date=template.fetch_start.isoformat(), projection="dates"
+        )
+    )
+
+    with_rollups = {row['user_id'] for row in emotion_rows}
+    fallback = [user_id for user_id in contexts if user_id not in with_rollups or rollup_service.has_failed(user_id)]
+    if fallback:
+        # History not backfilled yet, or a rollup write failed: derive those users' rows from emotions
+        logger.info(f"[DashboardContext] Reading emotions for {len(fallback)} users instead of mood rollups")
+        derived = await run_db(rollup_service.derive_rollups_for_users, fallback, template.start_date.isoformat())
+        skipped = set(fallback)
+        emotion_rows = sorted(
+            [row for row in emotion_rows if row['user_id'] not in skipped] + derived,
+            key=lambda row: (row['user_id'], row['journal_date'])
+        )
+
+    # Rows arrive grouped by user and ordered by date, so each user is one contiguous slice
+    emotion_dates = [datetime.fromisoformat(row['journal_date']).date() for row in emotion_rows]
+    matrix = EmotionMatrix.from_rows(emotion_rows, emotion_dates)
+    start = 0
+    for i in range(1, len(emotion_rows) + 1):
+        if i == len(emotion_rows) or emotion_rows[i]['user_id'] != emotion_rows[start]['user_id']:
+            ctx = contexts.get(emotion_rows[start]['user_id'])
+            if ctx is not None:
+                ctx.emotions = emotion_rows[start:i]
+                ctx.emotion_dates = emotion_dates[start:i]
+                ctx._matrix = matrix.slice(start, i)
+            start = i
+
+    for row in journal_rows:
+        ctx = contexts.get(row['user_id'])
+        if ctx is not None:
+            ctx.journal_dates.append(datetime.fromisoformat(row['journal_date']).date())
+
+    logger.info(f"[DashboardContext] Loaded {len(emotion_rows)} emotion rows and {len(journal_rows)} journal rows")
+    return contexts
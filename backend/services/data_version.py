@@ -0,0 +1,129 @@
+"""
+Cheap per-user data versions for conditional GETs.
+
+A user's version combines the highest journal entry_id and the entry count
+(one indexed query), the latest daily mood rollup write (one indexed query)
+and the user's row in `user_data_version` (one primary-key lookup), whose
+tokens are replaced on every journal and emotion write made through the
+services. All of it lives in the database, so every worker - and a worker
+after a restart - derives the same version from the same data, and an
+in-place journal edit, which moves neither the entry count nor the
+rollups, still changes it. Read endpoints hash it with their parameters
+into a strong ETag, so an unchanged payload can be answered with 304
+without recomputing.
+
+Table definition (Supabase / PostgreSQL):
+
+    create table user_data_version (
+        user_id         text primary key references "user"(user_id) on delete cascade,
+        journal_version text,
+        emotion_version text,
+        updated_at      timestamptz not null default now()
+    );
+"""
+
+from typing import Optional, Dict
+from datetime import datetime
+import asyncio
+import hashlib
+import uuid
+import logging
+from backend.services.base_service import BaseService, run_db
+from backend.services.rollup_service import ROLLUP_TABLE
+from backend.services.dashboard_cache import dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "user_data_version"
+
+class DataVersionService(BaseService):
+    def __init__(self):
+        super().__init__()
+
+    def journal_version(self, user_id: str) -> str:
+        result = self.client.table("journal_entry") \
+            .select("entry_id", count="exact") \
+            .eq("user_id", user_id) \
+            .order("entry_id", desc=True) \
+            .limit(1) \
+            .execute()
+        max_entry_id = result.data[0]["entry_id"] if result.data else 0
+        return f"{max_entry_id}:{result.count or 0}"
+
+    def emotion_version(self, user_id: str) -> str:
+        result = self.client.table(ROLLUP_TABLE) \
+            .select("updated_at") \
+            .eq("user_id", user_id) \
+            .order("updated_at", desc=True) \
+            .limit(1) \
+            .execute()
+        return str(result.data[0]["updated_at"]) if result.data else "-"
+
+    def write_tokens(self, user_id: str) -> Dict[str, Optional[str]]:
+        """The user's journal and emotion write tokens (None before the first recorded write)"""
+        result = self.client.table(VERSION_TABLE).select("journal_version,emotion_version").eq("user_id", user_id).execute()
+        row = result.data[0] if result.data else {}
+        return {"journal_version": row.get("journal_version"), "emotion_version": row.get("emotion_version")}
+
+    def bump(self, user_id: str, column: str) -> str:
+        """Replace one of the user's write tokens and return the new token"""
+        try:
+            token = uuid.uuid4().hex
+            self.client.table(VERSION_TABLE).upsert(
+                {"user_id": user_id, column: token, "updated_at": datetime.utcnow().isoformat()},
+                on_conflict="user_id"
+            ).execute()
+            return token
+        except Exception as e:
+            self._handle_error("bumping data version", e)
+
+# Create singleton instance
+data_version_service = DataVersionService()
+
+def _record_write(user_id: Optional[str], column: str) -> Optional[str]:
+    if not user_id:
+        return None
+    dashboard_cache.invalidate_user(user_id)
+    try:
+        return data_version_service.bump(str(user_id), column)
+    except Exception:
+        # The write itself succeeded; the entry count and rollups still move the version for most writes
+        logger.error(f"[DataVersion] ✗ Failed to record write for user {user_id}, ETags may stay unchanged")
+        return None
+
+def record_journal_write(user_id: Optional[str]) -> Optional[str]:
+    """Mark a user's journal as changed: drop this worker's cached dashboards and replace the journal token.
+
+    Returns the new token (None if it could not be stored), so in-process
+    indexes updated with the write can be tagged with it.
+    """
+    return _record_write(user_id, "journal_version")
+
+def get_journal_token(user_id: str) -> Optional[str]:
+    """The user's current journal write token, shared by every worker"""
+    return data_version_service.write_tokens(str(user_id))["journal_version"]
+
+def record_emotion_write(user_id: Optional[str]):
+    """Mark a user's emotion data as changed: drop this worker's cached dashboards and replace the emotion token"""
+    _record_write(user_id, "emotion_version")
+
+async def get_user_data_version(user_id: str) -> str:
+    """Version string that changes whenever the user's journal or emotion data changes"""
+    journal_version, emotion_version, tokens = await asyncio.gather(
+        run_db(data_version_service.journal_version, user_id),
+        run_db(data_version_service.emotion_version, user_id),
+        run_db(data_version_service.write_tokens, user_id)
+    )
+    return f"{journal_version}|{emotion_version}|{tokens['journal_version']}|{tokens['emotion_version']}"
+
+def make_etag(*parts) -> str:
+    """Strong ETag from a data version and the request parameters that shape the payload"""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
@@ -1,12 +1,20 @@
 import asyncio
 from datetime import datetime, date
+from typing import Optional, Dict, List, Tuple, Hashable
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.services.supabase_service import supabase_service
+from backend.services.base_service import run_db
+from backend.services.emotions_service import emotions_service
+from backend.services.rate_limiter import gemini_rate_limiter, estimate_tokens
+from backend.services.analysis_cache import analysis_cache, cache_key
+from backend.services.mood_analytics import EMOTION_COLUMNS
 from backend.models import Emotion
+from backend.utils.conversation_utils import format_conversation
 import json
 import re
+import time
 import google.generativeai as genai
 import logging
 
@@ -14,6 +22,119 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+GEMINI_MODEL = "gemini-2.5-flash"
+# Part of every analysis cache key; bump it when a prompt changes so earlier results stop matching
+PROMPT_VERSION = "1"
+
+# The reply is a small JSON object; used for the quota estimate before each call
+EXPECTED_OUTPUT_TOKENS = 60
+# Seconds one Gemini call may take before it is cancelled
+GEMINI_CALL_TIMEOUT = float(os.getenv("GEMINI_CALL_TIMEOUT", 30))
+
+# Batch mode packs several conversations into one request: up to this many
+# estimated prompt tokens and this many conversations per request
+GEMINI_BATCH_TOKEN_BUDGET = int(os.getenv("GEMINI_BATCH_TOKEN_BUDGET", 8000))
+GEMINI_BATCH_MAX_ITEMS = int(os.getenv("GEMINI_BATCH_MAX_ITEMS", 20))
+# Output tokens per conversation in a batch reply (one JSON object each)
+EXPECTED_OUTPUT_TOKENS_PER_ITEM = 40
+BATCH_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+class AnalysisDeadlineExceeded(Exception):
+    """Raised when a run's deadline passes before an analysis could finish"""
+
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until a time.monotonic() deadline, or None without one"""
+    return None if deadline is None else deadline - time.monotonic()
+
+def plan_batches(
+    conversations: Dict[Hashable, str],
+    token_budget: int = GEMINI_BATCH_TOKEN_BUDGET,
+    max_items: int = GEMINI_BATCH_MAX_ITEMS
+) -> List[List[Hashable]]:
+    """Group conversation keys into requests that stay under the token budget and item limit.
+
+    A conversation too large to share a request gets one of its own.
+    """
+    batches: List[List[Hashable]] = []
+    current: List[Hashable] = []
+    current_tokens = 0
+    for key, text in conversations.items():
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(key)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def build_batch_prompt(conversations: List[str]) -> str:
+    """One prompt scoring several conversations, tagged with ids 1..n"""
+    tagged = "\n".join(
+        f'<conversation id="{i}">\n{text.strip()}\n</conversation>'
+        for i, text in enumerate(conversations, 1)
+    )
+    return f"""
+            Analyze each of the following conversations separately for emotional content (0-10 scale).
+            
+            {tagged}
+            
+            Return ONLY a JSON array with one object per conversation, using its id (no other text):
+            [
+                {{"id": "1", "happy": 0, "stressed": 0, "anxious": 0, "angry": 0, "sad": 0, "agitated": 0, "neutral": 0}}
+            ]
+            
+            Rules:
+            - Score each emotion 0-10 based on intensity
+            - Multiple emotions can have high scores
+            - If no clear emotion, set neutral higher
+            - Include every conversation id exactly once
+            - Return ONLY the JSON array
+            """
+
+def validate_scores(item) -> Optional[dict]:
+    """The seven emotion scores of one reply object, or None if any is missing or out of range"""
+    if not isinstance(item, dict):
+        return None
+    scores = {}
+    for name in EMOTION_COLUMNS:
+        value = item.get(name)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value) or not 0 <= value <= 10:
+            return None
+        scores[name] = int(value)
+    return scores
+
+def parse_batch_response(ai_response: str, count: int) -> Dict[int, dict]:
+    """Valid scores by conversation id (1..count) from a batch reply; invalid or missing ids are left out"""
+    json_match = re.search(r'\[.*\]', ai_response, re.DOTALL)
+    if not json_match:
+        return {}
+    try:
+        items = json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+    results: Dict[int, dict] = {}
+    for item in items:
+        try:
+            item_id = int(item.get("id"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        scores = validate_scores(item)
+        if scores is not None and 1 <= item_id <= count and item_id not in results:
+            results[item_id] = scores
+    return results
+
+def combine_entry_scores(entry_scores: List[dict], weights: List[int]) -> dict:
+    """Day scores from per-entry scores: their mean weighted by conversation length, rounded to the 0-10 scale"""
+    total = sum(weights) or len(weights)
+    return {
+        name: min(10, max(0, round(sum((scores.get(name) or 0) * (weight or 1) for scores, weight in zip(entry_scores, weights)) / total)))
+        for name in EMOTION_COLUMNS
+    }
+
 class EmotionAnalyzer:
     def __init__(self):
         logger.info("[EmotionAnalyzer] Initializing EmotionAnalyzer...")
@@ -26,16 +147,35 @@ class EmotionAnalyzer:
             # Configure Gemini
             genai.configure(api_key=self.gemini_api_key)
             # Use the correct model name
-            self.model = genai.GenerativeModel('gemini-2.5-flash')  # Changed from 'gemini-pro'
+            self.model = genai.GenerativeModel(GEMINI_MODEL)  # Changed from 'gemini-pro'
             logger.info("[EmotionAnalyzer] Gemini API configured successfully")
         except Exception as e:
             logger.error(f"[EmotionAnalyzer] Failed to configure Gemini API: {e}")
             raise
     
-    async def analyze_emotions_with_gemini(self, conversation_text: str) -> dict:
-        """Use Gemini API to analyze emotions in conversation"""
+    async def analyze_emotions_with_gemini(self, conversation_text: str, deadline: Optional[float] = None) -> dict:
+        """Use Gemini API to analyze emotions in conversation, falling back to default scores if it fails"""
+        emotion_scores = await self.score_conversation(conversation_text, deadline)
+        if emotion_scores is None:
+            logger.warning("[EmotionAnalyzer] Using default emotions due to API failure")
+            return self._get_default_emotions()
+        return emotion_scores
+    
+    async def score_conversation(self, conversation_text: str, deadline: Optional[float] = None) -> Optional[dict]:
+        """Emotion scores for a conversation, or None if Gemini could not provide them.
+
+        The call never blocks the event loop and is cancelled after
+        GEMINI_CALL_TIMEOUT seconds, or earlier at the `deadline`
+        (time.monotonic()), which raises AnalysisDeadlineExceeded.
+        """
         logger.info(f"[EmotionAnalyzer] Starting emotion analysis for conversation (length: {len(conversation_text)} chars)")
         
+        key = cache_key(conversation_text, GEMINI_MODEL, PROMPT_VERSION)
+        cached = await run_db(analysis_cache.get, key)
+        if cached is not None:
+            logger.info(f"[EmotionAnalyzer] ✓ Using cached emotion scores: {cached}")
+            return cached
+        
         try:
             prompt = f"""
             Analyze the following conversation for emotional content and return ONLY a JSON object with emotion scores (0-10 scale):
@@ -61,33 +201,9 @@ class EmotionAnalyzer:
             """
             
             logger.info("[EmotionAnalyzer] Sending request to Gemini API...")
-            
-            # Add timeout and more detailed error handling
-            try:
-                response = self.model.generate_content(prompt)
-                ai_response = response.text
-                logger.info(f"[EmotionAnalyzer] ✓ Received response from Gemini: {ai_response}")
-                
-            except Exception as api_error:
-                # Specific API error logging
-                error_type = type(api_error).__name__
-                logger.error(f"[EmotionAnalyzer] ✗ Gemini API Error ({error_type}): {api_error}")
-                
-                # Check for specific error types
-                if "quota" in str(api_error).lower():
-                    logger.error("[EmotionAnalyzer] 🚫 API QUOTA EXCEEDED - Check your Gemini API limits")
-                elif "authentication" in str(api_error).lower():
-                    logger.error("[EmotionAnalyzer] 🔑 API AUTHENTICATION FAILED - Check your API key")
-                elif "timeout" in str(api_error).lower():
-                    logger.error("[EmotionAnalyzer] ⏰ API TIMEOUT - Gemini API took too long to respond")
-                elif "rate" in str(api_error).lower():
-                    logger.error("[EmotionAnalyzer] 🚦 API RATE LIMIT - Too many requests, need to slow down")
-                else:
-                    logger.error(f"[EmotionAnalyzer] 🔥 UNKNOWN API ERROR: {api_error}")
-                
-                # Return default emotions on API failure
-                logger.warning("[EmotionAnalyzer] Using default emotions due to API failure")
-                return self._get_default_emotions()
+            ai_response = await self._generate(prompt, EXPECTED_OUTPUT_TOKENS, deadline)
+            if ai_response is None:
+                return None
             
             # Extract JSON from response
             try:
@@ -95,20 +211,142 @@ class EmotionAnalyzer:
                 if json_match:
                     emotion_scores = json.loads(json_match.group())
                     logger.info(f"[EmotionAnalyzer] ✓ Successfully parsed emotion scores: {emotion_scores}")
+                    # Only complete, in-range scores are cached; anything else is asked again next time
+                    valid_scores = validate_scores(emotion_scores)
+                    if valid_scores is not None:
+                        await run_db(analysis_cache.set, key, valid_scores)
                     return emotion_scores
                 else:
                     logger.warning("[EmotionAnalyzer] ⚠️ No valid JSON found in Gemini response")
                     logger.warning(f"[EmotionAnalyzer] Raw response: {ai_response}")
-                    return self._get_default_emotions()
+                    return None
                     
             except json.JSONDecodeError as json_error:
                 logger.error(f"[EmotionAnalyzer] ✗ JSON Parse Error: {json_error}")
                 logger.error(f"[EmotionAnalyzer] Failed to parse: {ai_response}")
-                return self._get_default_emotions()
+                return None
                 
+        except AnalysisDeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"[EmotionAnalyzer] ✗ Unexpected error in emotion analysis: {e}")
-            return self._get_default_emotions()
+            return None
+    
+    async def _generate(
+        self,
+        prompt: str,
+        expected_output_tokens: int,
+        deadline: Optional[float] = None,
+        generation_config: Optional[dict] = None
+    ) -> Optional[str]:
+        """Send one prompt to Gemini within the rate limit and timeouts; None if the API call failed"""
+        try:
+            # Wait for room in the shared requests/tokens per minute quota, but not past the deadline
+            estimated_tokens = estimate_tokens(prompt, expected_output_tokens)
+            await asyncio.wait_for(gemini_rate_limiter.acquire(estimated_tokens), remaining_time(deadline))
+            
+            timeout = GEMINI_CALL_TIMEOUT
+            if deadline is not None:
+                timeout = min(timeout, remaining_time(deadline))
+                if timeout <= 0:
+                    raise AnalysisDeadlineExceeded("run deadline passed")
+            # The async client keeps the event loop free; wait_for cancels the request at the timeout
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(prompt, generation_config=generation_config, request_options={"timeout": timeout}),
+                timeout
+            )
+            usage = getattr(response, "usage_metadata", None)
+            gemini_rate_limiter.settle(estimated_tokens, getattr(usage, "total_token_count", None))
+            ai_response = response.text
+            logger.info(f"[EmotionAnalyzer] ✓ Received response from Gemini: {ai_response}")
+            return ai_response
+            
+        except AnalysisDeadlineExceeded:
+            raise
+        except asyncio.TimeoutError:
+            if deadline is not None and remaining_time(deadline) <= 0:
+                raise AnalysisDeadlineExceeded("run deadline passed")
+            logger.error(f"[EmotionAnalyzer] ⏰ API TIMEOUT - Gemini API took longer than {GEMINI_CALL_TIMEOUT:.0f}s to respond")
+            return None
+        except Exception as api_error:
+            # Specific API error logging
+            error_type = type(api_error).__name__
+            logger.error(f"[EmotionAnalyzer] ✗ Gemini API Error ({error_type}): {api_error}")
+            
+            # Check for specific error types
+            if "quota" in str(api_error).lower():
+                logger.error("[EmotionAnalyzer] 🚫 API QUOTA EXCEEDED - Check your Gemini API limits")
+            elif "authentication" in str(api_error).lower():
+                logger.error("[EmotionAnalyzer] 🔑 API AUTHENTICATION FAILED - Check your API key")
+            elif "timeout" in str(api_error).lower():
+                logger.error("[EmotionAnalyzer] ⏰ API TIMEOUT - Gemini API took too long to respond")
+            elif "rate" in str(api_error).lower():
+                logger.error("[EmotionAnalyzer] 🚦 API RATE LIMIT - Too many requests, need to slow down")
+            else:
+                logger.error(f"[EmotionAnalyzer] 🔥 UNKNOWN API ERROR: {api_error}")
+            
+            return None
+    
+    async def analyze_emotions_batch(
+        self,
+        conversations: Dict[Hashable, str],
+        deadline: Optional[float] = None
+    ) -> Dict[Hashable, dict]:
+        """Score many conversations with as few requests as the token budget allows.
+
+        Conversations already in the analysis cache are answered from it.
+        Conversations whose entry in a batch reply is missing or invalid (or
+        whose whole batch failed) are retried one by one with
+        score_conversation. Conversations that could not be scored, or not
+        by the `deadline`, are left out of the result.
+        """
+        results: Dict[Hashable, dict] = {}
+        retry: List[Hashable] = []
+        cache_keys = {key: cache_key(text, GEMINI_MODEL, PROMPT_VERSION) for key, text in conversations.items()}
+        cached = await run_db(analysis_cache.get_many, cache_keys.values())
+        for key, digest in cache_keys.items():
+            if digest in cached:
+                results[key] = cached[digest]
+        uncached = {key: text for key, text in conversations.items() if key not in results}
+        batches = plan_batches(uncached)
+        logger.info(
+            f"[EmotionAnalyzer] Batch analysis of {len(conversations)} conversations: "
+            f"{len(results)} cached, {len(uncached)} in {len(batches)} requests"
+        )
+        
+        try:
+            for keys in batches:
+                if len(keys) == 1:
+                    retry.extend(keys)
+                    continue
+                prompt = build_batch_prompt([conversations[key] for key in keys])
+                ai_response = await self._generate(
+                    prompt, EXPECTED_OUTPUT_TOKENS_PER_ITEM * len(keys), deadline, generation_config=BATCH_GENERATION_CONFIG
+                )
+                parsed = parse_batch_response(ai_response, len(keys)) if ai_response is not None else {}
+                for i, key in enumerate(keys, 1):
+                    if i in parsed:
+                        results[key] = parsed[i]
+                    else:
+                        retry.append(key)
+                await run_db(analysis_cache.set_many, {cache_keys[key]: parsed[i] for i, key in enumerate(keys, 1) if i in parsed})
+                if len(parsed) < len(keys):
+                    logger.warning(f"[EmotionAnalyzer] ⚠️ Batch reply covered {len(parsed)}/{len(keys)} conversations, retrying the rest singly")
+            
+            for key in retry:
+                emotion_scores = await self.score_conversation(uncached[key], deadline)
+                if emotion_scores is not None:
+                    results[key] = emotion_scores
+        except AnalysisDeadlineExceeded:
+            logger.warning(f"[EmotionAnalyzer] ⏰ Run deadline passed, {len(conversations) - len(results)} conversations left unscored")
+            return results
+        
+        logger.info(f"[EmotionAnalyzer] ✓ Batch analysis done: {len(uncached) - len(retry)} batched, {len(retry)} single requests")
+        return results
+    
+    async def ping(self) -> bool:
+        """Send Gemini one tiny prompt, bypassing the analysis cache; True if it answered"""
+        return await self._generate("Reply with the single word OK.", 2) is not None
     
     def _get_default_emotions(self) -> dict:
         """Return default emotion scores when analysis fails"""
@@ -124,19 +362,24 @@ class EmotionAnalyzer:
         logger.info(f"[EmotionAnalyzer] Using default emotions: {default_emotions}")
         return default_emotions
     
+    async def get_daily_entries(self, user_id: str, target_date: date) -> List[dict]:
+        """Get a user's journal entries for a date, oldest first"""
+        response = await run_db(
+            supabase_service.client.table("journal_entry")
+            .select("entry_id, entry_text, AI_response")
+            .eq("user_id", user_id)
+            .eq("journal_date", str(target_date))
+            .order("entry_id")
+            .execute
+        )
+        return response.data if response.data else []
+    
     async def get_daily_conversations(self, user_id: str, target_date: date) -> str:
         """Get all conversations for a user on a specific date"""
         logger.info(f"[EmotionAnalyzer] Getting conversations for user {user_id} on {target_date}")
         
         try:
-            response = supabase_service.client.table("journal_entry") \
-                .select("entry_text, AI_response") \
-                .eq("user_id", user_id) \
-                .eq("journal_date", str(target_date)) \
-                .order("entry_id") \
-                .execute()
-            
-            entries = response.data if response.data else []
+            entries = await self.get_daily_entries(user_id, target_date)
             logger.info(f"[EmotionAnalyzer] Found {len(entries)} journal entries for user {user_id}")
             
             if not entries:
@@ -144,11 +387,7 @@ class EmotionAnalyzer:
                 return ""
             
             # Combine all conversations
-            conversation_text = ""
-            for i, entry in enumerate(entries):
-                conversation_text += f"User: {entry['entry_text']}\n"
-                conversation_text += f"AI: {entry['AI_response']}\n"
-                logger.debug(f"[EmotionAnalyzer] Added entry {i+1}: User: '{entry['entry_text'][:50]}...'")
+            conversation_text = format_conversation(entries)
             
             logger.info(f"[EmotionAnalyzer] Combined conversation text length: {len(conversation_text)} characters")
             return conversation_text
@@ -162,11 +401,13 @@ class EmotionAnalyzer:
         logger.info(f"[EmotionAnalyzer] Checking if emotions already exist for user {user_id} on {target_date}")
         
         try:
-            response = supabase_service.client.table("emotions") \
-                .select("entry_id") \
-                .eq("user_id", user_id) \
-                .eq("journal_date", str(target_date)) \
-                .execute()
+            response = await run_db(
+                supabase_service.client.table("emotions")
+                .select("entry_id")
+                .eq("user_id", user_id)
+                .eq("journal_date", str(target_date))
+                .execute
+            )
             
             exists = len(response.data) > 0 if response.data else False
             logger.info(f"[EmotionAnalyzer] Emotions exist for user {user_id} on {target_date}: {exists}")
@@ -182,13 +423,15 @@ class EmotionAnalyzer:
         
         try:
             # Get the latest entry_id for this user and date
-            entry_response = supabase_service.client.table("journal_entry") \
-                .select("entry_id") \
-                .eq("user_id", user_id) \
-                .eq("journal_date", str(target_date)) \
-                .order("entry_id", desc=True) \
-                .limit(1) \
-                .execute()
+            entry_response = await run_db(
+                supabase_service.client.table("journal_entry")
+                .select("entry_id")
+                .eq("user_id", user_id)
+                .eq("journal_date", str(target_date))
+                .order("entry_id", desc=True)
+                .limit(1)
+                .execute
+            )
             
             if not entry_response.data:
                 logger.error(f"[EmotionAnalyzer] No journal entries found for user {user_id} on {target_date}")
@@ -200,8 +443,8 @@ class EmotionAnalyzer:
             # Create Emotion model instance
             emotion = Emotion.from_gemini_response(emotion_scores, user_id, entry_id, target_date)
             
-            # Save using Supabase service
-            supabase_service.create_emotion_record(emotion)
+            # Upsert: the write-time queue may have saved this day while the analysis ran
+            await run_db(emotions_service.upsert_daily_emotion, emotion)
             logger.info(f"[EmotionAnalyzer] ✓ Successfully saved emotions for user {user_id} on {target_date}")
             return True
             
@@ -209,13 +452,17 @@ class EmotionAnalyzer:
             logger.error(f"[EmotionAnalyzer] ✗ Error saving emotions: {e}")
             return False
     
-    async def analyze_user_day(self, user_id: str, target_date: date = None) -> bool:
-        """Analyze emotions for a specific user and date"""
+    async def analyze_user_day(self, user_id: str, target_date: date = None, deadline: Optional[float] = None) -> bool:
+        """Analyze emotions for a specific user and date, giving up (unsaved) at the run deadline"""
         if target_date is None:
             target_date = date.today()
         
         logger.info(f"[EmotionAnalyzer] Starting analysis for user {user_id} on {target_date}")
         
+        if deadline is not None and remaining_time(deadline) <= 0:
+            logger.warning(f"[EmotionAnalyzer] ⏰ Run deadline passed, skipping user {user_id} on {target_date}")
+            return False
+        
         try:
             # Check if already analyzed
             if await self.check_emotions_exist(user_id, target_date):
@@ -230,7 +477,7 @@ class EmotionAnalyzer:
             
             # Analyze emotions
             logger.info(f"[EmotionAnalyzer] Analyzing emotions for user {user_id}...")
-            emotions = await self.analyze_emotions_with_gemini(conversation_text)
+            emotions = await self.analyze_emotions_with_gemini(conversation_text, deadline)
             
             # Save to database
             success = await self.save_emotions(user_id, target_date, emotions)
@@ -242,6 +489,115 @@ class EmotionAnalyzer:
             
             return success
             
+        except AnalysisDeadlineExceeded:
+            logger.warning(f"[EmotionAnalyzer] ⏰ Run deadline passed during analysis for user {user_id} on {target_date}, nothing saved")
+            return False
         except Exception as e:
             logger.error(f"[EmotionAnalyzer] ✗ Error analyzing user day: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    async def analyze_user_days_batch(
+        self,
+        user_days: List[Tuple[str, date]],
+        deadline: Optional[float] = None
+    ) -> Dict[Tuple[str, date], bool]:
+        """Analyze several user-days with batched Gemini requests; result per pair as analyze_user_day returns it"""
+        results: Dict[Tuple[str, date], bool] = {}
+        conversations: Dict[Tuple[str, date], str] = {}
+        
+        async def prepare(user_id: str, target_date: date):
+            if await self.check_emotions_exist(user_id, target_date):
+                results[(user_id, target_date)] = True
+                return
+            conversation_text = await self.get_daily_conversations(user_id, target_date)
+            if conversation_text.strip():
+                conversations[(user_id, target_date)] = conversation_text
+            else:
+                results[(user_id, target_date)] = False
+        
+        await asyncio.gather(*(prepare(user_id, target_date) for user_id, target_date in user_days))
+        if not conversations:
+            return results
+        
+        scores = await self.analyze_emotions_batch(conversations, deadline)
+        for key in conversations:
+            results[key] = key in scores and await self.save_emotions(key[0], key[1], scores[key])
+        return results
+    
+    async def save_daily_emotions(self, user_id: str, target_date: date, entry_id: int, emotion_scores: dict) -> bool:
+        """Create or replace the emotions record of a user's day"""
+        try:
+            emotion = Emotion.from_gemini_response(emotion_scores, user_id, entry_id, target_date)
+            await run_db(emotions_service.upsert_daily_emotion, emotion)
+            logger.info(f"[EmotionAnalyzer] ✓ Saved emotions for user {user_id} on {target_date}: {emotion_scores}")
+            return True
+        except Exception as e:
+            logger.error(f"[EmotionAnalyzer] ✗ Error saving emotions: {e}")
+            return False
+    
+    async def clear_daily_emotions(self, user_id: str, target_date: date) -> bool:
+        """Remove the emotions record of a day that no longer has entries"""
+        try:
+            if await run_db(emotions_service.delete_daily_emotion, user_id, str(target_date)):
+                logger.info(f"[EmotionAnalyzer] 🗑️ Removed emotions for user {user_id} on {target_date}, the day has no entries left")
+            return True
+        except Exception as e:
+            logger.error(f"[EmotionAnalyzer] ✗ Error removing emotions: {e}")
+            return False
+    
+    async def analyze_entries_by_day(
+        self,
+        user_days: List[Tuple[str, date]],
+        deadline: Optional[float] = None
+    ) -> Dict[Tuple[str, date], bool]:
+        """Recompute each day's emotions record from the scores of its individual entries.
+
+        Each entry is scored on its own, so once an entry has been analyzed
+        the analysis cache answers for it and a new chat turn costs one short
+        analysis instead of a re-read of the whole day. A day is only saved
+        when every one of its entries was scored; otherwise its existing
+        record is left alone and the day is reported as failed (False).
+        A day whose entries were all deleted loses its record.
+        """
+        entries_by_day: Dict[Tuple[str, date], List[dict]] = {}
+        
+        async def load(user_id: str, target_date: date):
+            try:
+                entries_by_day[(user_id, target_date)] = await self.get_daily_entries(user_id, target_date)
+            except Exception as e:
+                logger.error(f"[EmotionAnalyzer] Error getting entries for user {user_id} on {target_date}: {e}")
+        
+        await asyncio.gather(*(load(user_id, target_date) for user_id, target_date in user_days))
+        
+        conversations: Dict[Tuple[str, date, int], str] = {}
+        keys_by_day: Dict[Tuple[str, date], List[Tuple[str, date, int]]] = {}
+        for day, entries in entries_by_day.items():
+            for entry in entries:
+                text = format_conversation([entry])
+                if text.strip():
+                    key = day + (entry["entry_id"],)
+                    conversations[key] = text
+                    keys_by_day.setdefault(day, []).append(key)
+        scores = await self.analyze_emotions_batch(conversations, deadline) if conversations else {}
+        
+        results: Dict[Tuple[str, date], bool] = {}
+        for (user_id, target_date) in user_days:
+            if (user_id, target_date) not in entries_by_day:
+                results[(user_id, target_date)] = False
+                continue
+            keys = keys_by_day.get((user_id, target_date), [])
+            if not entries_by_day[(user_id, target_date)]:
+                results[(user_id, target_date)] = await self.clear_daily_emotions(user_id, target_date)
+                continue
+            if not keys:
+                results[(user_id, target_date)] = True
+                continue
+            if any(key not in scores for key in keys):
+                logger.warning(f"[EmotionAnalyzer] ⚠️ Not every entry of user {user_id} on {target_date} was scored, keeping the saved record")
+                results[(user_id, target_date)] = False
+                continue
+            day_scores = combine_entry_scores([scores[key] for key in keys], [len(conversations[key]) for key in keys])
+            # Recorded against the newest entry, which is how the nightly run tells an outdated record
+            newest_entry_id = entries_by_day[(user_id, target_date)][-1]["entry_id"]
+            results[(user_id, target_date)] = await self.save_daily_emotions(user_id, target_date, newest_entry_id, day_scores)
+        return results
@@ -1,5 +1,9 @@
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Tuple
 from backend.services.base_service import BaseService
+from backend.services.projections import columns_for
+from backend.services.pagination import apply_keyset, decode_cursor, split_page, page_size
+from backend.services.rollup_service import rollup_service
+from backend.services.data_version import record_emotion_write
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,22 +17,145 @@ class EmotionsService(BaseService):
         try:
             data = self._convert_to_dict(emotion_data)
             result = self.client.table("emotions").insert(data).execute()
-            return result.data[0] if result.data else {}
+            record = result.data[0] if result.data else {}
+            self._update_rollup(record or data)
+            record_emotion_write((record or data).get('user_id'))
+            return record
         except Exception as e:
             self._handle_error("creating emotion record", e)
     
-    def get_emotions_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+    def upsert_daily_emotion(self, emotion_data: Union[Dict[str, Any], 'Emotion']) -> Dict[str, Any]:
+        """Create the emotion record of a user's day, or replace its scores if the day already has one"""
+        try:
+            data = self._convert_to_dict(emotion_data)
+            existing = self.client.table("emotions").select("entry_id") \
+                .eq("user_id", data['user_id']).eq("journal_date", data['journal_date']).limit(1).execute()
+            if existing.data:
+                result = self.client.table("emotions").update(data) \
+                    .eq("user_id", data['user_id']).eq("journal_date", data['journal_date']).execute()
+            else:
+                result = self.client.table("emotions").insert(data).execute()
+            record = result.data[0] if result.data else {}
+            self._update_rollup(record or data)
+            record_emotion_write(data.get('user_id'))
+            return record
+        except Exception as e:
+            self._handle_error("upserting daily emotion record", e)
+    
+    def delete_daily_emotion(self, user_id: str, journal_date: str) -> int:
+        """Remove the emotion record and rollup row of a user's day, e.g. after its last entry was deleted"""
+        try:
+            result = self.client.table("emotions").delete().eq("user_id", user_id).eq("journal_date", str(journal_date)).execute()
+            deleted = len(result.data or [])
+            if deleted:
+                rollup_service.delete_day(user_id, journal_date)
+                record_emotion_write(user_id)
+            return deleted
+        except Exception as e:
+            self._handle_error("deleting daily emotion record", e)
+    
+    def _update_rollup(self, emotion_row: Dict[str, Any]):
+        """Keep the daily mood rollup in step with a new emotion row"""
+        try:
+            rollup_service.upsert_from_emotions([emotion_row])
+        except Exception as e:
+            # The emotion row is saved; queue the rollup so it is retried and dashboards read emotions meanwhile
+            logger.error(f"[EmotionsService] ✗ Failed to update mood rollup, queued for repair: {e}")
+            rollup_service.queue_repair(emotion_row)
+    
+    def get_emotions_by_user(self, user_id: str, projection: str = "full") -> List[Dict[str, Any]]:
         """Get all emotions for a user"""
+        return self.get_emotions_in_range(user_id, projection=projection, descending=True)
+    
+    def get_emotions_in_range(
+        self,
+        user_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        projection: str = "full",
+        limit: Optional[int] = None,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Get a user's emotions between two journal dates (inclusive), ordered by date"""
         try:
-            result = self.client.table("emotions").select("*").eq("user_id", user_id).order("journal_date", desc=True).execute()
+            query = self.client.table("emotions").select(columns_for("emotions", projection)).eq("user_id", user_id)
+            if start_date:
+                query = query.gte("journal_date", str(start_date))
+            if end_date:
+                query = query.lte("journal_date", str(end_date))
+            query = query.order("journal_date", desc=descending)
+            if limit is not None:
+                query = query.limit(limit)
+            result = query.execute()
             return result.data or []
         except Exception as e:
-            self._handle_error("getting emotions", e)
+            self._handle_error("getting emotions in range", e)
+    
+    def get_emotions_after_id(
+        self,
+        after_id: int,
+        limit: int,
+        projection: str = "full"
+    ) -> List[Dict[str, Any]]:
+        """Get up to `limit` emotion records with id above a watermark, in id order"""
+        try:
+            # id, not entry_id: records share entry_ids, and upsert_daily_emotion rewrites a day's entry_id
+            result = self.client.table("emotions").select(columns_for("emotions", projection)) \
+                .gt("id", after_id) \
+                .order("id") \
+                .limit(limit) \
+                .execute()
+            return result.data or []
+        except Exception as e:
+            self._handle_error("getting emotion records after entry", e)
+    
+    # entry_id alone may repeat across a day's records, so the primary key breaks the last ties
+    PAGE_KEYS = ("journal_date", "entry_id", "id")
+    
+    def get_emotions_page(
+        self,
+        user_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        projection: str = "full",
+        descending: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of emotion records (newest first by default) and the cursor for the next page"""
+        after = decode_cursor(cursor, self.PAGE_KEYS) if cursor else None
+        size = page_size(limit)
+        try:
+            query = self.client.table("emotions").select(columns_for("emotions", projection))
+            if user_id:
+                query = query.eq("user_id", user_id)
+            if start_date:
+                query = query.gte("journal_date", str(start_date))
+            if end_date:
+                query = query.lte("journal_date", str(end_date))
+            if after:
+                query = apply_keyset(query, self.PAGE_KEYS, after, descending=descending)
+            for key in self.PAGE_KEYS:
+                query = query.order(key, desc=descending)
+            result = query.limit(size + 1).execute()
+            return split_page(result.data or [], size, self.PAGE_KEYS)
+        except Exception as e:
+            self._handle_error("getting emotions page", e)
+    
+    def get_analyzed_entry_ids(self, journal_date: str) -> Dict[str, int]:
+        """Get the entry_id each user's emotion record for a date was computed up to"""
+        try:
+            rows = self._fetch_all_pages(
+                lambda: self.client.table("emotions").select("user_id,entry_id").eq("journal_date", str(journal_date)).order("entry_id")
+            )
+            return {row["user_id"]: row["entry_id"] for row in rows}
+        except Exception as e:
+            self._handle_error("getting analyzed users", e)
     
-    def get_emotions_by_entry(self, entry_id: int) -> Optional[Dict[str, Any]]:
+    def get_emotions_by_entry(self, entry_id: int, projection: str = "full") -> Optional[Dict[str, Any]]:
         """Get emotions by journal entry ID"""
         try:
-            result = self.client.table("emotions").select("*").eq("entry_id", entry_id).execute()
+            result = self.client.table("emotions").select(columns_for("emotions", projection)).eq("entry_id", entry_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("getting emotions by entry", e)
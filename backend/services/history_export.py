@@ -0,0 +1,103 @@
+"""
+Streaming export of a user's journal and emotion history.
+
+Both tables are read page by page in (journal_date, entry_id) order and
+merge-joined on that key, so each journal entry is emitted together with
+its emotion scores and only one page per table is held in memory at a time.
+Emotion rows whose journal entry no longer exists are still exported, with
+empty journal fields.
+"""
+
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Tuple
+import csv
+import io
+import orjson
+import os
+from backend.services.base_service import run_db
+from backend.services.journals_service import journals_service
+from backend.services.emotions_service import emotions_service
+from backend.services.mood_analytics import EMOTION_COLUMNS
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 500))
+
+JOURNAL_EXPORT_COLUMNS = ("entry_id", "journal_date", "entry_text", "AI_response", "episode_flag")
+CSV_COLUMNS = JOURNAL_EXPORT_COLUMNS + EMOTION_COLUMNS
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+async def _iter_rows(fetch_page: Callable, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield a user's rows oldest first, one keyset page per database call"""
+    cursor = None
+    while True:
+        rows, cursor = await run_db(
+            fetch_page, user_id,
+            limit=EXPORT_CHUNK_SIZE, cursor=cursor, projection="export", descending=False
+        )
+        for row in rows:
+            yield row
+        if not cursor:
+            return
+
+def _sort_key(row: Dict[str, Any]) -> Tuple[str, int]:
+    return (str(row["journal_date"])[:10], int(row["entry_id"]))
+
+async def _next(rows: AsyncIterator[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    try:
+        return await rows.__anext__()
+    except StopAsyncIteration:
+        return None
+
+async def iter_history(user_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one record per journal entry, oldest first, with its emotions (or None)"""
+    entries = _iter_rows(journals_service.get_journal_entries_page, user_id)
+    emotions = _iter_rows(emotions_service.get_emotions_page, user_id)
+    entry, emotion = await _next(entries), await _next(emotions)
+
+    while entry is not None or emotion is not None:
+        if emotion is None or (entry is not None and _sort_key(entry) < _sort_key(emotion)):
+            yield {**entry, "emotions": None}
+            entry = await _next(entries)
+        elif entry is None or _sort_key(emotion) < _sort_key(entry):
+            # Emotions for an entry that has since been deleted
+            record = {column: None for column in JOURNAL_EXPORT_COLUMNS}
+            record.update(entry_id=emotion["entry_id"], journal_date=emotion["journal_date"])
+            yield {**record, "emotions": {column: emotion.get(column) for column in EMOTION_COLUMNS}}
+            emotion = await _next(emotions)
+        else:
+            yield {**entry, "emotions": {column: emotion.get(column) for column in EMOTION_COLUMNS}}
+            entry, emotion = await _next(entries), await _next(emotions)
+
+async def export_ndjson(user_id: str) -> AsyncIterator[bytes]:
+    """History as NDJSON, one journal entry per line"""
+    async for record in iter_history(user_id):
+        yield orjson.dumps(record, default=str) + b"\n"
+
+async def export_csv(user_id: str, batch_size: int = 100) -> AsyncIterator[str]:
+    """History as CSV with the emotion scores flattened into columns"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    written = 0
+    # Send the header straight away so the download starts before the first page arrives
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    async for record in iter_history(user_id):
+        emotions = record["emotions"] or {}
+        writer.writerow([record.get(column) for column in JOURNAL_EXPORT_COLUMNS] + [emotions.get(column) for column in EMOTION_COLUMNS])
+        written += 1
+        # Flush in small batches: one chunk per row would mean one socket write per row
+        if written % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def export_history(user_id: str, export_format: str) -> AsyncIterator:
+    """Streaming body for one of EXPORT_FORMATS"""
+    if export_format == "csv":
+        return export_csv(user_id)
+    return export_ndjson(user_id)
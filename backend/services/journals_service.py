@@ -1,9 +1,18 @@
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Tuple
 from backend.services.base_service import BaseService
+from backend.services.projections import columns_for
+from backend.services.pagination import apply_keyset, decode_cursor, split_page, page_size, InvalidCursor
+from backend.services.data_version import record_journal_write, get_journal_token
+from backend.services.search_index import journal_search_index
+from backend.services.similar_days import similar_days_index
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-row insert in bulk imports
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+
 class JournalsService(BaseService):
     def __init__(self):
         super().__init__()
@@ -13,22 +22,237 @@ class JournalsService(BaseService):
         try:
             data = self._convert_to_dict(entry_data)
             result = self.client.table("journal_entry").insert(data).execute()
+            token = record_journal_write(data.get('user_id'))
+            journal_search_index.index_entries(result.data, {str(data.get('user_id')): token})
+            similar_days_index.mark_entries(result.data, {str(data.get('user_id')): token})
             return result.data[0] if result.data else {}
         except Exception as e:
             self._handle_error("creating journal entry", e)
     
-    def get_journal_entries_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+    def create_journal_entries(
+        self,
+        entries: List[Dict[str, Any]],
+        chunk_size: int = IMPORT_CHUNK_SIZE
+    ) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, str]]:
+        """Insert many entries with one multi-row insert per chunk.
+
+        Returns the created row for each input position (None if it failed) and
+        the error message for each failed position. A chunk the database rejects
+        is retried row by row so one bad entry does not sink its neighbours. A
+        chunk that was inserted but returned the wrong number of rows is not
+        retried, since its rows may already exist; every position in it is
+        reported as an error instead.
+        """
+        created: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+        errors: Dict[int, str] = {}
+        # Rows written by chunks whose returned rows cannot be matched to their inputs
+        unmatched: List[Dict[str, Any]] = []
+        for start in range(0, len(entries), chunk_size):
+            chunk = entries[start:start + chunk_size]
+            try:
+                result = self.client.table("journal_entry").insert(chunk).execute()
+            except Exception as e:
+                logger.warning(f"[JournalsService] ⚠️ Bulk insert of {len(chunk)} entries failed, retrying one by one: {e}")
+                for offset, entry in enumerate(chunk):
+                    try:
+                        result = self.client.table("journal_entry").insert(entry).execute()
+                        created[start + offset] = result.data[0] if result.data else None
+                    except Exception as e:
+                        errors[start + offset] = str(e)
+                continue
+            rows = result.data or []
+            if len(rows) == len(chunk):
+                created[start:start + len(chunk)] = rows
+                continue
+            message = f"Bulk insert returned {len(rows)} of {len(chunk)} rows; this entry may already have been created"
+            logger.error(f"[JournalsService] ✗ {message} (positions {start}-{start + len(chunk) - 1})")
+            unmatched.extend(rows)
+            for offset in range(len(chunk)):
+                errors[start + offset] = message
+        
+        written = [row for row in created if row] + unmatched
+        tokens = self._invalidate_dashboards(written)
+        journal_search_index.index_entries(written, tokens)
+        similar_days_index.mark_entries(written, tokens)
+        logger.info(f"[JournalsService] ✓ Imported {len(entries) - len(errors)}/{len(entries)} journal entries")
+        return created, errors
+    
+    def get_journal_entries_by_user(self, user_id: str, projection: str = "full") -> List[Dict[str, Any]]:
         """Get all journal entries for a user"""
+        return self.get_journal_entries_in_range(user_id, projection=projection, descending=True)
+    
+    def get_journal_entries_in_range(
+        self,
+        user_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        projection: str = "full",
+        limit: Optional[int] = None,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Get a user's journal entries between two journal dates (inclusive), ordered by date then entry"""
+        try:
+            query = self.client.table("journal_entry").select(columns_for("journal_entry", projection)).eq("user_id", user_id)
+            if start_date:
+                query = query.gte("journal_date", str(start_date))
+            if end_date:
+                query = query.lte("journal_date", str(end_date))
+            query = query.order("journal_date", desc=descending).order("entry_id", desc=descending)
+            if limit is not None:
+                query = query.limit(limit)
+            result = query.execute()
+            return result.data or []
+        except Exception as e:
+            self._handle_error("getting journal entries in range", e)
+    
+    def get_journal_entries_after_entry(
+        self,
+        after_entry_id: int,
+        limit: int,
+        projection: str = "full"
+    ) -> List[Dict[str, Any]]:
+        """Get up to `limit` journal entries with entry_id above a watermark, in entry_id order"""
         try:
-            result = self.client.table("journal_entry").select("*").eq("user_id", user_id).order("journal_date", desc=True).execute()
+            result = self.client.table("journal_entry").select(columns_for("journal_entry", projection)) \
+                .gt("entry_id", after_entry_id) \
+                .order("entry_id") \
+                .limit(limit) \
+                .execute()
             return result.data or []
         except Exception as e:
-            self._handle_error("getting journal entries", e)
+            self._handle_error("getting journal entries after entry", e)
     
-    def get_journal_entry_by_id(self, entry_id: int) -> Optional[Dict[str, Any]]:
+    PAGE_KEYS = ("journal_date", "entry_id")
+    
+    def get_journal_entries_page(
+        self,
+        user_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        projection: str = "full",
+        descending: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of journal entries (newest first by default) and the cursor for the next page"""
+        after = decode_cursor(cursor, self.PAGE_KEYS) if cursor else None
+        size = page_size(limit)
+        try:
+            query = self.client.table("journal_entry").select(columns_for("journal_entry", projection))
+            if user_id:
+                query = query.eq("user_id", user_id)
+            if start_date:
+                query = query.gte("journal_date", str(start_date))
+            if end_date:
+                query = query.lte("journal_date", str(end_date))
+            if after:
+                query = apply_keyset(query, self.PAGE_KEYS, after, descending=descending)
+            # One extra row tells us whether another page exists
+            result = query.order("journal_date", desc=descending).order("entry_id", desc=descending).limit(size + 1).execute()
+            return split_page(result.data or [], size, self.PAGE_KEYS)
+        except Exception as e:
+            self._handle_error("getting journal entries page", e)
+    
+    SEARCH_KEYS = ("score", "entry_id")
+    
+    def search_journal_entries(
+        self,
+        user_id: str,
+        query: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        projection: str = "full"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of a user's entries matching a text query, best match first, and the cursor for the next page"""
+        after = decode_cursor(cursor, self.SEARCH_KEYS) if cursor else None
+        if after:
+            try:
+                after = (float(after[0]), int(after[1]))
+            except (TypeError, ValueError):
+                raise InvalidCursor("Invalid cursor")
+        size = page_size(limit)
+        try:
+            hits = journal_search_index.search(
+                user_id, query, self.get_search_documents,
+                str(start_date) if start_date else None, str(end_date) if end_date else None,
+                data_version=get_journal_token(user_id)
+            )
+            if after:
+                # Hits are ordered by (score, entry_id) descending
+                hits = [hit for hit in hits if (hit[0], hit[1]) < after]
+            page, next_cursor = split_page([{"score": score, "entry_id": entry_id} for score, entry_id, _ in hits[:size + 1]], size, self.SEARCH_KEYS)
+            
+            rows = {row["entry_id"]: row for row in self.get_journal_entries_by_ids([hit["entry_id"] for hit in page], projection=projection)}
+            return [{**rows[hit["entry_id"]], "score": round(hit["score"], 4)} for hit in page if hit["entry_id"] in rows], next_cursor
+        except Exception as e:
+            self._handle_error("searching journal entries", e)
+    
+    def get_search_documents(self, user_id: str, dates: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """A user's entries (optionally only on some journal dates) with the text fields, in entry_id order"""
+        def build_query():
+            query = self.client.table("journal_entry").select(columns_for("journal_entry", "search")).eq("user_id", user_id)
+            if dates is not None:
+                query = query.in_("journal_date", [str(d) for d in dates])
+            return query.order("entry_id")
+        
+        try:
+            return self._fetch_all_pages(build_query)
+        except Exception as e:
+            self._handle_error("getting journal entries for search", e)
+    
+    def get_journal_entries_by_ids(self, entry_ids: List[int], projection: str = "full") -> List[Dict[str, Any]]:
+        """Get several journal entries by ID, querying them in chunks"""
+        try:
+            if not entry_ids:
+                return []
+            return self._fetch_in_chunks(
+                lambda chunk: self.client.table("journal_entry").select(columns_for("journal_entry", projection)).in_("entry_id", chunk).order("entry_id"),
+                entry_ids
+            )
+        except Exception as e:
+            self._handle_error("getting journal entries by ids", e)
+    
+    def get_journal_entries_for_users(
+        self,
+        user_ids: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        projection: str = "full"
+    ) -> List[Dict[str, Any]]:
+        """Get journal entries for several users, grouped by user and ordered by date"""
+        try:
+            if not user_ids:
+                return []
+            
+            def build_query(chunk):
+                query = self.client.table("journal_entry").select(columns_for("journal_entry", projection)).in_("user_id", chunk)
+                if start_date:
+                    query = query.gte("journal_date", str(start_date))
+                if end_date:
+                    query = query.lte("journal_date", str(end_date))
+                return query.order("user_id").order("journal_date").order("entry_id")
+            
+            return self._fetch_in_chunks(build_query, user_ids)
+        except Exception as e:
+            self._handle_error("getting journal entries for users", e)
+    
+    def get_latest_entry_ids(self, journal_date: str) -> Dict[str, int]:
+        """Get the newest entry_id of each user with journal entries on a date"""
+        try:
+            rows = self._fetch_all_pages(
+                lambda: self.client.table("journal_entry").select("user_id,entry_id").eq("journal_date", str(journal_date)).order("entry_id")
+            )
+            # Rows come in entry_id order, so the last one per user wins
+            return {row["user_id"]: row["entry_id"] for row in rows}
+        except Exception as e:
+            self._handle_error("getting active users", e)
+    
+    def get_journal_entry_by_id(self, entry_id: int, projection: str = "full") -> Optional[Dict[str, Any]]:
         """Get journal entry by ID"""
         try:
-            result = self.client.table("journal_entry").select("*").eq("entry_id", entry_id).execute()
+            result = self.client.table("journal_entry").select(columns_for("journal_entry", projection)).eq("entry_id", entry_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("getting journal entry", e)
@@ -37,6 +261,9 @@ class JournalsService(BaseService):
         """Update journal entry"""
         try:
             result = self.client.table("journal_entry").update(entry_data).eq("entry_id", entry_id).execute()
+            tokens = self._invalidate_dashboards(result.data, entry_data)
+            journal_search_index.index_entries(result.data, tokens)
+            similar_days_index.mark_entries(result.data, tokens)
             return result.data[0] if result.data else {}
         except Exception as e:
             self._handle_error("updating journal entry", e)
@@ -45,9 +272,23 @@ class JournalsService(BaseService):
         """Delete journal entry"""
         try:
             result = self.client.table("journal_entry").delete().eq("entry_id", entry_id).execute()
+            tokens = self._invalidate_dashboards(result.data)
+            journal_search_index.remove_entries(result.data, tokens)
+            similar_days_index.mark_entries(result.data, tokens)
             return True
         except Exception as e:
             self._handle_error("deleting journal entry", e)
+    
+    def _invalidate_dashboards(
+        self,
+        rows: Optional[List[Dict[str, Any]]],
+        entry_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Optional[str]]:
+        """Record a journal write for every user touched by it; returns each user's new write token"""
+        user_ids = {row.get('user_id') for row in rows or []}
+        if entry_data:
+            user_ids.add(entry_data.get('user_id'))
+        return {str(user_id): record_journal_write(user_id) for user_id in user_ids if user_id}
 
 # Create singleton instance
 journals_service = JournalsService()
@@ -0,0 +1,310 @@
+"""
+Vectorized dashboard statistics.
+
+Emotion rows are loaded into a (days x 7) integer matrix plus a vector of
+date ordinals, and every dashboard metric is computed with array operations.
+Results match the original per-row helpers number for number: sums that feed
+a float average use np.cumsum, which adds left to right like the original
+loops, and final scalars are rounded with Python's round().
+"""
+
+from typing import Dict, Any, List, Optional, Sequence
+from datetime import date
+import numpy as np
+
+# Column order matches get_dominant_emotion's tie-breaking and the
+# summation order of the original landscape averages
+EMOTION_COLUMNS = ("happy", "sad", "anxious", "stressed", "angry", "agitated", "neutral")
+POSITIVE_COLUMNS = ("happy", "neutral")
+NEGATIVE_COLUMNS = ("sad", "anxious", "stressed", "angry", "agitated")
+
+_POSITIVE_IDX = [EMOTION_COLUMNS.index(c) for c in POSITIVE_COLUMNS]
+_NEGATIVE_IDX = [EMOTION_COLUMNS.index(c) for c in NEGATIVE_COLUMNS]
+_COLUMN_IDX = {name: i for i, name in enumerate(EMOTION_COLUMNS)}
+
+LANDSCAPE_COLORS = {
+    "Happy": "#10B981",
+    "Calm": "#3B82F6",
+    "Sad": "#8B5CF6",
+    "Anxious": "#F59E0B",
+    "Angry": "#EF4444"
+}
+
+def _sequential_sum(values: np.ndarray) -> float:
+    """Left-to-right float sum, in the same order as the original loops"""
+    if values.size == 0:
+        return 0
+    return float(np.cumsum(values, dtype=np.float64)[-1])
+
+class EmotionMatrix:
+    """Emotion scores for one user as a (days x 7) array, oldest day first"""
+
+    def __init__(self, scores: np.ndarray, ordinals: np.ndarray, dates: Sequence[str],
+                 positive: Optional[np.ndarray] = None, negative: Optional[np.ndarray] = None,
+                 mood: Optional[np.ndarray] = None, dominant: Optional[List[str]] = None):
+        self.scores = scores
+        self.ordinals = ordinals
+        self.dates = list(dates)
+        self.positive = positive if positive is not None else scores[:, _POSITIVE_IDX].sum(axis=1)
+        self.negative = negative if negative is not None else scores[:, _NEGATIVE_IDX].sum(axis=1)
+        self.total = self.positive + self.negative
+        self._mood = mood
+        self._dominant = dominant
+
+    def __len__(self) -> int:
+        return self.scores.shape[0]
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], parsed_dates: Optional[List[date]] = None) -> "EmotionMatrix":
+        """Build a matrix from emotion or rollup rows already sorted by journal_date"""
+        n = len(rows)
+        scores = np.zeros((n, len(EMOTION_COLUMNS)), dtype=np.int64)
+        for i, column in enumerate(EMOTION_COLUMNS):
+            scores[:, i] = np.fromiter((row.get(column) or 0 for row in rows), dtype=np.int64, count=n)
+
+        if parsed_dates is None:
+            parsed_dates = [date.fromisoformat(row['journal_date'][:10]) for row in rows]
+        ordinals = np.fromiter((d.toordinal() for d in parsed_dates), dtype=np.int64, count=n)
+
+        # Rollup rows carry the positive/negative sums, mood score and dominant emotion precomputed
+        positive = negative = mood = dominant = None
+        if n and all(row.get('positive') is not None and row.get('negative') is not None for row in rows):
+            positive = np.fromiter((row['positive'] for row in rows), dtype=np.int64, count=n)
+            negative = np.fromiter((row['negative'] for row in rows), dtype=np.int64, count=n)
+        if n and all(row.get('mood_score') is not None and row.get('dominant_emotion') for row in rows):
+            mood = np.fromiter((row['mood_score'] for row in rows), dtype=np.float64, count=n)
+            dominant = [row['dominant_emotion'] for row in rows]
+
+        return cls(scores, ordinals, [row['journal_date'] for row in rows], positive, negative, mood, dominant)
+
+    def slice(self, start: int, stop: int) -> "EmotionMatrix":
+        """Rows start..stop as a matrix sharing this one's arrays"""
+        return EmotionMatrix(
+            self.scores[start:stop], self.ordinals[start:stop], self.dates[start:stop],
+            self.positive[start:stop], self.negative[start:stop],
+            self._mood[start:stop] if self._mood is not None else None,
+            self._dominant[start:stop] if self._dominant is not None else None
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        return self.scores[:, _COLUMN_IDX[name]]
+
+    def net_scores(self) -> np.ndarray:
+        """Positive minus negative emotions per day"""
+        return self.positive - self.negative
+
+    def mood_ratios(self, default: float = 0.5) -> np.ndarray:
+        """Share of positive emotions per day, `default` when nothing was scored"""
+        ratios = np.full(len(self), default, dtype=np.float64)
+        np.divide(self.positive, self.total, out=ratios, where=self.total > 0)
+        return ratios
+
+    def mood_scores(self) -> np.ndarray:
+        """Daily mood on the dashboard's 1-5 scale (3 when nothing was scored)"""
+        if self._mood is not None:
+            return self._mood
+        scores = np.full(len(self), 3, dtype=np.float64)
+        np.multiply(self.mood_ratios(), 5, out=scores, where=self.total > 0)
+        return scores
+
+    def dominant_emotions(self) -> List[str]:
+        """Highest-scoring emotion per day; ties go to the earlier column"""
+        if self._dominant is not None:
+            return list(self._dominant)
+        return [EMOTION_COLUMNS[i] for i in self.scores.argmax(axis=1).tolist()] if len(self) else []
+
+def daily_rollups(matrix: EmotionMatrix) -> List[Dict[str, Any]]:
+    """Per-day derived values stored in the daily_mood_rollup table"""
+    mood_scores = matrix.mood_scores().tolist()
+    dominant = matrix.dominant_emotions()
+    positive = matrix.positive.tolist()
+    negative = matrix.negative.tolist()
+    return [
+        {
+            "mood_score": mood_scores[i],
+            "positive": positive[i],
+            "negative": negative[i],
+            "dominant_emotion": dominant[i]
+        }
+        for i in range(len(matrix))
+    ]
+
+SUMMARY_BUCKETS = ("day", "week", "month")
+
+def _bucket_keys(matrix: EmotionMatrix, bucket: str) -> np.ndarray:
+    """Non-decreasing key per row identifying its bucket"""
+    if bucket == "day":
+        return matrix.ordinals
+    if bucket == "week":
+        # Ordinal 1 (0001-01-01) is a Monday, so this is the ordinal of the row's ISO week start
+        return matrix.ordinals - (matrix.ordinals - 1) % 7
+    return np.fromiter((int(d[:4]) * 12 + int(d[5:7]) - 1 for d in matrix.dates), dtype=np.int64, count=len(matrix))
+
+def _bucket_start(key: int, bucket: str) -> str:
+    if bucket == "month":
+        return date(key // 12, key % 12 + 1, 1).isoformat()
+    return date.fromordinal(key).isoformat()
+
+def bucket_summary(matrix: EmotionMatrix, bucket: str) -> List[Dict[str, Any]]:
+    """Per-bucket count and mean/min/max of each emotion and of the mood score"""
+    if bucket not in SUMMARY_BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(SUMMARY_BUCKETS)}")
+    n = len(matrix)
+    if not n:
+        return []
+
+    # Rows are sorted by date, so each bucket is a contiguous run and reduceat covers it in one pass
+    keys = _bucket_keys(matrix, bucket)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, n))
+
+    means = (np.add.reduceat(matrix.scores, starts, axis=0) / counts[:, None]).round(2).tolist()
+    mins = np.minimum.reduceat(matrix.scores, starts, axis=0).tolist()
+    maxs = np.maximum.reduceat(matrix.scores, starts, axis=0).tolist()
+
+    mood = matrix.mood_scores()
+    mood_means = (np.add.reduceat(mood, starts) / counts).round(2).tolist()
+    mood_mins = np.minimum.reduceat(mood, starts).round(2).tolist()
+    mood_maxs = np.maximum.reduceat(mood, starts).round(2).tolist()
+
+    bucket_keys = keys[starts].tolist()
+    return [
+        {
+            "bucket_start": _bucket_start(bucket_keys[b], bucket),
+            "count": int(counts[b]),
+            "emotions": {
+                name: {"mean": means[b][j], "min": mins[b][j], "max": maxs[b][j]}
+                for j, name in enumerate(EMOTION_COLUMNS)
+            },
+            "mood_score": {"mean": mood_means[b], "min": mood_mins[b], "max": mood_maxs[b]}
+        }
+        for b in range(len(starts))
+    ]
+
+def mood_improvement(matrix: EmotionMatrix) -> Dict[str, Any]:
+    """Second half of the period compared with the first half"""
+    if len(matrix) < 2:
+        return {
+            "percentage": 0,
+            "trend": "neutral",
+            "message": "Need more data",
+            "days_compared": 0
+        }
+
+    net = matrix.net_scores()
+    mid_point = len(matrix) // 2
+    first_half_avg = int(net[:mid_point].sum()) / mid_point
+    second_half_avg = int(net[mid_point:].sum()) / (len(matrix) - mid_point)
+
+    if first_half_avg != 0:
+        improvement = ((second_half_avg - first_half_avg) / abs(first_half_avg)) * 100
+    else:
+        improvement = 0
+
+    trend = "improving" if improvement > 5 else "declining" if improvement < -5 else "stable"
+
+    return {
+        "percentage": round(improvement, 1),
+        "trend": trend,
+        "message": f"{abs(round(improvement))}% {'better' if improvement > 0 else 'change'} than last period",
+        "days_compared": len(matrix)
+    }
+
+def mood_journey(matrix: EmotionMatrix) -> Dict[str, Any]:
+    """Daily mood points and summary statistics"""
+    mood_scores = matrix.mood_scores()
+    dominant = matrix.dominant_emotions()
+    # Unscored days keep the integer neutral score, as the per-row helper did
+    values = [score if scored else 3 for score, scored in zip(mood_scores.tolist(), (matrix.total > 0).tolist())]
+    rounded = [round(value, 1) for value in values]
+    columns = [matrix.column(name).tolist() for name in EMOTION_COLUMNS]
+
+    mood_data = [
+        {
+            "date": matrix.dates[i],
+            "mood_score": rounded[i],
+            "dominant_emotion": dominant[i],
+            "emotions": {name: columns[j][i] for j, name in enumerate(EMOTION_COLUMNS)}
+        }
+        for i in range(len(matrix))
+    ]
+
+    if len(matrix):
+        avg_mood = _sequential_sum(mood_scores) / len(matrix)
+        min_mood = values[int(mood_scores.argmin())]
+        max_mood = values[int(mood_scores.argmax())]
+    else:
+        avg_mood = min_mood = max_mood = 3
+
+    return {
+        "daily_moods": mood_data,
+        "statistics": {
+            "average_mood": round(avg_mood, 1),
+            "lowest_mood": round(min_mood, 1),
+            "highest_mood": round(max_mood, 1),
+            "total_days": len(mood_data)
+        }
+    }
+
+def emotional_landscape(matrix: EmotionMatrix) -> Dict[str, Any]:
+    """Average share of each emotion group over the period"""
+    if not len(matrix):
+        return {
+            "emotions": [{"name": name, "percentage": 20, "color": color} for name, color in LANDSCAPE_COLORS.items()],
+            "dominant_emotion": "Neutral"
+        }
+
+    averages = [int(s) / len(matrix) for s in matrix.scores.sum(axis=0).tolist()]
+    avg = dict(zip(EMOTION_COLUMNS, averages))
+
+    total = _sequential_sum(np.array(averages))
+    if total == 0:
+        total = 1  # Avoid division by zero
+
+    shares = {
+        "Happy": avg["happy"],
+        "Calm": avg["neutral"],
+        "Sad": avg["sad"],
+        "Anxious": avg["anxious"],
+        "Angry": avg["angry"] + avg["agitated"]
+    }
+    emotions_data = [
+        {"name": name, "percentage": round((value / total) * 100, 1), "color": LANDSCAPE_COLORS[name]}
+        for name, value in shares.items()
+    ]
+
+    dominant = max(emotions_data, key=lambda x: x["percentage"])
+
+    return {
+        "emotions": emotions_data,
+        "dominant_emotion": dominant["name"]
+    }
+
+def good_days(matrix: EmotionMatrix) -> Dict[str, Any]:
+    """Days where positive emotions outweighed negative ones"""
+    count = int(np.count_nonzero(matrix.positive > matrix.negative))
+    total = len(matrix)
+    return {
+        "count": count,
+        "total": total,
+        "percentage": round((count / max(total, 1)) * 100, 1)
+    }
+
+def mood_stability(matrix: EmotionMatrix) -> int:
+    """Stability percentage from the coefficient of variation of daily mood"""
+    if len(matrix) < 3:
+        return 85  # Default for insufficient data
+
+    mood_scores = matrix.mood_ratios()
+    avg_mood = _sequential_sum(mood_scores) / len(matrix)
+    variance = _sequential_sum((mood_scores - avg_mood) ** 2) / len(matrix)
+    std_dev = variance ** 0.5
+
+    if avg_mood > 0:
+        cv = std_dev / avg_mood
+        # Convert to stability percentage (inverse of variation)
+        stability = max(0, min(100, (1 - cv) * 100))
+    else:
+        stability = 50
+
+    return round(stability)
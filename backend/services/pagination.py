@@ -0,0 +1,72 @@
+"""
+Keyset (cursor) pagination for list queries.
+
+Pages are ordered by a unique key, e.g. (journal_date, entry_id), and each
+page starts strictly after the last row of the previous one, so the database
+seeks through its index instead of counting past an OFFSET. Cursors are
+opaque to clients: base64url-encoded JSON of the last row's key values.
+"""
+
+from typing import Optional, Dict, Any, List, Tuple, Sequence
+import base64
+import json
+import os
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 1000))
+
+# List endpoints keep returning a plain JSON array; the next page's cursor travels in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this server did not issue"""
+
+def encode_cursor(row: Dict[str, Any], keys: Sequence[str]) -> str:
+    """Cursor pointing just past `row`"""
+    payload = json.dumps([row.get(key) for key in keys], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> List[Any]:
+    """Key values stored in a cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys) or any(v is None for v in values):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+def _quote(value: Any) -> str:
+    """Quote a value for a PostgREST logical filter"""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+def apply_keyset(query, keys: Sequence[str], values: Sequence[Any], descending: bool = False):
+    """Restrict an ordered query to rows after the given key values"""
+    op = "lt" if descending else "gt"
+    if len(keys) == 1:
+        return query.filter(keys[0], op, values[0])
+
+    # (a, b) > (x, y)  <=>  a > x or (a = x and b > y), expanded for any number of keys
+    branches = []
+    for i, key in enumerate(keys):
+        equal = [f"{k}.eq.{_quote(v)}" for k, v in zip(keys[:i], values[:i])]
+        condition = f"{key}.{op}.{_quote(values[i])}"
+        branches.append(f"and({','.join(equal + [condition])})" if equal else condition)
+    if hasattr(query, "or_"):
+        return query.or_(",".join(branches))
+    # postgrest-py before 0.14 (pinned by supabase 2.0) has no or_; add the same parameter it would
+    query.params = query.params.add("or", f"({','.join(branches)})")
+    return query
+
+def page_size(limit: Optional[int]) -> int:
+    """Clamp a requested page size to the configured bounds"""
+    return min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+def split_page(rows: List[Dict[str, Any]], limit: int, keys: Sequence[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim a limit+1 fetch to one page and build the cursor for the next"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1], keys)
@@ -0,0 +1,52 @@
+"""
+Named column projections for each table.
+
+Callers ask for a projection by name instead of selecting "*", so a request
+that only checks a row exists or reads dates never pulls profile pictures
+or journal texts over the wire:
+
+    exists     primary key, plus the owner where invalidation needs it
+    dates      what date-only aggregates (counts, streaks) read
+    summary    small display fields, no large texts or blobs
+    analytics  what the mood analytics read
+    export     what the history export writes
+    search     what the text indexes (search, similar days) read
+    full       every column
+"""
+
+from typing import Dict
+from backend.services.mood_analytics import EMOTION_COLUMNS
+
+SCORE_COLUMNS = ",".join(EMOTION_COLUMNS)
+
+PROJECTIONS: Dict[str, Dict[str, str]] = {
+    "user": {
+        "exists": "user_id",
+        "summary": "user_id,email,first_name,last_name,subscription_tier",
+        "full": "*"
+    },
+    "journal_entry": {
+        "exists": "entry_id,user_id",
+        "dates": "user_id,journal_date",
+        "summary": "entry_id,user_id,journal_date,episode_flag",
+        "export": "entry_id,journal_date,entry_text,AI_response,episode_flag",
+        "search": "entry_id,user_id,journal_date,entry_text,AI_response",
+        "full": "*"
+    },
+    "emotions": {
+        "analytics": f"entry_id,user_id,journal_date,{SCORE_COLUMNS}",
+        "export": f"id,entry_id,user_id,journal_date,{SCORE_COLUMNS}",
+        "full": "*"
+    },
+    "daily_mood_rollup": {
+        "analytics": f"user_id,journal_date,{SCORE_COLUMNS},positive,negative,mood_score,dominant_emotion",
+        "full": "*"
+    }
+}
+
+def columns_for(table: str, projection: str) -> str:
+    """Select list for a named projection of a table"""
+    try:
+        return PROJECTIONS[table][projection]
+    except KeyError:
+        raise ValueError(f"Unknown projection '{projection}' for table '{table}'")
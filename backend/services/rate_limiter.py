@@ -0,0 +1,97 @@
+"""
+Token-bucket rate limiting for Gemini calls.
+
+Gemini quotas are per minute on two axes, requests and tokens, so the
+limiter keeps one bucket for each. Both refill continuously at their
+per-minute rate and hold at most one minute's worth. A caller asks for one
+request plus its estimated token count and waits until both buckets can
+cover it; waiters are served in arrival order, so a large prompt cannot be
+starved by a stream of small ones. Once a call returns, settle() corrects
+the token bucket with the actual usage reported by the API.
+"""
+
+from typing import Optional, Dict, Any
+import asyncio
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", 30))
+GEMINI_TOKENS_PER_MINUTE = float(os.getenv("GEMINI_TOKENS_PER_MINUTE", 250000))
+
+# Rough prompt size estimate used before a call; settle() fixes it up afterwards
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str, expected_output_tokens: int = 0) -> int:
+    """Approximate token count of a prompt plus the expected response"""
+    return len(text) // CHARS_PER_TOKEN + 1 + expected_output_tokens
+
+class TokenBucket:
+    """Capacity refilled continuously at `rate_per_minute`, holding at most one minute's worth"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.level = rate_per_minute
+        self._updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (amounts above capacity wait for a full bucket)"""
+        self.refill()
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate) if self.rate > 0 else 0.0
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by every Gemini caller"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = GEMINI_TOKENS_PER_MINUTE
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock: Optional[asyncio.Lock] = None
+        self.total_wait = 0.0
+        self.acquired = 0
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until one request and `tokens` tokens fit in the quota, then take them"""
+        # Created lazily so the lock belongs to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    break
+                self.total_wait += wait
+                await asyncio.sleep(wait)
+            self.requests.level -= 1
+            self.tokens.level -= tokens
+            self.acquired += 1
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Charge (or refund) the difference between a call's estimate and its reported usage"""
+        if actual_tokens is None:
+            return
+        self.tokens.refill()
+        self.tokens.level -= actual_tokens - estimated_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.requests.capacity,
+            "tokens_per_minute": self.tokens.capacity,
+            "acquired": self.acquired,
+            "total_wait_seconds": round(self.total_wait, 2)
+        }
+
+# Create singleton instance
+gemini_rate_limiter = RateLimiter()
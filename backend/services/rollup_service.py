@@ -0,0 +1,224 @@
+"""
+Daily mood rollup store.
+
+One row per (user_id, journal_date) holding the day's seven emotion scores
+together with the values the dashboard derives from them (positive and
+negative sums, mood score, dominant emotion), so readers never re-derive
+them from raw `emotions` rows. Rows are upserted whenever an
+emotion record is written.
+
+Table definition (Supabase / PostgreSQL):
+
+    create table daily_mood_rollup (
+        user_id          text    not null references "user"(user_id) on delete cascade,
+        journal_date     date    not null,
+        entry_id         integer,
+        happy            integer not null default 0,
+        stressed         integer not null default 0,
+        anxious          integer not null default 0,
+        angry            integer not null default 0,
+        sad              integer not null default 0,
+        agitated         integer not null default 0,
+        neutral          integer not null default 0,
+        positive         integer not null,
+        negative         integer not null,
+        mood_score       double precision not null,
+        dominant_emotion text    not null,
+        updated_at       timestamptz not null default now(),
+        primary key (user_id, journal_date)
+    );
+
+Existing histories are filled in with `python -m backend.tasks.rollup_backfill`.
+Until then, and for days whose rollup write failed, readers derive the
+rows from `emotions` with the same function. Failed writes are kept and
+retried by the write-time analysis queue and the nightly run.
+"""
+
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime
+from backend.services.base_service import BaseService
+from backend.services.projections import columns_for
+from backend.services.mood_analytics import EmotionMatrix, EMOTION_COLUMNS, daily_rollups
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "daily_mood_rollup"
+
+def build_rollup_rows(emotion_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn emotion rows into rollup rows, keeping the last row per (user, date)"""
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    for row in emotion_rows:
+        latest[(row['user_id'], str(row['journal_date'])[:10])] = row
+    rows = sorted(latest.values(), key=lambda r: str(r['journal_date']))
+    if not rows:
+        return []
+
+    matrix = EmotionMatrix.from_rows([{**r, 'journal_date': str(r['journal_date'])[:10]} for r in rows])
+    derived = daily_rollups(matrix)
+
+    rollups = []
+    for row, extra in zip(rows, derived):
+        rollup = {
+            "user_id": row['user_id'],
+            "journal_date": str(row['journal_date'])[:10],
+            "entry_id": row.get('entry_id'),
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        rollup.update({column: row.get(column) or 0 for column in EMOTION_COLUMNS})
+        rollup.update(extra)
+        rollups.append(rollup)
+    return rollups
+
+class RollupService(BaseService):
+    def __init__(self):
+        super().__init__()
+        # Emotion rows whose rollup upsert failed, by (user_id, journal_date)
+        self._failed: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def upsert_from_emotions(self, emotion_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Recompute and store rollup rows for the given emotion rows"""
+        try:
+            rollups = build_rollup_rows(emotion_rows)
+            if not rollups:
+                return []
+            result = self.client.table(ROLLUP_TABLE).upsert(rollups, on_conflict="user_id,journal_date").execute()
+            for rollup in rollups:
+                self._failed.pop((rollup['user_id'], rollup['journal_date']), None)
+            return result.data or []
+        except Exception as e:
+            self._handle_error("upserting mood rollup", e)
+
+    def queue_repair(self, emotion_row: Dict[str, Any]):
+        """Remember an emotion row whose rollup could not be written, for repair_failed()"""
+        self._failed[(emotion_row['user_id'], str(emotion_row['journal_date'])[:10])] = emotion_row
+
+    def has_failed(self, user_id: str) -> bool:
+        """Whether a rollup write for this user is waiting to be repaired"""
+        return any(key_user == user_id for key_user, _ in list(self._failed))
+
+    def repair_failed(self) -> int:
+        """Retry every failed rollup write; returns how many still fail"""
+        failed = list(self._failed.values())
+        if not failed:
+            return 0
+        for row in failed:
+            try:
+                self.upsert_from_emotions([row])
+            except Exception as e:
+                logger.warning(f"[RollupService] ⚠️ Rollup for user {row['user_id']} on {row['journal_date']} still failing: {e}")
+        logger.info(f"[RollupService] 🔧 Repaired {len(failed) - len(self._failed)}/{len(failed)} failed rollup writes")
+        return len(self._failed)
+
+    def stats(self) -> Dict[str, int]:
+        return {"failed_writes": len(self._failed)}
+
+    def derive_rollups_for_users(self, user_ids: List[str], start_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rollup rows computed from the emotions table, grouped by user and ordered by date"""
+        try:
+            if not user_ids:
+                return []
+
+            def build_query(chunk):
+                query = self.client.table("emotions").select(columns_for("emotions", "analytics")).in_("user_id", chunk)
+                if start_date:
+                    query = query.gte("journal_date", str(start_date))
+                return query.order("user_id").order("journal_date").order("entry_id")
+
+            rollups = build_rollup_rows(self._fetch_in_chunks(build_query, user_ids))
+            return sorted(rollups, key=lambda r: (r['user_id'], r['journal_date']))
+        except Exception as e:
+            self._handle_error("deriving mood rollups from emotions", e)
+
+    def get_rollups_by_user(
+        self,
+        user_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        projection: str = "full",
+        limit: Optional[int] = None,
+        dates: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get rollup rows for a user, oldest first, optionally limited to a date range or to given dates"""
+        try:
+            def build_query():
+                query = self.client.table(ROLLUP_TABLE).select(columns_for(ROLLUP_TABLE, projection)).eq("user_id", user_id)
+                if dates is not None:
+                    query = query.in_("journal_date", [str(d) for d in dates])
+                if start_date:
+                    query = query.gte("journal_date", str(start_date))
+                if end_date:
+                    query = query.lte("journal_date", str(end_date))
+                return query.order("journal_date")
+
+            if limit is not None:
+                return build_query().limit(limit).execute().data or []
+            return self._fetch_all_pages(build_query)
+        except Exception as e:
+            self._handle_error("getting mood rollups", e)
+
+    def get_rollups_or_derive(
+        self,
+        user_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        projection: str = "full",
+        dates: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Rollup rows for a user, derived from emotions when none are stored yet or a rollup write failed"""
+        rows = self.get_rollups_by_user(user_id, start_date, end_date, projection=projection, dates=dates)
+        if rows and not self.has_failed(user_id):
+            return rows
+        logger.info(f"[RollupService] Reading emotions for user {user_id} instead of mood rollups")
+        wanted = {str(d) for d in dates} if dates is not None else None
+        return [
+            row for row in self.derive_rollups_for_users([user_id], start_date)
+            if (not end_date or row['journal_date'] <= str(end_date)) and (wanted is None or row['journal_date'] in wanted)
+        ]
+
+    def get_rollups_for_users(
+        self,
+        user_ids: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        projection: str = "full"
+    ) -> List[Dict[str, Any]]:
+        """Get rollup rows for several users, grouped by user and ordered by date"""
+        try:
+            if not user_ids:
+                return []
+
+            def build_query(chunk):
+                query = self.client.table(ROLLUP_TABLE).select(columns_for(ROLLUP_TABLE, projection)).in_("user_id", chunk)
+                if start_date:
+                    query = query.gte("journal_date", str(start_date))
+                if end_date:
+                    query = query.lte("journal_date", str(end_date))
+                return query.order("user_id").order("journal_date")
+
+            return self._fetch_in_chunks(build_query, user_ids)
+        except Exception as e:
+            self._handle_error("getting mood rollups for users", e)
+
+    def delete_day(self, user_id: str, journal_date: str):
+        """Remove a user's rollup row for a date"""
+        try:
+            self.client.table(ROLLUP_TABLE).delete().eq("user_id", user_id).eq("journal_date", str(journal_date)).execute()
+        except Exception as e:
+            self._handle_error("deleting mood rollup", e)
+
+    def rebuild_user(self, user_id: str) -> int:
+        """Rebuild every rollup row for a user from the emotions table"""
+        try:
+            emotion_rows = self._fetch_all_pages(
+                lambda: self.client.table("emotions").select(columns_for("emotions", "analytics"))
+                .eq("user_id", user_id).order("journal_date").order("entry_id").order("id")
+            )
+            rows = self.upsert_from_emotions(emotion_rows)
+            logger.info(f"[RollupService] ✓ Rebuilt {len(rows)} rollup rows for user {user_id}")
+            return len(rows)
+        except Exception as e:
+            self._handle_error("rebuilding mood rollups", e)
+
+# Create singleton instance
+rollup_service = RollupService()
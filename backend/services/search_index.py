@@ -0,0 +1,253 @@
+"""
+In-process inverted index for searching a user's journal.
+
+Each user's index maps terms from entry_text and AI_response to the entries
+containing them, with term frequencies for BM25 ranking. An index is built
+from the database the first time a user searches and is then kept current
+by the journal write paths, so a query only reads the postings of its own
+terms and never rescans the user's history. Indexes are held for the most
+recently searched users only (SEARCH_INDEX_USERS).
+
+Indexes live in one worker's memory, and only that worker's writes update
+them in place. To stay correct with several workers, each index is tagged
+with the user's journal write token (see data_version) and a search whose
+token no longer matches, because another worker or process wrote since,
+rebuilds the index. Writes that bypass the services do not move the token,
+so an index is also rebuilt once it is SEARCH_INDEX_TTL seconds old. A
+rebuild reads the user's whole history with the narrow "search" projection;
+moving the index into PostgreSQL (a tsvector column with a GIN index) would
+remove both the rebuilds and the per-worker memory.
+"""
+
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterable
+from collections import OrderedDict, Counter
+import math
+import os
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_USERS = int(os.getenv("SEARCH_INDEX_USERS", 256))
+# Seconds after which an index is rebuilt even if the user's write token is unchanged
+SEARCH_INDEX_TTL = float(os.getenv("SEARCH_INDEX_TTL", 900))
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+INDEXED_FIELDS = ("entry_text", "AI_response")
+
+STOPWORDS = frozenset("""
+a about after again all am an and any are as at be because been before being but by can could did do
+does doing down during each few for from had has have having he her here hers herself him himself his
+how i if in into is it its itself just me more most my myself no nor not now of off on once only or
+other our ours ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens, without stopwords and single characters"""
+    if not text:
+        return []
+    return [token for token in _TOKEN_RE.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+class UserIndex:
+    """Postings and document statistics for one user's entries"""
+
+    def __init__(self, version: Optional[str] = None):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.docs: Dict[int, Tuple[str, int, Counter]] = {}
+        self.total_length = 0
+        # Journal write token the index reflects, and when it was built (time.monotonic())
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def add(self, entry: Dict[str, Any]):
+        entry_id = int(entry["entry_id"])
+        self.remove(entry_id)
+        terms = Counter()
+        for field in INDEXED_FIELDS:
+            terms.update(tokenize(entry.get(field)))
+        length = sum(terms.values())
+        self.docs[entry_id] = (str(entry.get("journal_date"))[:10], length, terms)
+        self.total_length += length
+        for term, count in terms.items():
+            self.postings.setdefault(term, {})[entry_id] = count
+
+    def remove(self, entry_id: int):
+        doc = self.docs.pop(entry_id, None)
+        if doc is None:
+            return
+        _, length, terms = doc
+        self.total_length -= length
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(entry_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    def search(
+        self,
+        terms: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Tuple[float, int, str]]:
+        """BM25 score, entry_id and journal date of every matching entry, best first"""
+        doc_count = len(self.docs)
+        if not doc_count:
+            return []
+        average_length = self.total_length / doc_count or 1
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for entry_id, count in posting.items():
+                journal_date = self.docs[entry_id][0]
+                if (start_date and journal_date < start_date) or (end_date and journal_date > end_date):
+                    continue
+                length = self.docs[entry_id][1]
+                norm = count + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                scores[entry_id] = scores.get(entry_id, 0.0) + idf * count * (BM25_K1 + 1) / norm
+        hits = [(score, entry_id, self.docs[entry_id][0]) for entry_id, score in scores.items()]
+        hits.sort(key=lambda hit: (-hit[0], -hit[1]))
+        return hits
+
+class JournalSearchIndex:
+    """LRU of per-user indexes, updated in place by journal writes"""
+
+    def __init__(self, max_users: int = SEARCH_INDEX_USERS, ttl_seconds: float = SEARCH_INDEX_TTL):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._indexes: "OrderedDict[str, UserIndex]" = OrderedDict()
+        self._owners: Dict[int, str] = {}
+        # Bumped on every write, so a build that raced a write is not cached stale
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        user_id: str,
+        query: str,
+        load_entries: Callable[[str], List[Dict[str, Any]]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        data_version: Optional[str] = None
+    ) -> List[Tuple[float, int, str]]:
+        """Ranked (score, entry_id, journal_date) hits for a query, building the user's index if needed.
+
+        `data_version` is the user's current journal write token; a cached
+        index built for another token is rebuilt.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        user_id = str(user_id)
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                if index.version == data_version and time.monotonic() - index.built_at <= self.ttl_seconds:
+                    self._indexes.move_to_end(user_id)
+                    return index.search(terms, start_date, end_date)
+                logger.info(f"[JournalSearchIndex] Index for user {user_id} is outdated, rebuilding")
+                self._discard(user_id)
+            version = self._versions.get(user_id, 0)
+
+        index = UserIndex(data_version)
+        entries = load_entries(user_id)
+        for entry in entries:
+            index.add(entry)
+        logger.info(f"[JournalSearchIndex] ✓ Indexed {len(entries)} entries for user {user_id}")
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version and user_id not in self._indexes:
+                self._store(user_id, index)
+            return index.search(terms, start_date, end_date)
+
+    def index_entries(self, rows: Iterable[Dict[str, Any]], data_versions: Optional[Dict[str, Optional[str]]] = None):
+        """Add or replace written entries in the indexes of their (current and previous) owners.
+
+        `data_versions` maps owners to the journal write token their write
+        produced, which the updated index then reflects.
+        """
+        with self._lock:
+            for row in rows or []:
+                if row.get("entry_id") is None:
+                    continue
+                entry_id = int(row["entry_id"])
+                self._drop(entry_id)
+                user_id = str(row.get("user_id"))
+                self._bump(user_id)
+                index = self._indexes.get(user_id)
+                if index is not None:
+                    index.add(row)
+                    self._owners[entry_id] = user_id
+                    if data_versions is not None:
+                        index.version = data_versions.get(user_id)
+
+    def remove_entries(self, rows: Iterable[Dict[str, Any]], data_versions: Optional[Dict[str, Optional[str]]] = None):
+        """Remove deleted entries from the indexes"""
+        with self._lock:
+            for row in rows or []:
+                if row.get("entry_id") is None:
+                    continue
+                self._drop(int(row["entry_id"]))
+                user_id = str(row.get("user_id"))
+                self._bump(user_id)
+                index = self._indexes.get(user_id)
+                if index is not None and data_versions is not None:
+                    index.version = data_versions.get(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+            self._owners.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._indexes),
+                "max_users": self.max_users,
+                "entries": len(self._owners),
+                "terms": sum(len(index.postings) for index in self._indexes.values())
+            }
+
+    def _store(self, user_id: str, index: UserIndex):
+        """Cache a freshly built index, evicting the least recently searched; caller holds the lock"""
+        if self.max_users <= 0:
+            return
+        self._indexes[user_id] = index
+        for entry_id in index.docs:
+            self._owners[entry_id] = user_id
+        while len(self._indexes) > self.max_users:
+            _, evicted = self._indexes.popitem(last=False)
+            for entry_id in evicted.docs:
+                self._owners.pop(entry_id, None)
+
+    def _discard(self, user_id: str):
+        """Forget a user's index; caller holds the lock"""
+        index = self._indexes.pop(user_id, None)
+        if index is not None:
+            for entry_id in index.docs:
+                self._owners.pop(entry_id, None)
+
+    def _drop(self, entry_id: int):
+        """Remove an entry from whichever index holds it; caller holds the lock"""
+        owner = self._owners.pop(entry_id, None)
+        if owner is not None and owner in self._indexes:
+            self._indexes[owner].remove(entry_id)
+            self._bump(owner)
+
+    def _bump(self, user_id: str):
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+# Create singleton instance
+journal_search_index = JournalSearchIndex()
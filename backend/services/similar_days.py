@@ -0,0 +1,274 @@
+"""
+"Similar past days" retrieval over a user's daily conversations.
+
+Each journal day is one document: the conversation text the emotion analyzer
+reads for that day. Per user we keep the days' term counts as small sparse
+rows; the TF-IDF weighted, L2-normalized matrix (CSR arrays) is compiled
+from them once and reused until a write changes a day. A query is one
+vectorized pass: the cosine of the target day against every earlier day is
+a single bincount over the matrix's non-zeros.
+
+Writes only mark (user, day) pairs as stale; the next query re-reads those
+days and recompiles, without reloading the user's history. Matrices are held
+for the most recently queried users only (SIMILAR_DAYS_USERS).
+
+Matrices live in one worker's memory and only that worker's writes mark
+days stale. As with the search index, each matrix is tagged with the user's
+journal write token and rebuilt when a query sees another token, or once it
+is SIMILAR_DAYS_TTL seconds old.
+"""
+
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterable, Set
+from collections import OrderedDict, Counter
+import os
+import threading
+import time
+import logging
+import numpy as np
+from backend.services.search_index import tokenize
+from backend.utils.conversation_utils import format_conversation
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_DAYS_USERS = int(os.getenv("SIMILAR_DAYS_USERS", 128))
+# Seconds after which a matrix is rebuilt even if the user's write token is unchanged
+SIMILAR_DAYS_TTL = float(os.getenv("SIMILAR_DAYS_TTL", 900))
+
+# Every conversation line starts with one of these
+SPEAKER_LABELS = frozenset({"user", "ai"})
+
+def day_terms(entries: List[Dict[str, Any]]) -> Counter:
+    """Term counts of a day's conversation text"""
+    return Counter(term for term in tokenize(format_conversation(entries)) if term not in SPEAKER_LABELS)
+
+def group_by_day(entries: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Entries per journal date, keeping their (entry_id) order"""
+    days: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        days.setdefault(str(entry["journal_date"])[:10], []).append(entry)
+    return days
+
+class UserDayMatrix:
+    """Sparse TF-IDF rows of one user's journal days"""
+
+    def __init__(self, version: Optional[str] = None):
+        # Journal write token the matrix reflects, and when it was built (time.monotonic())
+        self.version = version
+        self.built_at = time.monotonic()
+        self.vocabulary: Dict[str, int] = {}
+        self.document_frequency = np.zeros(0, dtype=np.int64)
+        self.rows: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.entry_days: Dict[int, str] = {}
+        self._day_entries: Dict[str, List[int]] = {}
+        self._compiled: Optional[Dict[str, Any]] = None
+
+    def set_day(self, day: str, entries: List[Dict[str, Any]]):
+        """Replace a day's row with the terms of its current entries (none removes the day)"""
+        self._drop_row(day)
+        for entry_id in self._day_entries.pop(day, []):
+            if self.entry_days.get(entry_id) == day:
+                del self.entry_days[entry_id]
+        if entries:
+            self._day_entries[day] = [int(entry["entry_id"]) for entry in entries]
+            for entry_id in self._day_entries[day]:
+                self.entry_days[entry_id] = day
+        terms = day_terms(entries)
+        if not terms:
+            return
+        term_ids = np.fromiter((self._term_id(term) for term in terms), dtype=np.int64, count=len(terms))
+        counts = np.fromiter(terms.values(), dtype=np.float64, count=len(terms))
+        self.document_frequency[term_ids] += 1
+        self.rows[day] = (term_ids, counts)
+        self._compiled = None
+
+    def similar(self, day: str, limit: int) -> List[Tuple[str, float]]:
+        """The `limit` earlier days most similar to `day`, with their cosine similarity"""
+        compiled = self._compile()
+        position = compiled["positions"].get(day)
+        if position is None or position == 0:
+            return []
+        indptr, indices, weights = compiled["indptr"], compiled["indices"], compiled["weights"]
+
+        # Dense copy of the target row, then one multiply-and-sum over every non-zero
+        target = np.zeros(len(self.vocabulary))
+        start, end = indptr[position], indptr[position + 1]
+        target[indices[start:end]] = weights[start:end]
+        scores = np.bincount(compiled["row_ids"], weights=weights * target[indices], minlength=len(compiled["days"]))
+
+        # Days are sorted, so the past is everything before the target's row
+        past = scores[:position]
+        count = min(limit, len(past))
+        best = np.argpartition(-past, count - 1)[:count]
+        best = best[np.lexsort((-best, -past[best]))]
+        return [(compiled["days"][i], float(past[i])) for i in best if past[i] > 0]
+
+    def _compile(self) -> Dict[str, Any]:
+        """CSR arrays of the normalized TF-IDF matrix, rebuilt only after a day changed"""
+        if self._compiled is not None:
+            return self._compiled
+        days = sorted(self.rows)
+        lengths = np.fromiter((len(self.rows[day][0]) for day in days), dtype=np.int64, count=len(days))
+        indptr = np.zeros(len(days) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        if days:
+            indices = np.concatenate([self.rows[day][0] for day in days])
+            counts = np.concatenate([self.rows[day][1] for day in days])
+        else:
+            indices, counts = np.zeros(0, dtype=np.int64), np.zeros(0)
+        row_ids = np.repeat(np.arange(len(days)), lengths)
+
+        # Sublinear term frequency and smoothed IDF, rows scaled to unit length
+        idf = np.log((1 + len(days)) / (1 + self.document_frequency)) + 1
+        weights = (1 + np.log(counts)) * idf[indices]
+        norms = np.sqrt(np.bincount(row_ids, weights=weights * weights, minlength=len(days)))
+        weights /= norms[row_ids]
+
+        self._compiled = {
+            "days": days,
+            "positions": {day: i for i, day in enumerate(days)},
+            "indptr": indptr,
+            "indices": indices,
+            "row_ids": row_ids,
+            "weights": weights
+        }
+        return self._compiled
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = self.vocabulary[term] = len(self.vocabulary)
+            if term_id >= len(self.document_frequency):
+                grown = np.zeros(max(64, 2 * len(self.document_frequency)), dtype=np.int64)
+                grown[:len(self.document_frequency)] = self.document_frequency
+                self.document_frequency = grown
+        return term_id
+
+    def _drop_row(self, day: str):
+        row = self.rows.pop(day, None)
+        if row is not None:
+            self.document_frequency[row[0]] -= 1
+            self._compiled = None
+
+class SimilarDaysIndex:
+    """LRU of per-user day matrices, refreshed day by day after journal writes"""
+
+    def __init__(self, max_users: int = SIMILAR_DAYS_USERS, ttl_seconds: float = SIMILAR_DAYS_TTL):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._matrices: "OrderedDict[str, UserDayMatrix]" = OrderedDict()
+        # Days written since the user's matrix was last refreshed
+        self._stale_days: Dict[str, Set[str]] = {}
+        # Bumped on every write, so a build that raced a write is not cached stale
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def similar_days(
+        self,
+        user_id: str,
+        day: str,
+        limit: int,
+        load_entries: Callable[..., List[Dict[str, Any]]],
+        data_version: Optional[str] = None
+    ) -> Optional[List[Tuple[str, float]]]:
+        """Most similar earlier days, or None if the user wrote nothing that day.
+
+        `load_entries(user_id, dates=None)` returns entries with entry_id,
+        journal_date, entry_text and AI_response ordered by entry_id.
+        `data_version` is the user's current journal write token.
+        """
+        user_id = str(user_id)
+        matrix = self._matrix(user_id, load_entries, data_version)
+        with self._lock:
+            if day not in matrix.rows:
+                return None
+            return matrix.similar(day, limit)
+
+    def mark_entries(self, rows: Iterable[Dict[str, Any]], data_versions: Optional[Dict[str, Optional[str]]] = None):
+        """Mark the days of written or deleted entries (before and after the write) as stale.
+
+        `data_versions` maps owners to the journal write token their write
+        produced, which the matrix reflects once its stale days are refreshed.
+        """
+        with self._lock:
+            for row in rows or []:
+                user_id = str(row.get("user_id"))
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+                if user_id in self._matrices and row.get("journal_date"):
+                    self._stale_days.setdefault(user_id, set()).add(str(row["journal_date"])[:10])
+                    if data_versions is not None:
+                        self._matrices[user_id].version = data_versions.get(user_id)
+                if row.get("entry_id") is None:
+                    continue
+                # The day the entry was on before the write, possibly with another user
+                entry_id = int(row["entry_id"])
+                for owner_id, matrix in self._matrices.items():
+                    previous_day = matrix.entry_days.get(entry_id)
+                    if previous_day:
+                        self._stale_days.setdefault(owner_id, set()).add(previous_day)
+
+    def clear(self):
+        with self._lock:
+            self._matrices.clear()
+            self._stale_days.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._matrices),
+                "max_users": self.max_users,
+                "days": sum(len(matrix.rows) for matrix in self._matrices.values())
+            }
+
+    def _matrix(
+        self,
+        user_id: str,
+        load_entries: Callable[..., List[Dict[str, Any]]],
+        data_version: Optional[str] = None
+    ) -> UserDayMatrix:
+        """The user's matrix: cached and refreshed for stale days, or built from their history"""
+        with self._lock:
+            matrix = self._matrices.get(user_id)
+            if matrix is not None and (matrix.version != data_version or time.monotonic() - matrix.built_at > self.ttl_seconds):
+                # Written by another worker (or too old to trust): which days changed is unknown
+                logger.info(f"[SimilarDaysIndex] Matrix for user {user_id} is outdated, rebuilding")
+                del self._matrices[user_id]
+                self._stale_days.pop(user_id, None)
+                matrix = None
+            if matrix is not None:
+                self._matrices.move_to_end(user_id)
+                stale = self._stale_days.get(user_id)
+                if not stale:
+                    return matrix
+                stale = set(stale)
+            version = self._versions.get(user_id, 0)
+
+        if matrix is not None:
+            # Only the changed days are read again; they stay marked until the refresh succeeded
+            days = group_by_day(load_entries(user_id, dates=sorted(stale)))
+            with self._lock:
+                for day in stale:
+                    matrix.set_day(day, days.get(day, []))
+                remaining = self._stale_days.get(user_id, set()) - stale
+                if remaining:
+                    self._stale_days[user_id] = remaining
+                else:
+                    self._stale_days.pop(user_id, None)
+            logger.info(f"[SimilarDaysIndex] Refreshed {len(stale)} days for user {user_id}")
+            return matrix
+
+        matrix = UserDayMatrix(data_version)
+        days = group_by_day(load_entries(user_id))
+        for day, entries in days.items():
+            matrix.set_day(day, entries)
+        logger.info(f"[SimilarDaysIndex] ✓ Built TF-IDF matrix of {len(matrix.rows)} days for user {user_id}")
+
+        with self._lock:
+            if self._versions.get(user_id, 0) == version and user_id not in self._matrices and self.max_users > 0:
+                self._matrices[user_id] = matrix
+                while len(self._matrices) > self.max_users:
+                    evicted_id, _ = self._matrices.popitem(last=False)
+                    self._stale_days.pop(evicted_id, None)
+        return matrix
+
+# Create singleton instance
+similar_days_index = SimilarDaysIndex()
@@ -18,17 +18,19 @@ class SupabaseService:
         self.journals = journals_service
         self.emotions = emotions_service
         self.episodes = episodes_service
+        # Shared client for callers that query tables directly (e.g. the emotion analyzer)
+        self.client = journals_service.client
         logger.info("[SupabaseService] ✓ All services initialized")
     
     # User operations - delegate to users service
     def create_user(self, user_data):
         return self.users.create_user(user_data)
     
-    def get_user_by_id(self, user_id):
-        return self.users.get_user_by_id(user_id)
+    def get_user_by_id(self, user_id, projection="full"):
+        return self.users.get_user_by_id(user_id, projection)
     
-    def get_user_by_email(self, email):
-        return self.users.get_user_by_email(email)
+    def get_user_by_email(self, email, projection="full"):
+        return self.users.get_user_by_email(email, projection)
     
     def update_user(self, user_id, user_data):
         return self.users.update_user(user_id, user_data)
@@ -40,11 +42,11 @@ class SupabaseService:
     def create_journal_entry(self, entry_data):
         return self.journals.create_journal_entry(entry_data)
     
-    def get_journal_entries_by_user(self, user_id):
-        return self.journals.get_journal_entries_by_user(user_id)
+    def get_journal_entries_by_user(self, user_id, projection="full"):
+        return self.journals.get_journal_entries_by_user(user_id, projection)
     
-    def get_journal_entry_by_id(self, entry_id):
-        return self.journals.get_journal_entry_by_id(entry_id)
+    def get_journal_entry_by_id(self, entry_id, projection="full"):
+        return self.journals.get_journal_entry_by_id(entry_id, projection)
     
     def update_journal_entry(self, entry_id, entry_data):
         return self.journals.update_journal_entry(entry_id, entry_data)
@@ -56,8 +58,8 @@ class SupabaseService:
     def create_emotion_record(self, emotion_data):
         return self.emotions.create_emotion_record(emotion_data)
     
-    def get_emotions_by_user(self, user_id):
-        return self.emotions.get_emotions_by_user(user_id)
+    def get_emotions_by_user(self, user_id, projection="full"):
+        return self.emotions.get_emotions_by_user(user_id, projection)
     
     def get_emotions_by_entry(self, entry_id):
         return self.emotions.get_emotions_by_entry(entry_id)
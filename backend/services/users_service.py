@@ -1,5 +1,7 @@
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union, Tuple
 from backend.services.base_service import BaseService
+from backend.services.projections import columns_for
+from backend.services.pagination import apply_keyset, decode_cursor, split_page, page_size
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,18 +34,50 @@ class UsersService(BaseService):
         except Exception as e:
             self._handle_error("creating user", e)
     
-    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+    def get_user_by_id(self, user_id: str, projection: str = "full") -> Optional[Dict[str, Any]]:
         """Get user by ID"""
         try:
-            result = self.client.table("user").select("*").eq("user_id", user_id).execute()
+            result = self.client.table("user").select(columns_for("user", projection)).eq("user_id", user_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("getting user", e)
     
-    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+    def get_users_by_ids(self, user_ids: List[str], projection: str = "exists") -> List[Dict[str, Any]]:
+        """Get several users, querying them in chunks"""
+        try:
+            if not user_ids:
+                return []
+            return self._fetch_in_chunks(
+                lambda chunk: self.client.table("user").select(columns_for("user", projection)).in_("user_id", chunk).order("user_id"),
+                user_ids
+            )
+        except Exception as e:
+            self._handle_error("getting users by ids", e)
+    
+    PAGE_KEYS = ("user_id",)
+    
+    def get_users_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        projection: str = "full"
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of users ordered by user_id, and the cursor for the next page"""
+        after = decode_cursor(cursor, self.PAGE_KEYS) if cursor else None
+        size = page_size(limit)
+        try:
+            query = self.client.table("user").select(columns_for("user", projection))
+            if after:
+                query = apply_keyset(query, self.PAGE_KEYS, after)
+            result = query.order("user_id").limit(size + 1).execute()
+            return split_page(result.data or [], size, self.PAGE_KEYS)
+        except Exception as e:
+            self._handle_error("getting users page", e)
+    
+    def get_user_by_email(self, email: str, projection: str = "full") -> Optional[Dict[str, Any]]:
         """Get user by email"""
         try:
-            result = self.client.table("user").select("*").eq("email", email).execute()
+            result = self.client.table("user").select(columns_for("user", projection)).eq("email", email).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             self._handle_error("getting user by email", e)
@@ -0,0 +1,170 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.services.emotions_service import emotions_service
+from backend.services.journals_service import journals_service
+from backend.services.mood_analytics import EMOTION_COLUMNS
+from datetime import date
+from typing import Dict, Any, List
+import argparse
+import json
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columnar export of emotion scores and journal metadata for analysts.
+# Needs pyarrow, which the API itself does not: pip install -r requirements-analytics.txt
+#
+# Journal entries are exported past an entry_id watermark, emotion records past an id
+# watermark. A watermarks.json written before emotions moved to id holds an entry_id
+# for them; re-export emotions once with --since 0 into a fresh directory.
+#
+# Usage:
+#    python -m backend.tasks.analytics_export --out exports/                  # incremental, watermarks in exports/watermarks.json
+#    python -m backend.tasks.analytics_export --out exports/ --format arrow   # Arrow IPC files instead of Parquet
+#    python -m backend.tasks.analytics_export --out exports/ --since 0        # full re-export
+
+EXPORT_CHUNK_SIZE = int(os.getenv("ANALYTICS_EXPORT_CHUNK_SIZE", 5000))
+
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError:
+        raise SystemExit("[AnalyticsExport] ✗ pyarrow is required for columnar exports: pip install pyarrow")
+
+def _schemas(pa) -> Dict[str, Any]:
+    return {
+        "emotions": pa.schema(
+            [("id", pa.int64()), ("entry_id", pa.int64()), ("user_id", pa.string()), ("journal_date", pa.date32())]
+            + [(column, pa.int16()) for column in EMOTION_COLUMNS]
+        ),
+        "journal_entry": pa.schema([
+            ("entry_id", pa.int64()),
+            ("user_id", pa.string()),
+            ("journal_date", pa.date32()),
+            ("episode_flag", pa.int16())
+        ])
+    }
+
+# Table -> (fetch rows after a watermark, projection, watermark column)
+SOURCES: Dict[str, tuple] = {
+    "emotions": (emotions_service.get_emotions_after_id, "export", "id"),
+    "journal_entry": (journals_service.get_journal_entries_after_entry, "summary", "entry_id")
+}
+
+def _to_batch(pa, schema, rows: List[Dict[str, Any]]):
+    """One Arrow record batch from a page of rows"""
+    columns = {}
+    for field in schema:
+        values = [row.get(field.name) for row in rows]
+        if field.name == "journal_date":
+            values = [date.fromisoformat(str(v)[:10]) if v else None for v in values]
+        columns[field.name] = pa.array(values, type=field.type)
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+class _Writer:
+    """Parquet (one row group per chunk) or Arrow IPC (one record batch per chunk) file writer"""
+
+    def __init__(self, pa, path: str, schema, export_format: str):
+        if export_format == "parquet":
+            self._sink = None
+            self._writer = pa.parquet.ParquetWriter(path, schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema)
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+def export_table(
+    table: str,
+    after: int,
+    out_dir: str,
+    export_format: str = "parquet",
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """Write rows above the table's watermark to one file, a chunk at a time"""
+    pa = _import_pyarrow()
+    schema = _schemas(pa)[table]
+    fetch, projection, watermark_column = SOURCES[table]
+
+    tmp_path = os.path.join(out_dir, f".{table}-{after}.partial")
+    writer = None
+    watermark = after
+    row_count = 0
+    try:
+        while True:
+            rows = fetch(watermark, chunk_size, projection=projection)
+            if not rows:
+                break
+            if writer is None:
+                writer = _Writer(pa, tmp_path, schema, export_format)
+            writer.write(_to_batch(pa, schema, rows))
+            row_count += len(rows)
+            # A short page is not the end: PostgREST caps every response at its max-rows setting
+            watermark = rows[-1][watermark_column]
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        logger.info(f"[AnalyticsExport] No new {table} rows after {watermark_column} {after}")
+        return {"table": table, "rows": 0, "watermark": after, "path": None}
+
+    # Only a complete file gets its final name, so readers never see a partial export
+    path = os.path.join(out_dir, f"{table}-{after + 1}-{watermark}.{FILE_EXTENSIONS[export_format]}")
+    os.replace(tmp_path, path)
+    logger.info(f"[AnalyticsExport] ✓ Wrote {row_count} {table} rows to {path}")
+    return {"table": table, "rows": row_count, "watermark": watermark, "path": path}
+
+def load_watermarks(path: str) -> Dict[str, int]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_watermarks(path: str, watermarks: Dict[str, int]):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, path)
+
+def run_export(out_dir: str, export_format: str = "parquet", since: int = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """Export every table from its watermark and advance the watermarks"""
+    os.makedirs(out_dir, exist_ok=True)
+    state_path = os.path.join(out_dir, "watermarks.json")
+    watermarks = load_watermarks(state_path)
+
+    logger.info(f"[AnalyticsExport] 🚀 Exporting {', '.join(SOURCES)} as {export_format} to {out_dir}")
+    results = []
+    for table in SOURCES:
+        start = since if since is not None else watermarks.get(table, 0)
+        result = export_table(table, start, out_dir, export_format, chunk_size)
+        watermarks[table] = result["watermark"]
+        # Saved after each table so a failure later on does not re-export this one
+        save_watermarks(state_path, watermarks)
+        results.append(result)
+
+    logger.info(f"[AnalyticsExport] 📊 Results: " + ", ".join(f"{r['table']}={r['rows']}" for r in results))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export emotion scores and journal metadata as Parquet or Arrow IPC")
+    parser.add_argument("--out", required=True, help="output directory (also holds watermarks.json)")
+    parser.add_argument("--format", choices=sorted(FILE_EXTENSIONS), default="parquet")
+    parser.add_argument("--since", type=int, help="export rows after this watermark (entry_id, or id for emotions) instead of the saved one")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="rows per database page and per row group")
+    args = parser.parse_args()
+    run_export(args.out, args.format, args.since, args.chunk_size)
@@ -1,11 +1,19 @@
 import asyncio
 from datetime import datetime, date, timedelta
+from typing import List, Tuple, Dict
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.services.supabase_service import supabase_service
-from backend.services.emotion_analyzer import EmotionAnalyzer
+from backend.services.base_service import run_db
+from backend.services.journals_service import journals_service
+from backend.services.emotions_service import emotions_service
+from backend.services.rollup_service import rollup_service
+from backend.services.rate_limiter import gemini_rate_limiter
+from backend.services.emotion_analyzer import EmotionAnalyzer, GEMINI_BATCH_MAX_ITEMS
+from backend.tasks.entry_analysis import entry_analysis_queue
 import logging
+import time
 import re
 import json
 
@@ -13,34 +21,110 @@ import json
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Analyses in flight at once; the rate limiter decides how fast they start
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", 8))
+# Seconds between progress lines during a run
+PROGRESS_LOG_INTERVAL = float(os.getenv("ANALYSIS_PROGRESS_INTERVAL", 30))
+# User-days a worker takes at a time and analyzes with batched prompts (1 sends one request per user-day)
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", GEMINI_BATCH_MAX_ITEMS))
+# A run stops starting new analyses after this many seconds; the next catch-up picks up the rest
+ANALYSIS_RUN_TIMEOUT = float(os.getenv("ANALYSIS_RUN_TIMEOUT", 3 * 3600))
+
 class EmotionScheduler:
     def __init__(self):
         logger.info("[EmotionScheduler] Initializing EmotionScheduler...")
         try:
             self.analyzer = EmotionAnalyzer()
             self.is_running = False
+            # Counters of the latest run of each kind (daily, catch-up, refresh, import)
+            self.run_progress: Dict[str, Dict[str, int]] = {}
             logger.info("[EmotionScheduler] ✓ EmotionScheduler initialized successfully")
         except Exception as e:
             logger.error(f"[EmotionScheduler] ✗ Failed to initialize EmotionScheduler: {e}")
             raise
     
-    async def get_active_users_for_date(self, target_date: date) -> list:
-        """Get all users who have journal entries for a specific date"""
+    async def find_days_to_analyze(self, target_date: date) -> Tuple[List[str], List[str]]:
+        """Users whose day has no emotions record yet, and users whose record predates their newest entry.
+
+        Days with a write-time analysis still queued are left to it rather than analyzed twice.
+        """
         logger.info(f"[EmotionScheduler] Getting active users for {target_date}")
+        latest, analyzed = await asyncio.gather(
+            run_db(journals_service.get_latest_entry_ids, str(target_date)),
+            run_db(emotions_service.get_analyzed_entry_ids, str(target_date))
+        )
+        users = [user_id for user_id in sorted(latest) if not entry_analysis_queue.is_pending(user_id, target_date)]
+        if len(users) < len(latest):
+            logger.info(f"[EmotionScheduler] Skipping {len(latest) - len(users)} users with write-time analysis queued")
+        missing = [user_id for user_id in users if user_id not in analyzed]
+        stale = [user_id for user_id in users if user_id in analyzed and latest[user_id] > analyzed[user_id]]
+        logger.info(f"[EmotionScheduler] Found {len(latest)} active users: {len(missing)} unanalyzed, {len(stale)} with newer entries")
+        return missing, stale
+    
+    async def analyze_pool(
+        self,
+        user_days: List[Tuple[str, date]],
+        label: str,
+        concurrency: int = ANALYSIS_CONCURRENCY,
+        timeout: float = ANALYSIS_RUN_TIMEOUT,
+        batch_size: int = ANALYSIS_BATCH_SIZE,
+        recompute: bool = False
+    ) -> Dict[str, int]:
+        """Analyze (user, date) pairs on a bounded pool of workers, paced by the Gemini rate limiter and bounded by a run deadline.
+
+        With `recompute`, each day's existing emotions record is rebuilt from its entries' scores.
+        """
+        progress = {"total": len(user_days), "done": 0, "succeeded": 0, "failed": 0, "errors": 0, "skipped": 0}
+        self.run_progress[label] = progress
+        if not user_days:
+            return progress
         
-        try:
-            response = supabase_service.client.table("journal_entry") \
-                .select("user_id") \
-                .eq("journal_date", str(target_date)) \
-                .execute()
-            
-            users = list({row["user_id"] for row in response.data}) if response.data else []
-            logger.info(f"[EmotionScheduler] Found {len(users)} active users: {users}")
-            return users
-            
-        except Exception as e:
-            logger.error(f"[EmotionScheduler] Error getting active users: {e}")
-            return []
+        batch_size = max(1, batch_size)
+        pending = iter([user_days[i:i + batch_size] for i in range(0, len(user_days), batch_size)])
+        start = time.monotonic()
+        deadline = start + timeout
+        last_report = start
+        
+        async def worker():
+            nonlocal last_report
+            # Workers share one iterator, so each group is taken exactly once
+            for group in pending:
+                if time.monotonic() >= deadline:
+                    return
+                try:
+                    if recompute:
+                        outcomes = (await self.analyzer.analyze_entries_by_day(group, deadline=deadline)).values()
+                    elif len(group) == 1:
+                        user_id, target_date = group[0]
+                        outcomes = [await self.analyzer.analyze_user_day(user_id, target_date, deadline=deadline)]
+                    else:
+                        outcomes = (await self.analyzer.analyze_user_days_batch(group, deadline=deadline)).values()
+                    for success in outcomes:
+                        progress["succeeded" if success else "failed"] += 1
+                except Exception as e:
+                    progress["errors"] += len(group)
+                    logger.error(f"[EmotionScheduler] ✗ Error analyzing {len(group)} user-days starting with user {group[0][0]} on {group[0][1]}: {e}")
+                progress["done"] += len(group)
+                
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_LOG_INTERVAL:
+                    last_report = now
+                    self._log_progress(label, progress, now - start)
+        
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(user_days)))))
+        progress["skipped"] = progress["total"] - progress["done"]
+        if progress["skipped"]:
+            logger.warning(f"[EmotionScheduler] ⏰ {label}: run deadline of {timeout:.0f}s reached, {progress['skipped']} analyses left for catch-up")
+        self._log_progress(label, progress, time.monotonic() - start)
+        return progress
+    
+    def _log_progress(self, label: str, progress: Dict[str, int], elapsed: float):
+        rate = progress["done"] / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"[EmotionScheduler] 📊 {label}: {progress['done']}/{progress['total']} done, "
+            f"{progress['succeeded']} ok, {progress['failed']} failed, {progress['errors']} errors "
+            f"({rate:.1f}/s, limiter waited {gemini_rate_limiter.total_wait:.0f}s)"
+        )
     
     async def analyze_daily_emotions(self, target_date: date = None):
         """Analyze emotions for all users for a specific date"""
@@ -51,43 +135,25 @@ class EmotionScheduler:
         start_time = datetime.now()
         
         try:
-            # Get all users with journal entries for this date
-            active_users = await self.get_active_users_for_date(target_date)
+            # Rollup writes that failed since the last run
+            await run_db(rollup_service.repair_failed)
             
-            if not active_users:
-                logger.info(f"[EmotionScheduler] ⚠️ No active users found for {target_date}")
-                return
+            # Users with journal entries for this date that have no record yet, or an outdated one
+            missing, stale = await self.find_days_to_analyze(target_date)
             
-            logger.info(f"[EmotionScheduler] Processing {len(active_users)} users...")
+            if not missing and not stale:
+                logger.info(f"[EmotionScheduler] ⚠️ Nothing to analyze for {target_date}")
+                return
             
-            success_count = 0
-            failed_count = 0
-            
-            # Analyze emotions for each user
-            for i, user_id in enumerate(active_users, 1):
-                logger.info(f"[EmotionScheduler] Processing user {i}/{len(active_users)}: {user_id}")
-                
-                try:
-                    success = await self.analyzer.analyze_user_day(user_id, target_date)
-                    if success:
-                        success_count += 1
-                        logger.info(f"[EmotionScheduler] ✓ [{i}/{len(active_users)}] Completed analysis for user {user_id}")
-                    else:
-                        failed_count += 1
-                        logger.warning(f"[EmotionScheduler] ⚠️ [{i}/{len(active_users)}] Failed analysis for user {user_id}")
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(f"[EmotionScheduler] ✗ [{i}/{len(active_users)}] Error analyzing user {user_id}: {e}")
-                
-                # Small delay between users to avoid API rate limits
-                logger.debug(f"[EmotionScheduler] Waiting 2 seconds before next user...")
-                await asyncio.sleep(2)
+            logger.info(f"[EmotionScheduler] Processing {len(missing) + len(stale)} users with up to {ANALYSIS_CONCURRENCY} workers...")
+            progress = await self.analyze_pool([(user_id, target_date) for user_id in missing], "daily")
+            refreshed = await self.analyze_pool([(user_id, target_date) for user_id in stale], "refresh", recompute=True)
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
             
             logger.info(f"[EmotionScheduler] 🎉 Completed daily emotion analysis for {target_date}")
-            logger.info(f"[EmotionScheduler] 📊 Results: {success_count} successful, {failed_count} failed")
+            logger.info(f"[EmotionScheduler] 📊 Results: {progress['succeeded']} successful, {progress['failed'] + progress['errors']} failed, {refreshed['succeeded']} refreshed")
             logger.info(f"[EmotionScheduler] ⏱️ Total duration: {duration:.2f} seconds")
             
         except Exception as e:
@@ -97,47 +163,47 @@ class EmotionScheduler:
         """Analyze any missing emotion data for the last N days"""
         logger.info(f"[EmotionScheduler] 🔍 Checking for missing analysis in last {days_back} days")
         
-        missing_analyses = 0
-        
+        missing = []
+        stale = []
         for days_ago in range(1, days_back + 1):
             target_date = date.today() - timedelta(days=days_ago)
-            logger.info(f"[EmotionScheduler] Checking {target_date} ({days_ago} days ago)")
-            
-            # Get users who had journal entries on this date
-            active_users = await self.get_active_users_for_date(target_date)
             
-            for user_id in active_users:
-                # Check if emotions already exist for this user/date
-                emotions_exist = await self.analyzer.check_emotions_exist(user_id, target_date)
-                
-                if not emotions_exist:
-                    logger.info(f"[EmotionScheduler] 🔧 Missing analysis found for user {user_id} on {target_date}")
-                    success = await self.analyzer.analyze_user_day(user_id, target_date)
-                    if success:
-                        missing_analyses += 1
-                        logger.info(f"[EmotionScheduler] ✓ Catch-up analysis completed for {user_id} on {target_date}")
-                    else:
-                        logger.warning(f"[EmotionScheduler] ⚠️ Catch-up analysis failed for {user_id} on {target_date}")
-                    
-                    # Small delay to avoid API rate limits
-                    await asyncio.sleep(1)
+            # Users who had journal entries on this date but no emotions yet, or entries newer than them
+            try:
+                missing_users, stale_users = await self.find_days_to_analyze(target_date)
+            except Exception as e:
+                logger.error(f"[EmotionScheduler] Error checking {target_date}: {e}")
+                continue
+            missing.extend((user_id, target_date) for user_id in missing_users)
+            stale.extend((user_id, target_date) for user_id in stale_users)
+        
+        logger.info(f"[EmotionScheduler] 🔧 Found {len(missing)} missing and {len(stale)} outdated analyses")
+        progress = await self.analyze_pool(missing, "catch-up")
+        refreshed = await self.analyze_pool(stale, "refresh", recompute=True)
         
-        logger.info(f"[EmotionScheduler] 📊 Completed catch-up analysis: {missing_analyses} missing analyses filled")
-        return missing_analyses
+        logger.info(f"[EmotionScheduler] 📊 Completed catch-up analysis: {progress['succeeded']} missing analyses filled, {refreshed['succeeded']} refreshed")
+        return progress["succeeded"] + refreshed["succeeded"]
+    
+    async def analyze_user_days(self, user_days: List[Tuple[str, date]]):
+        """Analyze a batch of (user, date) pairs, e.g. the days touched by a bulk import"""
+        logger.info(f"[EmotionScheduler] 📥 Analyzing {len(user_days)} imported user-days")
+        
+        progress = await self.analyze_pool(user_days, "import")
+        
+        logger.info(f"[EmotionScheduler] 📊 Imported user-days analyzed: {progress['succeeded']}/{len(user_days)} successful")
+        return progress["succeeded"]
     
     async def check_api_health(self):
         """Test Gemini API connectivity"""
         logger.info("[EmotionScheduler] 🔍 Checking Gemini API health...")
         
         try:
-            test_conversation = "User: Hello\nAI: Hi there!"
-            emotions = await self.analyzer.analyze_emotions_with_gemini(test_conversation)
-            
-            if emotions != self.analyzer._get_default_emotions():
+            # A minimal request rather than an analysis, which the analysis cache could answer without reaching Gemini
+            if await self.analyzer.ping():
                 logger.info("[EmotionScheduler] ✅ Gemini API is healthy and responding")
                 return True
             else:
-                logger.warning("[EmotionScheduler] ⚠️ Gemini API returned default emotions - may be having issues")
+                logger.warning("[EmotionScheduler] ⚠️ Gemini API did not answer - may be having issues")
                 return False
                 
         except Exception as e:
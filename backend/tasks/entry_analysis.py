@@ -0,0 +1,153 @@
+"""
+Write-time emotion analysis.
+
+Creating or editing a journal entry enqueues its (user, date). A day is
+analyzed once it has been quiet for ENTRY_ANALYSIS_DELAY seconds, so the
+turns of a running chat are coalesced into one job, but never later than
+ENTRY_ANALYSIS_MAX_DELAY seconds after its first write. Due days are
+processed together: every entry is scored on its own (batched across days,
+with already-scored entries answered from the analysis cache) and the day's
+emotions record is recomputed from those scores. Dashboards therefore show
+today's mood within minutes, and the nightly run finds little left to do.
+
+A day that could not be fully scored keeps its saved record and is queued
+again after ENTRY_ANALYSIS_RETRY_DELAY seconds, doubling with each attempt,
+up to ENTRY_ANALYSIS_MAX_ATTEMPTS attempts. The queue lives in memory, so
+jobs given up on or lost in a restart are caught by the nightly run, which
+recomputes days whose record predates their newest entry.
+"""
+
+import asyncio
+from datetime import date
+from typing import Dict, Tuple, Optional
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.services.emotion_analyzer import EmotionAnalyzer
+from backend.services.base_service import run_db
+from backend.services.rollup_service import rollup_service
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds a day must be free of new writes before it is analyzed
+ENTRY_ANALYSIS_DELAY = float(os.getenv("ENTRY_ANALYSIS_DELAY", 30))
+# Upper bound on the wait after a day's first queued write, so a long chat is still analyzed
+ENTRY_ANALYSIS_MAX_DELAY = float(os.getenv("ENTRY_ANALYSIS_MAX_DELAY", 300))
+# Backoff before the first retry of a failed day; doubles with every further attempt
+ENTRY_ANALYSIS_RETRY_DELAY = float(os.getenv("ENTRY_ANALYSIS_RETRY_DELAY", 60))
+ENTRY_ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ENTRY_ANALYSIS_MAX_ATTEMPTS", 5))
+
+UserDay = Tuple[str, date]
+
+class EntryAnalysisQueue:
+    def __init__(self):
+        logger.info("[EntryAnalysisQueue] Initializing EntryAnalysisQueue...")
+        self.analyzer = EmotionAnalyzer()
+        self.is_running = False
+        # (user, date) -> (first queued, due) in time.monotonic()
+        self._pending: Dict[UserDay, Tuple[float, float]] = {}
+        # Failed attempts of days waiting for a retry
+        self._attempts: Dict[UserDay, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        logger.info("[EntryAnalysisQueue] ✓ EntryAnalysisQueue initialized successfully")
+
+    def enqueue(self, user_id: str, target_date: date):
+        """Queue a day for analysis, pushing its due time back while writes keep arriving"""
+        now = time.monotonic()
+        first, _ = self._pending.get((user_id, target_date), (now, now))
+        self._pending[(user_id, target_date)] = (first, min(now + ENTRY_ANALYSIS_DELAY, first + ENTRY_ANALYSIS_MAX_DELAY))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _retry(self, day: UserDay):
+        """Queue a failed day again with exponential backoff, giving up after the last attempt"""
+        attempts = self._attempts.get(day, 0) + 1
+        if attempts >= ENTRY_ANALYSIS_MAX_ATTEMPTS:
+            self._attempts.pop(day, None)
+            logger.error(f"[EntryAnalysisQueue] ✗ Giving up on user {day[0]} on {day[1]} after {attempts} attempts, leaving it to the nightly run")
+            return
+        self._attempts[day] = attempts
+        if day in self._pending:
+            # A newer write already queued the day again
+            return
+        due = time.monotonic() + ENTRY_ANALYSIS_RETRY_DELAY * 2 ** (attempts - 1)
+        self._pending[day] = (due, due)
+        self.retried += 1
+
+    def is_pending(self, user_id: str, target_date: date) -> bool:
+        return (user_id, target_date) in self._pending
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": len(self._pending), "processed": self.processed, "failed": self.failed, "retried": self.retried}
+
+    def _take_due(self) -> list:
+        """Remove and return the days that are due"""
+        now = time.monotonic()
+        due = [day for day, (_, due_at) in self._pending.items() if due_at <= now]
+        for day in due:
+            del self._pending[day]
+        return due
+
+    def _next_wait(self) -> Optional[float]:
+        """Seconds until the next queued day is due, or None if nothing is queued"""
+        next_due = min((due_at for _, due_at in self._pending.values()), default=None)
+        return None if next_due is None else max(0.0, next_due - time.monotonic())
+
+    async def process_due(self) -> Optional[float]:
+        """Analyze every due day; returns the seconds until the next one is due"""
+        due = self._take_due()
+        if not due:
+            return self._next_wait()
+
+        logger.info(f"[EntryAnalysisQueue] 📥 Analyzing {len(due)} recently written user-days")
+        if rollup_service.stats()["failed_writes"]:
+            await run_db(rollup_service.repair_failed)
+        try:
+            results = await self.analyzer.analyze_entries_by_day(due)
+        except Exception as e:
+            logger.error(f"[EntryAnalysisQueue] ✗ Error analyzing {len(due)} user-days: {e}")
+            results = {}
+        succeeded = 0
+        for day in due:
+            if results.get(day):
+                succeeded += 1
+                self._attempts.pop(day, None)
+            else:
+                self._retry(day)
+        self.processed += succeeded
+        self.failed += len(due) - succeeded
+        logger.info(f"[EntryAnalysisQueue] 📊 {succeeded}/{len(due)} user-days updated")
+        return self._next_wait()
+
+    async def start(self):
+        """Process queued days as they fall due until stopped"""
+        self.is_running = True
+        # Created here so the event belongs to the running event loop
+        self._wakeup = asyncio.Event()
+        logger.info("[EntryAnalysisQueue] 🔄 Starting write-time emotion analysis...")
+
+        while self.is_running:
+            try:
+                wait = await self.process_due()
+                self._wakeup.clear()
+                if wait is None or wait > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            except Exception as e:
+                logger.error(f"[EntryAnalysisQueue] ✗ Queue error: {e}")
+                await asyncio.sleep(60)
+
+    def stop(self):
+        """Stop processing; days still queued are left to the nightly run"""
+        self.is_running = False
+        logger.info(f"[EntryAnalysisQueue] 🛑 Write-time emotion analysis stopped ({len(self._pending)} user-days still queued)")
+
+# Create singleton instance
+entry_analysis_queue = EntryAnalysisQueue()
@@ -4,6 +4,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.services.supabase_service import supabase_service
+from backend.services.base_service import run_db
 import logging
 
 # Set up logging
@@ -24,11 +25,13 @@ class PlanScheduler:
             current_time = datetime.utcnow()
             
             # Get users with expired subscriptions - only use existing columns
-            response = supabase_service.client.table("user") \
-                .select("user_id, email, first_name, last_name, subscription_tier, subscription_expires_at") \
-                .neq("subscription_tier", "Free") \
-                .not_.is_("subscription_expires_at", "null") \
-                .execute()
+            response = await run_db(
+                supabase_service.client.table("user")
+                .select("user_id, email, first_name, last_name, subscription_tier, subscription_expires_at")
+                .neq("subscription_tier", "Free")
+                .not_.is_("subscription_expires_at", "null")
+                .execute
+            )
             
             if not response.data:
                 logger.info("[PlanScheduler] No users with expiring subscriptions found")
@@ -82,10 +85,12 @@ class PlanScheduler:
                 # Removed stripe fields as they don't exist in the database
             }
             
-            response = supabase_service.client.table("user") \
-                .update(update_data) \
-                .eq("user_id", user_id) \
-                .execute()
+            response = await run_db(
+                supabase_service.client.table("user")
+                .update(update_data)
+                .eq("user_id", user_id)
+                .execute
+            )
             
             if response.data:
                 logger.info(f"[PlanScheduler] ✓ Successfully converted user {user_id} to Free plan")
@@ -129,11 +134,13 @@ class PlanScheduler:
             current_time = datetime.utcnow()
             future_time = current_time + timedelta(days=days_ahead)
             
-            response = supabase_service.client.table("user") \
-                .select("user_id, email, first_name, last_name, subscription_tier, subscription_expires_at") \
-                .neq("subscription_tier", "Free") \
-                .not_.is_("subscription_expires_at", "null") \
-                .execute()
+            response = await run_db(
+                supabase_service.client.table("user")
+                .select("user_id, email, first_name, last_name, subscription_tier, subscription_expires_at")
+                .neq("subscription_tier", "Free")
+                .not_.is_("subscription_expires_at", "null")
+                .execute
+            )
             
             if not response.data:
                 return []
@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.services.rollup_service import rollup_service
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Usage:
+#    python -m backend.tasks.rollup_backfill            # every user with emotion data
+#    python -m backend.tasks.rollup_backfill U123 U456  # specific users
+
+def get_users_with_emotions() -> list:
+    """Get all users that have at least one emotion record"""
+    rows = rollup_service._fetch_all_pages(
+        lambda: rollup_service.client.table("emotions").select("user_id").order("user_id").order("id")
+    )
+    return sorted({row["user_id"] for row in rows})
+
+def backfill_rollups(user_ids: list = None) -> int:
+    """Rebuild daily_mood_rollup rows from the emotions table"""
+    if not user_ids:
+        user_ids = get_users_with_emotions()
+
+    logger.info(f"[RollupBackfill] 🚀 Rebuilding mood rollups for {len(user_ids)} users")
+
+    total_rows = 0
+    failed_count = 0
+    for user_id in user_ids:
+        try:
+            total_rows += rollup_service.rebuild_user(user_id)
+        except Exception as e:
+            failed_count += 1
+            logger.error(f"[RollupBackfill] ✗ Failed to rebuild rollups for user {user_id}: {e}")
+
+    logger.info(f"[RollupBackfill] 📊 Results: {total_rows} rows written, {failed_count} users failed")
+    return total_rows
+
+if __name__ == "__main__":
+    backfill_rollups(sys.argv[1:])
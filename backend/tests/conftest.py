@@ -0,0 +1,37 @@
+"""
+Test setup: the services talk to the in-memory Supabase stand-in from the
+benchmarks, so the suite needs no network, credentials or database.
+"""
+
+import os
+import tempfile
+
+# The analysis cache opens its SQLite file lazily; keep it out of the source tree
+os.environ.setdefault("ANALYSIS_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "analysis_cache.sqlite3"))
+
+from backend.benchmarks import fake_supabase
+
+client = fake_supabase.install()
+
+import pytest
+
+@pytest.fixture
+def db():
+    """Empty in-memory tables for one test"""
+    client.clear()
+    yield client
+    client.clear()
+
+@pytest.fixture
+def analyzer(db, tmp_path, monkeypatch):
+    """EmotionAnalyzer backed by a FakeModel, a private analysis cache and an unlimited rate limiter"""
+    from backend.services import emotion_analyzer
+    from backend.services.analysis_cache import AnalysisCache
+    from backend.services.rate_limiter import RateLimiter
+    from backend.tests.fakes import FakeModel
+
+    monkeypatch.setattr(emotion_analyzer, "analysis_cache", AnalysisCache(path=str(tmp_path / "analysis_cache.sqlite3")))
+    monkeypatch.setattr(emotion_analyzer, "gemini_rate_limiter", RateLimiter(1e6, 1e9))
+    instance = emotion_analyzer.EmotionAnalyzer()
+    instance.model = FakeModel()
+    return instance
@@ -0,0 +1,50 @@
+"""Test doubles for the Gemini model and helpers for in-memory table rows"""
+
+from typing import Callable, List, Optional
+from datetime import date
+import json
+import re
+
+from backend.services.mood_analytics import EMOTION_COLUMNS
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+def scores(**overrides) -> dict:
+    """All seven emotions at 0 unless overridden"""
+    return {**{name: 0 for name in EMOTION_COLUMNS}, **overrides}
+
+class FakeModel:
+    """Answers single and batch prompts with `score(conversation_text)`, or fails when `fail` is set"""
+
+    def __init__(self, score: Callable[[str], dict] = lambda text: scores(happy=5)):
+        self.score = score
+        self.fail = False
+        self.prompts: List[str] = []
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[dict] = None, request_options=None):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        tagged = re.findall(r'<conversation id="(\d+)">\n(.*?)\n</conversation>', prompt, re.DOTALL)
+        if tagged:
+            return FakeResponse(json.dumps([{"id": i, **self.score(text)} for i, text in tagged]))
+        conversation = re.search(r"Conversation: (.*?)\n\s*Return format", prompt, re.DOTALL)
+        if conversation is None:
+            return FakeResponse("OK")
+        return FakeResponse(json.dumps(self.score(conversation.group(1))))
+
+TODAY = date(2026, 3, 14)
+
+def add_entry(db, user_id: str, text: str, journal_date: date = TODAY) -> int:
+    """Insert a journal entry and return its entry_id"""
+    row = db.insert_rows("journal_entry", {
+        "user_id": user_id, "entry_text": text, "AI_response": "ok",
+        "journal_date": journal_date.isoformat(), "episode_flag": 0
+    })[0]
+    return row["entry_id"]
+
+def day_emotions(db, user_id: str, journal_date: date = TODAY) -> List[dict]:
+    return [row for row in db.tables["emotions"] if row["user_id"] == user_id and row["journal_date"] == journal_date.isoformat()]
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+from backend.services import analysis_cache as analysis_cache_module
+from backend.services import emotion_analyzer
+from backend.services.analysis_cache import AnalysisCache, cache_key
+from backend.tasks.emotion_scheduler import EmotionScheduler
+from backend.tests.fakes import scores
+
+def test_cache_key_ignores_whitespace_and_unicode_form():
+    assert cache_key("User: café  \n AI: hi", "m", "1") == cache_key("User: café AI: hi", "m", "1")
+    assert cache_key("User: hi", "m", "1") != cache_key("User: hi", "m", "2")
+    assert cache_key("User: hi", "m", "1") != cache_key("User: hi", "other", "1")
+
+def test_results_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = AnalysisCache(path=path)
+    cache.set("k", scores(happy=3))
+    cache.close()
+
+    assert AnalysisCache(path=path).get("k") == scores(happy=3)
+
+def test_get_many_returns_only_hits_and_counts_them(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.set_many({"a": scores(happy=1), "b": scores(sad=2)})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": scores(happy=1), "b": scores(sad=2)}
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+def test_least_recently_used_results_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_cache_module, "EVICTION_CHECK_INTERVAL", 1)
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("old", scores())
+    cache.set("used", scores())
+    cache.get("used")
+    cache.set("new", scores())
+
+    assert cache.get("old") is None
+    assert cache.get("used") is not None and cache.get("new") is not None
+    assert cache.stats()["size"] == 2
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = AnalysisCache(path=str(tmp_path / "cache.sqlite3"), max_entries=0)
+    cache.set("k", scores())
+    assert cache.get("k") is None
+
+def test_batch_reads_the_cache_once_off_the_event_loop(analyzer, monkeypatch):
+    cache = emotion_analyzer.analysis_cache
+    cache.set(cache_key("User: known", emotion_analyzer.GEMINI_MODEL, emotion_analyzer.PROMPT_VERSION), scores(sad=4))
+    lookups = []
+    get_many = cache.get_many
+    monkeypatch.setattr(cache, "get_many", lambda keys: lookups.append(threading.current_thread()) or get_many(keys))
+
+    results = asyncio.run(analyzer.analyze_emotions_batch({"a": "User: known", "b": "User: new", "c": "User: other"}))
+
+    assert results["a"] == scores(sad=4) and set(results) == {"a", "b", "c"}
+    assert len(lookups) == 1 and lookups[0] is not threading.main_thread()
+    # The one-request batch stored both new results
+    assert len(analyzer.model.prompts) == 1
+    assert cache.stats()["size"] == 3
+
+def test_health_check_reaches_gemini_even_when_cached(analyzer):
+    scheduler = EmotionScheduler.__new__(EmotionScheduler)
+    scheduler.analyzer = analyzer
+    asyncio.run(analyzer.analyze_emotions_with_gemini("User: Hello\nAI: Hi there!"))
+    calls = len(analyzer.model.prompts)
+
+    assert asyncio.run(scheduler.check_api_health()) is True
+    assert len(analyzer.model.prompts) == calls + 1
+
+    analyzer.model.fail = True
+    assert asyncio.run(scheduler.check_api_health()) is False
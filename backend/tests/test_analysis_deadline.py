@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.services import emotion_analyzer
+from backend.services.emotion_analyzer import AnalysisDeadlineExceeded
+from backend.tests.fakes import TODAY, add_entry, day_emotions
+
+async def hang(*args, **kwargs):
+    await asyncio.Event().wait()
+
+class HangingLimiter:
+    acquire = staticmethod(hang)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        pass
+
+def soon(seconds: float = 0.05) -> float:
+    return time.monotonic() + seconds
+
+def test_deadline_passing_while_waiting_for_the_limiter_raises(analyzer, monkeypatch):
+    monkeypatch.setattr(emotion_analyzer, "gemini_rate_limiter", HangingLimiter())
+
+    with pytest.raises(AnalysisDeadlineExceeded):
+        asyncio.run(analyzer._generate("User: hi", 60, soon()))
+    assert analyzer.model.prompts == []
+
+def test_deadline_passing_during_the_model_call_raises(analyzer):
+    analyzer.model.generate_content_async = hang
+
+    with pytest.raises(AnalysisDeadlineExceeded):
+        asyncio.run(analyzer._generate("User: hi", 60, soon()))
+
+def test_passed_deadline_raises_without_calling_the_model(analyzer):
+    with pytest.raises(AnalysisDeadlineExceeded):
+        asyncio.run(analyzer._generate("User: hi", 60, time.monotonic() - 1))
+    assert analyzer.model.prompts == []
+
+def test_call_timeout_without_a_deadline_is_a_failed_call(analyzer, monkeypatch):
+    monkeypatch.setattr(emotion_analyzer, "GEMINI_CALL_TIMEOUT", 0.05)
+    analyzer.model.generate_content_async = hang
+
+    assert asyncio.run(analyzer._generate("User: hi", 60)) is None
+
+def test_call_timeout_before_the_deadline_is_a_failed_call(analyzer, monkeypatch):
+    monkeypatch.setattr(emotion_analyzer, "GEMINI_CALL_TIMEOUT", 0.05)
+    analyzer.model.generate_content_async = hang
+
+    assert asyncio.run(analyzer._generate("User: hi", 60, soon(60))) is None
+
+def test_day_analysis_past_the_deadline_saves_nothing(db, analyzer):
+    add_entry(db, "u1", "hello")
+    prompts = []
+
+    async def hang_after_recording(prompt, **kwargs):
+        prompts.append(prompt)
+        await hang()
+
+    analyzer.model.generate_content_async = hang_after_recording
+
+    assert asyncio.run(analyzer.analyze_user_day("u1", TODAY, deadline=soon())) is False
+    assert len(prompts) == 1
+    assert day_emotions(db, "u1") == []
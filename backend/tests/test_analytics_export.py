@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from backend.benchmarks.fake_supabase import FakeQuery
+from backend.services.emotions_service import emotions_service
+from backend.tasks.analytics_export import export_table, run_export
+from backend.tests.fakes import add_entry, scores
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc
+import pyarrow.parquet
+
+def read_back(path: str, export_format: str):
+    if export_format == "parquet":
+        return pa.parquet.read_table(path)
+    with pa.OSFile(path, "rb") as source:
+        return pa.ipc.open_file(source).read_all()
+
+@pytest.fixture
+def max_rows(monkeypatch):
+    """Cap selects at 3 rows, below the export's chunk size"""
+    original = FakeQuery.execute
+
+    def execute(self):
+        response = original(self)
+        if self._op == "select":
+            response.data = response.data[:3]
+        return response
+
+    monkeypatch.setattr(FakeQuery, "execute", execute)
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_export_round_trips_every_chunk(db, tmp_path, export_format):
+    for day in range(1, 8):
+        db.insert_rows("emotions", {"user_id": "u1", "journal_date": f"2026-03-0{day}", "entry_id": day, **scores(happy=day)})
+
+    result = export_table("emotions", 0, str(tmp_path), export_format, chunk_size=3)
+    table = read_back(result["path"], export_format)
+
+    assert result["rows"] == 7 and result["watermark"] == 7
+    assert table.column("happy").to_pylist() == list(range(1, 8))
+    assert str(table.column("journal_date")[0]) == "2026-03-01"
+    if export_format == "parquet":
+        assert pa.parquet.ParquetFile(result["path"]).num_row_groups == 3
+
+def test_short_pages_from_the_row_cap_do_not_end_the_export(db, tmp_path, max_rows):
+    for i in range(8):
+        add_entry(db, "u1", f"entry {i}")
+
+    result = export_table("journal_entry", 0, str(tmp_path), chunk_size=5)
+
+    assert result["rows"] == 8
+    assert read_back(result["path"], "parquet").column("entry_id").to_pylist() == list(range(1, 9))
+
+def test_emotion_watermark_keeps_records_sharing_an_entry_and_skips_rewritten_ones(db, tmp_path):
+    # Re-analysis leaves several records with the same entry_id
+    for happy in range(4):
+        db.insert_rows("emotions", {"user_id": "u1", "journal_date": "2026-03-01", "entry_id": 1, **scores(happy=happy)})
+    run_export(str(tmp_path / "out"), chunk_size=3)
+    watermarks = json.loads((tmp_path / "out" / "watermarks.json").read_text())
+    assert watermarks["emotions"] == 4
+
+    # A later day's upsert moves an existing record to a new entry_id; it is not a new record
+    db.insert_rows("emotions", {"user_id": "u1", "journal_date": "2026-03-02", "entry_id": 2, **scores()})
+    emotions_service.upsert_daily_emotion({"user_id": "u1", "journal_date": "2026-03-02", "entry_id": 9, **scores(sad=3)})
+    results = run_export(str(tmp_path / "out"))
+
+    emotions = next(r for r in results if r["table"] == "emotions")
+    assert emotions["rows"] == 1
+    assert read_back(emotions["path"], "parquet").column("id").to_pylist() == [5]
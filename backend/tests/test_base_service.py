@@ -0,0 +1,17 @@
+import asyncio
+
+from backend.services.base_service import get_db_executor, run_db, shutdown_db_executor
+
+def test_run_db_works_again_after_shutdown():
+    assert asyncio.run(run_db(lambda x: x + 1, 1)) == 2
+    first = get_db_executor()
+
+    shutdown_db_executor()
+
+    assert asyncio.run(run_db(lambda x: x * 3, 2)) == 6
+    assert get_db_executor() is not first
+
+def test_shutdown_without_a_pool_is_harmless():
+    shutdown_db_executor()
+    shutdown_db_executor()
+    assert asyncio.run(run_db(str, 5)) == "5"
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+from backend.services.emotion_analyzer import build_batch_prompt, parse_batch_response, plan_batches, validate_scores
+from backend.tests.fakes import FakeResponse, add_entry, day_emotions, scores, TODAY
+
+def test_plan_batches_respects_token_budget_and_item_limit():
+    conversations = {i: "x" * 396 for i in range(5)}  # 100 estimated tokens each
+
+    assert plan_batches(conversations, token_budget=250, max_items=10) == [[0, 1], [2, 3], [4]]
+    assert plan_batches(conversations, token_budget=10000, max_items=2) == [[0, 1], [2, 3], [4]]
+
+def test_oversized_conversation_gets_its_own_request():
+    conversations = {"small": "hi", "huge": "x" * 4000, "also small": "hey"}
+    assert plan_batches(conversations, token_budget=100, max_items=10) == [["small"], ["huge"], ["also small"]]
+
+def test_batch_prompt_tags_conversations_in_order():
+    prompt = build_batch_prompt(["User: one ", "User: two"])
+    assert '<conversation id="1">\nUser: one\n</conversation>' in prompt
+    assert '<conversation id="2">\nUser: two\n</conversation>' in prompt
+
+def test_validate_scores_rejects_missing_fractional_and_out_of_range_values():
+    assert validate_scores(scores(happy=10.0)) == scores(happy=10)
+    assert validate_scores({"happy": 3}) is None
+    assert validate_scores(scores(sad=11)) is None
+    assert validate_scores(scores(sad=2.5)) is None
+    assert validate_scores(scores(sad=True)) is None
+    assert validate_scores("happy") is None
+
+def test_parse_batch_response_keeps_only_valid_known_ids():
+    reply = "Here you go:\n" + json.dumps([
+        {"id": "1", **scores(happy=4)},
+        {"id": 2, "happy": 3},
+        {"id": "7", **scores()},
+        {"id": "1", **scores(sad=9)},
+        {"id": "x", **scores()},
+        {"id": 3, **scores(neutral=6)}
+    ])
+
+    assert parse_batch_response(reply, 3) == {1: scores(happy=4), 3: scores(neutral=6)}
+
+def test_parse_batch_response_of_garbage_is_empty():
+    assert parse_batch_response("no json here", 2) == {}
+    assert parse_batch_response("[not json]", 2) == {}
+
+def test_items_missing_from_a_batch_reply_are_retried_singly(analyzer):
+    model = analyzer.model
+    generate = model.generate_content_async
+
+    async def drop_second(prompt, generation_config=None, request_options=None):
+        response = await generate(prompt, generation_config, request_options)
+        if "<conversation" in prompt:
+            return FakeResponse(json.dumps([item for item in json.loads(response.text) if item["id"] != "2"]))
+        return response
+
+    model.generate_content_async = drop_second
+    results = asyncio.run(analyzer.analyze_emotions_batch({"a": "User: one", "b": "User: two", "c": "User: three"}))
+
+    assert set(results) == {"a", "b", "c"}
+    assert len(model.prompts) == 2
+    assert "User: two" in model.prompts[-1] and "<conversation" not in model.prompts[-1]
+
+def test_several_users_days_share_one_request(db, analyzer):
+    analyzer.model.score = lambda text: scores(happy=7) if "sunny" in text else scores(sad=7)
+    add_entry(db, "u1", "sunny walk")
+    add_entry(db, "u2", "rainy commute")
+
+    results = asyncio.run(analyzer.analyze_user_days_batch([("u1", TODAY), ("u2", TODAY), ("u3", TODAY)]))
+
+    assert results == {("u1", TODAY): True, ("u2", TODAY): True, ("u3", TODAY): False}
+    assert len(analyzer.model.prompts) == 1
+    assert day_emotions(db, "u1")[0]["happy"] == 7
+    assert day_emotions(db, "u2")[0]["sad"] == 7
+
+def test_day_saved_by_the_write_time_queue_mid_batch_keeps_one_record(db, analyzer):
+    add_entry(db, "u1", "sunny walk")
+
+    async def saved_meanwhile(user_id, target_date):
+        # The write-time queue saves the day right after the nightly run's existence check
+        await analyzer.save_daily_emotions(user_id, target_date, 1, scores(sad=2))
+        return False
+
+    analyzer.check_emotions_exist = saved_meanwhile
+    analyzer.model.score = lambda text: scores(happy=7)
+
+    assert asyncio.run(analyzer.analyze_user_days_batch([("u1", TODAY)])) == {("u1", TODAY): True}
+    assert [row["happy"] for row in day_emotions(db, "u1")] == [7]
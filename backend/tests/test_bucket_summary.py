@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.mood_analytics import EmotionMatrix, bucket_summary
+from backend.services.rollup_service import rollup_service
+from backend.tests.fakes import scores
+
+def matrix(*days) -> EmotionMatrix:
+    """Matrix from (journal_date, score overrides) pairs in date order"""
+    return EmotionMatrix.from_rows([{"journal_date": day, **scores(**overrides)} for day, overrides in days])
+
+def starts_and_counts(buckets) -> list:
+    return [(bucket["bucket_start"], bucket["count"]) for bucket in buckets]
+
+def test_iso_week_spans_the_year_end():
+    days = matrix(
+        ("2025-12-28", {}),              # Sunday, last day of the previous week
+        ("2025-12-29", {"happy": 2}),    # Monday of ISO week 2026-W01
+        ("2025-12-31", {"happy": 4}),
+        ("2026-01-04", {"happy": 9}),    # Sunday, same week
+        ("2026-01-05", {})
+    )
+
+    buckets = bucket_summary(days, "week")
+
+    assert starts_and_counts(buckets) == [("2025-12-22", 1), ("2025-12-29", 3), ("2026-01-05", 1)]
+    assert buckets[1]["emotions"]["happy"] == {"mean": 5.0, "min": 2, "max": 9}
+
+def test_partial_months_only_cover_days_with_data():
+    days = matrix(
+        ("2025-12-31", {"sad": 3}),
+        ("2026-01-30", {"sad": 1}),
+        ("2026-01-31", {"sad": 2}),
+        ("2026-03-15", {"sad": 6})
+    )
+
+    buckets = bucket_summary(days, "month")
+
+    assert starts_and_counts(buckets) == [("2025-12-01", 1), ("2026-01-01", 2), ("2026-03-01", 1)]
+    assert buckets[1]["emotions"]["sad"] == {"mean": 1.5, "min": 1, "max": 2}
+    assert buckets[2]["emotions"]["happy"] == {"mean": 0.0, "min": 0, "max": 0}
+
+def test_unscored_days_count_as_a_neutral_mood():
+    buckets = bucket_summary(matrix(("2026-03-02", {}), ("2026-03-03", {"happy": 5})), "week")
+    assert buckets[0]["mood_score"] == {"mean": 4.0, "min": 3.0, "max": 5.0}
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_empty_range_has_no_buckets(bucket):
+    assert bucket_summary(matrix(), bucket) == []
+
+def test_unknown_bucket_is_rejected():
+    with pytest.raises(ValueError):
+        bucket_summary(matrix(("2026-03-02", {})), "year")
+
+def test_summary_endpoint_buckets_the_requested_range_only(db):
+    rollup_service.upsert_from_emotions([
+        {"user_id": "u1", "journal_date": day, "entry_id": i, **scores(happy=i)}
+        for i, day in enumerate(["2026-01-31", "2026-02-01", "2026-02-28", "2026-03-01"], start=1)
+    ])
+    api = TestClient(app)
+
+    february = api.get("/emotions/summary/u1", params={"bucket": "month", "start_date": "2026-02-01", "end_date": "2026-02-28"})
+    empty = api.get("/emotions/summary/u1", params={"bucket": "week", "start_date": "2026-04-01"})
+
+    assert starts_and_counts(february.json()) == [("2026-02-01", 2)]
+    assert empty.status_code == 200 and empty.json() == []
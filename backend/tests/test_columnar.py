@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services import columnar
+from backend.services.dashboard_cache import dashboard_cache
+from backend.services.mood_analytics import EMOTION_COLUMNS, EmotionMatrix, bucket_summary, mood_journey
+from backend.services.rollup_service import build_rollup_rows
+from backend.tests.fakes import add_entry
+
+# Scores as they come out of the database: some missing, some None, some days not scored at all
+EMOTION_ROWS = [
+    {"user_id": "u1", "journal_date": "2026-03-01", "entry_id": 1, "happy": 6, "sad": None, "stressed": 2},
+    {"user_id": "u1", "journal_date": "2026-03-02", "entry_id": 2},
+    {"user_id": "u1", "journal_date": "2026-03-05", "entry_id": 3, "anxious": 4, "neutral": None, "agitated": 1},
+    {"user_id": "u1", "journal_date": "2026-03-09", "entry_id": 4, **{name: None for name in EMOTION_COLUMNS}}
+]
+
+def day_dates(base_date, offsets) -> list:
+    return [(date.fromisoformat(base_date) + timedelta(days=offset)).isoformat() for offset in offsets]
+
+def daily_moods_from_columns(columns: dict) -> list:
+    """Row-wise daily_moods rebuilt from the columnar payload"""
+    names = columns["emotion_names"]
+    return [
+        {
+            "date": day,
+            "mood_score": columns["mood_scores"][i],
+            "dominant_emotion": names[columns["dominant_emotions"][i]],
+            "emotions": {name: columns["emotions"][name][i] for name in names}
+        }
+        for i, day in enumerate(day_dates(columns["base_date"], columns["day_offsets"]))
+    ]
+
+def rollups_from_columns(columns: dict) -> list:
+    names = columns["emotion_names"]
+    return [
+        {
+            "journal_date": day,
+            **{name: columns["emotions"][name][i] for name in names},
+            "mood_score": columns["mood_scores"][i],
+            "dominant_emotion": names[columns["dominant_emotions"][i]] if columns["dominant_emotions"][i] is not None else None,
+            "positive": columns["positive"][i],
+            "negative": columns["negative"][i]
+        }
+        for i, day in enumerate(day_dates(columns["base_date"], columns["day_offsets"]))
+    ]
+
+def buckets_from_columns(columns: dict) -> list:
+    stats = ("mean", "min", "max")
+    return [
+        {
+            "bucket_start": start,
+            "count": columns["counts"][b],
+            "emotions": {name: {stat: columns["emotions"][name][stat][b] for stat in stats} for name in EMOTION_COLUMNS},
+            "mood_score": {stat: columns["mood_score"][stat][b] for stat in stats}
+        }
+        for b, start in enumerate(columns["bucket_starts"])
+    ]
+
+def rollup_fields(row: dict) -> dict:
+    return {key: row.get(key) for key in ("journal_date", *EMOTION_COLUMNS, "mood_score", "dominant_emotion", "positive", "negative")}
+
+def test_daily_moods_match_the_row_format():
+    journey = mood_journey(EmotionMatrix.from_rows(EMOTION_ROWS))
+    assert daily_moods_from_columns(columnar.columnar_daily_moods(journey["daily_moods"])) == journey["daily_moods"]
+
+def test_rollups_match_the_row_format():
+    rows = build_rollup_rows(EMOTION_ROWS)
+    # A rollup row written before the derived columns existed
+    rows.append({"user_id": "u1", "journal_date": "2026-03-10", **{name: 0 for name in EMOTION_COLUMNS}})
+
+    assert rollups_from_columns(columnar.columnar_rollups(rows)) == [rollup_fields(row) for row in rows]
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_buckets_match_the_row_format(bucket):
+    buckets = bucket_summary(EmotionMatrix.from_rows(EMOTION_ROWS), bucket)
+    assert buckets_from_columns(columnar.columnar_buckets(buckets)) == buckets
+
+def test_empty_payloads_have_empty_columns():
+    assert columnar.columnar_daily_moods([])["day_offsets"] == [] and columnar.columnar_daily_moods([])["base_date"] is None
+    assert columnar.columnar_rollups([])["mood_scores"] == []
+    assert columnar.columnar_buckets([])["bucket_starts"] == []
+
+def test_endpoints_send_the_same_data_in_both_formats(db):
+    dashboard_cache.clear()
+    today = date.today()
+    db.insert_rows("user", {"user_id": "u1"})
+    for days_ago, row in zip((6, 5, 2, 0), EMOTION_ROWS):
+        journal_date = (today - timedelta(days=days_ago)).isoformat()
+        add_entry(db, "u1", "hello", date.fromisoformat(journal_date))
+        db.insert_rows("emotions", {**row, "journal_date": journal_date})
+    api = TestClient(app)
+
+    def both(path, **params):
+        rows = api.get(path, params=params).json()
+        return rows, api.get(path, params={**params, "format": "columnar"}).json()
+
+    rows, columns = both("/emotions/dashboard/u1", days=7)
+    assert len(rows["mood_journey"]["daily_moods"]) == 4
+    assert daily_moods_from_columns(columns["mood_journey"]["daily_moods"]) == rows["mood_journey"]["daily_moods"]
+    assert {key: value for key, value in columns.items() if key != "mood_journey"} == {key: value for key, value in rows.items() if key != "mood_journey"}
+
+    rows, columns = both("/emotions/summary/u1")
+    assert len(rows) == 4
+    assert rollups_from_columns(columns) == [rollup_fields(row) for row in rows]
+
+    rows, columns = both("/emotions/summary/u1", bucket="week")
+    assert buckets_from_columns(columns) == rows
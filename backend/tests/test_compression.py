@@ -0,0 +1,95 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.middleware import compression
+from backend.middleware.compression import CompressionMiddleware, choose_encoding
+
+brotli = pytest.importorskip("brotli")
+
+BIG = "x" * 2000
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("x" * 1023)
+
+    @app.get("/stream")
+    def stream():
+        lines = (f'{{"line": {i}, "pad": "{"y" * 1000}"}}\n' for i in range(3))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(BIG.encode()), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    return app
+
+@pytest.fixture
+def api():
+    return TestClient(make_app())
+
+@pytest.mark.parametrize("accept, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0.5", "gzip"),
+    ("identity", None),
+    ("", None)
+])
+def test_brotli_is_preferred_when_accepted(accept, expected):
+    assert choose_encoding(accept) == expected
+
+def test_gzip_is_used_when_brotli_is_not_installed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("br") is None
+
+@pytest.mark.parametrize("accept, encoding, decompress", [
+    ("br", "br", brotli.decompress),
+    ("gzip", "gzip", gzip.decompress)
+])
+def test_large_responses_are_compressed_with_matching_headers(api, accept, encoding, decompress):
+    with api.stream("GET", "/big", headers={"Accept-Encoding": accept}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) == len(raw) < len(BIG)
+    assert decompress(raw) == BIG.encode()
+
+def test_responses_below_the_threshold_are_sent_as_is(api):
+    response = api.get("/small", headers={"Accept-Encoding": "gzip, br"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert response.headers["content-length"] == "1023"
+
+def test_clients_without_a_supported_encoding_get_identity(api):
+    response = api.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+    assert response.text == BIG
+
+def test_streaming_ndjson_is_passed_through_uncompressed(api):
+    response = api.get("/stream", headers={"Accept-Encoding": "gzip, br"})
+
+    assert "content-encoding" not in response.headers
+    assert [line[:10] for line in response.text.splitlines()] == ['{"line": 0', '{"line": 1', '{"line": 2']
+
+def test_already_encoded_responses_are_not_encoded_twice(api):
+    response = api.get("/encoded", headers={"Accept-Encoding": "br"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BIG
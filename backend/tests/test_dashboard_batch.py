@@ -0,0 +1,76 @@
+from datetime import date
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.fake_supabase import FakeQuery
+from backend.main import app
+from backend.services import base_service
+from backend.services.dashboard_cache import dashboard_cache
+from backend.services.data_version import data_version_service
+from backend.services.rollup_service import rollup_service
+from backend.tests.fakes import add_entry, scores
+
+@pytest.fixture
+def in_filter_sizes(monkeypatch):
+    sizes = []
+    original = FakeQuery.in_
+
+    def in_(self, column, values):
+        sizes.append(len(values))
+        return original(self, column, values)
+
+    monkeypatch.setattr(FakeQuery, "in_", in_)
+    return sizes
+
+def test_fetch_in_chunks_merges_chunks_in_value_order(db, in_filter_sizes):
+    for user_id in ("u3", "u1", "u2"):
+        db.insert_rows("user", {"user_id": user_id})
+
+    rows = rollup_service._fetch_in_chunks(
+        lambda chunk: db.table("user").select("user_id").in_("user_id", chunk).order("user_id"),
+        ["u3", "u2", "u1", "u2"], chunk_size=2
+    )
+
+    assert [row["user_id"] for row in rows] == ["u1", "u2", "u3"]
+    assert in_filter_sizes == [2, 1]
+
+def test_batch_of_many_users_is_queried_in_chunks(db, in_filter_sizes):
+    dashboard_cache.clear()
+    today = date.today()
+    user_ids = [f"user-{i:03d}" for i in range(250)]
+    for user_id in user_ids:
+        db.insert_rows("user", {"user_id": user_id})
+        add_entry(db, user_id, "hello", today)
+        rollup_service.upsert_from_emotions([{"user_id": user_id, "journal_date": today.isoformat(), "entry_id": 1, **scores(happy=6)}])
+
+    response = TestClient(app).post("/emotions/dashboard/batch", json={"user_ids": user_ids, "days": 7})
+
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [line["user_id"] for line in lines] == user_ids
+    assert all(line["dashboard"]["journal_entries"]["total_period"] == 1 for line in lines)
+    assert max(in_filter_sizes) <= base_service.IN_FILTER_CHUNK_SIZE
+
+def test_batch_does_not_serve_dashboards_cached_before_another_workers_write(db):
+    dashboard_cache.clear()
+    today = date.today()
+    db.insert_rows("user", {"user_id": "u1"})
+    add_entry(db, "u1", "hello", today)
+    api = TestClient(app)
+
+    def batch_total():
+        line = orjson.loads(api.post("/emotions/dashboard/batch", json={"user_ids": ["u1"], "days": 7}).content)
+        return line["dashboard"]["journal_entries"]["total_period"]
+
+    assert batch_total() == 1
+    assert dashboard_cache.get("u1", 7) is not None
+    # Another worker's write changes the persisted version but not this worker's cache
+    db.insert_rows("journal_entry", {"user_id": "u1", "entry_text": "again", "AI_response": "ok", "journal_date": today.isoformat(), "episode_flag": 0})
+    data_version_service.bump("u1", "journal_version")
+
+    assert batch_total() == 2
+    # The batch cached its payload under the same version the single endpoint checks
+    hits = dashboard_cache.hits
+    assert api.get("/emotions/dashboard/u1", params={"days": 7}).json()["journal_entries"]["total_period"] == 2
+    assert dashboard_cache.hits == hits + 1
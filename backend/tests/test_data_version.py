@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.dashboard_cache import DashboardCache, dashboard_cache
+from backend.services.data_version import get_user_data_version, make_etag, etag_matches
+from backend.tasks.entry_analysis import entry_analysis_queue
+from backend.tests.fakes import TODAY, add_entry
+
+@pytest.fixture
+def api(db, monkeypatch):
+    monkeypatch.setattr(entry_analysis_queue, "_pending", {})
+    dashboard_cache.clear()
+    return TestClient(app)
+
+def emotions_etag(api, user_id: str = "u1") -> str:
+    response = api.get("/emotions/", params={"user_id": user_id})
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+def test_etag_matches_ignores_weak_prefix_and_accepts_star():
+    etag = make_etag("v1", 30)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(make_etag("v2", 30), etag)
+
+def test_matching_if_none_match_returns_304(api, db):
+    add_entry(db, "u1", "hello")
+    etag = emotions_etag(api)
+
+    response = api.get("/emotions/", params={"user_id": "u1"}, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+def test_in_place_edit_changes_etag_in_a_fresh_worker(api, db):
+    entry_id = add_entry(db, "u1", "first draft")
+    before = emotions_etag(api)
+
+    edit = {"user_id": "u1", "entry_text": "second draft", "AI_response": "ok", "journal_date": TODAY.isoformat()}
+    assert api.put(f"/journal-entries/{entry_id}", json=edit).status_code == 200
+    # Another worker shares nothing in memory with the one that took the write
+    dashboard_cache.clear()
+
+    assert emotions_etag(api) != before
+
+def test_version_depends_only_on_persisted_state(db):
+    add_entry(db, "u1", "hello")
+    first = asyncio.run(get_user_data_version("u1"))
+    dashboard_cache.clear()
+    assert asyncio.run(get_user_data_version("u1")) == first
+
+def test_dashboard_cache_misses_for_another_version():
+    cache = DashboardCache(max_size=10, ttl_seconds=60)
+    cache.set("u1", 30, {"days": 30}, TODAY, version="v1")
+
+    assert cache.get("u1", 30, TODAY, version="v1") == {"days": 30}
+    assert cache.get("u1", 30, TODAY, version="v2") is None
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from backend.tasks.emotion_scheduler import emotion_scheduler
+from backend.tasks.entry_analysis import entry_analysis_queue
+from backend.tests.fakes import scores, add_entry, day_emotions, TODAY
+
+@pytest.fixture
+def scheduler(analyzer, monkeypatch):
+    monkeypatch.setattr(emotion_scheduler, "analyzer", analyzer)
+    monkeypatch.setattr(entry_analysis_queue, "_pending", {})
+    return emotion_scheduler
+
+def save_record(db, user_id: str, entry_id: int, **emotions):
+    db.insert_rows("emotions", {"user_id": user_id, "journal_date": TODAY.isoformat(), "entry_id": entry_id, **scores(**emotions)})
+
+def test_nightly_run_recomputes_records_older_than_newest_entry(db, scheduler):
+    scheduler.analyzer.model.score = lambda text: scores(sad=8)
+    first = add_entry(db, "stale", "morning")
+    save_record(db, "stale", first, happy=9)
+    newest = add_entry(db, "stale", "evening turn whose job was lost")
+
+    asyncio.run(scheduler.analyze_daily_emotions(TODAY))
+
+    [row] = day_emotions(db, "stale")
+    assert row["entry_id"] == newest
+    assert row["sad"] == 8
+
+def test_nightly_run_skips_up_to_date_and_analyzes_missing_days(db, scheduler):
+    done = add_entry(db, "done", "all analyzed")
+    save_record(db, "done", done, happy=3)
+    add_entry(db, "new", "never analyzed")
+
+    asyncio.run(scheduler.analyze_daily_emotions(TODAY))
+
+    assert all("all analyzed" not in prompt for prompt in scheduler.analyzer.model.prompts)
+    assert day_emotions(db, "done")[0]["happy"] == 3
+    assert len(day_emotions(db, "new")) == 1
+
+def test_nightly_run_leaves_queued_days_to_write_time_analysis(db, scheduler):
+    add_entry(db, "u1", "just written")
+    entry_analysis_queue.enqueue("u1", TODAY)
+
+    asyncio.run(scheduler.analyze_daily_emotions(TODAY))
+
+    assert scheduler.analyzer.model.prompts == []
+
+class PoolAnalyzer:
+    """Per-day outcomes for analyze_pool: True, False, or raise for days in `broken`"""
+
+    def __init__(self, failing=(), broken=()):
+        self.failing, self.broken = set(failing), set(broken)
+        self.groups = []
+
+    async def analyze_user_day(self, user_id, target_date, deadline=None):
+        return (await self.analyze_user_days_batch([(user_id, target_date)], deadline))[(user_id, target_date)]
+
+    async def analyze_user_days_batch(self, user_days, deadline=None):
+        self.groups.append(list(user_days))
+        if self.broken & {user_id for user_id, _ in user_days}:
+            raise RuntimeError("connection reset")
+        return {(user_id, day): user_id not in self.failing for user_id, day in user_days}
+
+def test_pool_takes_every_group_once_and_counts_outcomes(monkeypatch):
+    monkeypatch.setattr(emotion_scheduler, "analyzer", PoolAnalyzer(failing={"u2"}, broken={"u5"}))
+    user_days = [(f"u{i}", TODAY) for i in range(6)]
+
+    progress = asyncio.run(emotion_scheduler.analyze_pool(user_days, "test", concurrency=3, batch_size=2))
+
+    groups = emotion_scheduler.analyzer.groups
+    assert sorted(day for group in groups for day in group) == user_days and len(groups) == 3
+    assert progress == {"total": 6, "done": 6, "succeeded": 3, "failed": 1, "errors": 2, "skipped": 0}
+
+def test_pool_stops_taking_work_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(emotion_scheduler, "analyzer", PoolAnalyzer())
+
+    progress = asyncio.run(emotion_scheduler.analyze_pool([("u1", TODAY), ("u2", TODAY)], "test", timeout=0))
+
+    assert progress["skipped"] == 2 and emotion_scheduler.analyzer.groups == []
@@ -0,0 +1,137 @@
+import asyncio
+
+from backend.services.emotion_analyzer import combine_entry_scores
+from backend.tasks import entry_analysis
+from backend.tasks.entry_analysis import EntryAnalysisQueue
+from backend.tests.fakes import scores, add_entry, day_emotions, TODAY
+
+def test_combine_entry_scores_weights_by_length():
+    combined = combine_entry_scores([scores(happy=10), scores(sad=10)], [300, 100])
+    assert combined["happy"] == 8
+    assert combined["sad"] == 2
+    assert combined["neutral"] == 0
+
+def test_combine_entry_scores_without_weights_is_plain_mean():
+    assert combine_entry_scores([scores(happy=4), scores(happy=8)], [0, 0])["happy"] == 6
+
+def test_day_record_is_recomputed_from_entry_scores(db, analyzer):
+    analyzer.model.score = lambda text: scores(happy=9) if "great" in text else scores(sad=6)
+    add_entry(db, "u1", "a great morning")
+    last_id = add_entry(db, "u1", "bad news later")
+
+    results = asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+
+    assert results == {("u1", TODAY): True}
+    [row] = day_emotions(db, "u1")
+    assert row["entry_id"] == last_id
+    assert row["happy"] > 0 and row["sad"] > 0
+
+def test_new_turn_only_scores_the_new_entry(db, analyzer):
+    add_entry(db, "u1", "first turn")
+    add_entry(db, "u1", "second turn")
+    asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+    calls = len(analyzer.model.prompts)
+
+    add_entry(db, "u1", "third turn")
+    asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+
+    assert len(analyzer.model.prompts) == calls + 1
+    assert "third turn" in analyzer.model.prompts[-1]
+    assert len(day_emotions(db, "u1")) == 1
+
+def test_api_failure_keeps_existing_record(db, analyzer):
+    add_entry(db, "u1", "first turn")
+    asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+    [saved] = day_emotions(db, "u1")
+    saved = dict(saved)
+
+    add_entry(db, "u1", "second turn")
+    analyzer.model.fail = True
+    results = asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+
+    assert results == {("u1", TODAY): False}
+    assert day_emotions(db, "u1") == [saved]
+
+def test_api_failure_saves_nothing_for_new_day(db, analyzer):
+    add_entry(db, "u1", "only turn")
+    analyzer.model.fail = True
+
+    results = asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+
+    assert results == {("u1", TODAY): False}
+    assert day_emotions(db, "u1") == []
+
+def test_batch_leaves_out_conversations_that_failed(analyzer):
+    analyzer.model.fail = True
+    assert asyncio.run(analyzer.analyze_emotions_batch({"a": "User: hi", "b": "User: there"})) == {}
+
+class StubAnalyzer:
+    def __init__(self, outcome: bool):
+        self.outcome = outcome
+        self.calls = []
+
+    async def analyze_entries_by_day(self, user_days):
+        self.calls.append(list(user_days))
+        return {day: self.outcome for day in user_days}
+
+def make_queue(monkeypatch, outcome: bool) -> EntryAnalysisQueue:
+    monkeypatch.setattr(entry_analysis, "ENTRY_ANALYSIS_DELAY", 0)
+    queue = EntryAnalysisQueue()
+    queue.analyzer = StubAnalyzer(outcome)
+    return queue
+
+def test_rapid_writes_coalesce_into_one_job(monkeypatch):
+    queue = make_queue(monkeypatch, True)
+    for _ in range(3):
+        queue.enqueue("u1", TODAY)
+    queue.enqueue("u2", TODAY)
+
+    asyncio.run(queue.process_due())
+
+    assert sorted(queue.analyzer.calls[0]) == [("u1", TODAY), ("u2", TODAY)]
+    assert queue.stats()["pending"] == 0
+
+def test_writes_push_back_due_time_up_to_max_delay(monkeypatch):
+    monkeypatch.setattr(entry_analysis, "ENTRY_ANALYSIS_MAX_DELAY", 100)
+    monkeypatch.setattr(entry_analysis.time, "monotonic", lambda: clock[0])
+    queue = EntryAnalysisQueue()
+    clock = [0.0]
+    queue.enqueue("u1", TODAY)
+    clock[0] = 90.0
+    queue.enqueue("u1", TODAY)
+
+    assert queue._pending[("u1", TODAY)] == (0.0, 100.0)
+
+def test_failed_day_is_retried_with_backoff(monkeypatch):
+    queue = make_queue(monkeypatch, False)
+    queue.enqueue("u1", TODAY)
+
+    wait = asyncio.run(queue.process_due())
+
+    assert queue.is_pending("u1", TODAY)
+    assert wait > 0
+    assert queue.stats()["retried"] == 1
+
+def test_failed_day_is_dropped_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(entry_analysis, "ENTRY_ANALYSIS_RETRY_DELAY", 0)
+    monkeypatch.setattr(entry_analysis, "ENTRY_ANALYSIS_MAX_ATTEMPTS", 3)
+    queue = make_queue(monkeypatch, False)
+    queue.enqueue("u1", TODAY)
+
+    for _ in range(5):
+        asyncio.run(queue.process_due())
+
+    assert len(queue.analyzer.calls) == 3
+    assert not queue.is_pending("u1", TODAY)
+
+def test_day_without_entries_loses_its_record(db, analyzer):
+    entry_id = add_entry(db, "u1", "only turn")
+    asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+    assert len(db.tables["daily_mood_rollup"]) == 1
+    db.tables["journal_entry"] = [row for row in db.tables["journal_entry"] if row["entry_id"] != entry_id]
+
+    results = asyncio.run(analyzer.analyze_entries_by_day([("u1", TODAY)]))
+
+    assert results == {("u1", TODAY): True}
+    assert day_emotions(db, "u1") == []
+    assert db.tables["daily_mood_rollup"] == []
@@ -0,0 +1,24 @@
+from datetime import date, timedelta
+
+import orjson
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services import history_export
+from backend.tests.fakes import add_entry, scores
+
+def test_export_spans_several_pages_of_each_table(db, monkeypatch):
+    monkeypatch.setattr(history_export, "EXPORT_CHUNK_SIZE", 3)
+    db.insert_rows("user", {"user_id": "u1"})
+    first = date(2026, 3, 1)
+    for day in range(7):
+        journal_date = first + timedelta(days=day)
+        entry_id = add_entry(db, "u1", f"day {day}", journal_date)
+        db.insert_rows("emotions", {"user_id": "u1", "journal_date": journal_date.isoformat(), "entry_id": entry_id, **scores(happy=day)})
+
+    response = TestClient(app).get("/users/u1/export")
+
+    assert response.status_code == 200
+    records = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [record["entry_text"] for record in records] == [f"day {day}" for day in range(7)]
+    assert [record["emotions"]["happy"] for record in records] == list(range(7))
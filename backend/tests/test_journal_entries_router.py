@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.data_version import data_version_service
+from backend.tasks.entry_analysis import entry_analysis_queue
+from backend.tests.fakes import TODAY, add_entry
+
+YESTERDAY = date(2026, 3, 13)
+
+@pytest.fixture
+def api(db, monkeypatch):
+    monkeypatch.setattr(entry_analysis_queue, "_pending", {})
+    # No lifespan: the schedulers stay off
+    return TestClient(app)
+
+@pytest.fixture
+def bumps(monkeypatch):
+    """Users whose journal token was replaced, one item per bump"""
+    users = []
+    bump = data_version_service.bump
+    monkeypatch.setattr(data_version_service, "bump", lambda user_id, column: users.append(str(user_id)) or bump(user_id, column))
+    return users
+
+def entry_payload(user_id: str, text: str, journal_date: date) -> dict:
+    return {"user_id": user_id, "entry_text": text, "AI_response": "ok", "journal_date": journal_date.isoformat()}
+
+def test_create_queues_the_entry_day(api):
+    assert api.post("/journal-entries/", json=entry_payload("u1", "hello", TODAY)).status_code == 200
+    assert entry_analysis_queue.is_pending("u1", TODAY)
+
+def test_update_queues_the_old_and_new_day(api, db):
+    entry_id = add_entry(db, "u1", "misdated", YESTERDAY)
+
+    response = api.put(f"/journal-entries/{entry_id}", json=entry_payload("u1", "misdated", TODAY))
+
+    assert response.status_code == 200
+    assert entry_analysis_queue.is_pending("u1", YESTERDAY)
+    assert entry_analysis_queue.is_pending("u1", TODAY)
+
+def test_delete_queues_the_entry_day(api, db):
+    entry_id = add_entry(db, "u1", "oops", YESTERDAY)
+
+    assert api.delete(f"/journal-entries/{entry_id}").status_code == 200
+    assert entry_analysis_queue.is_pending("u1", YESTERDAY)
+
+def test_each_write_replaces_each_owners_token_once(api, db, bumps):
+    entry_id = add_entry(db, "u1", "hello", YESTERDAY)
+
+    api.put(f"/journal-entries/{entry_id}", json=entry_payload("u1", "edited", YESTERDAY))
+    assert bumps == ["u1"]
+
+    api.put(f"/journal-entries/{entry_id}", json=entry_payload("u2", "edited", YESTERDAY))
+    assert sorted(bumps[1:]) == ["u1", "u2"]
+
+    api.delete(f"/journal-entries/{entry_id}")
+    assert bumps[3:] == ["u2"]
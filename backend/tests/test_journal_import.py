@@ -0,0 +1,41 @@
+from backend.services.journals_service import journals_service
+
+def entries(count: int, user_id: str = "u1") -> list:
+    return [
+        {"user_id": user_id, "entry_text": f"entry {i}", "AI_response": "ok", "journal_date": "2026-03-14", "episode_flag": 0}
+        for i in range(count)
+    ]
+
+def test_chunks_are_inserted_in_order(db):
+    created, errors = journals_service.create_journal_entries(entries(5), chunk_size=2)
+
+    assert errors == {}
+    assert [row["entry_text"] for row in created] == [f"entry {i}" for i in range(5)]
+    assert len(db.tables["journal_entry"]) == 5
+
+def test_rejected_chunk_falls_back_to_single_rows(db, monkeypatch):
+    original = db.insert_rows
+
+    def reject_lists_and_bad_rows(table, payload):
+        if isinstance(payload, list) or payload["entry_text"] == "entry 1":
+            raise Exception("violates check constraint")
+        return original(table, payload)
+
+    monkeypatch.setattr(db, "insert_rows", reject_lists_and_bad_rows)
+    created, errors = journals_service.create_journal_entries(entries(3))
+
+    assert list(errors) == [1]
+    assert created[1] is None
+    assert [row["entry_text"] for row in (created[0], created[2])] == ["entry 0", "entry 2"]
+    assert len(db.tables["journal_entry"]) == 2
+
+def test_short_chunk_result_is_reported_without_reinserting(db, monkeypatch):
+    original = db.insert_rows
+    monkeypatch.setattr(db, "insert_rows", lambda table, payload: original(table, payload)[:-1])
+
+    created, errors = journals_service.create_journal_entries(entries(3))
+
+    assert sorted(errors) == [0, 1, 2]
+    assert created == [None, None, None]
+    # The chunk was written once; retrying row by row would have duplicated it
+    assert len(db.tables["journal_entry"]) == 3
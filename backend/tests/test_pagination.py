@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.emotions_service import emotions_service
+from backend.services.journals_service import journals_service
+from backend.services.pagination import (
+    InvalidCursor, NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, encode_cursor, page_size, split_page
+)
+from backend.tests.fakes import add_entry, scores
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"journal_date": "2026-03-14", "entry_id": 7}, ("journal_date", "entry_id"))
+    assert "=" not in cursor
+    assert decode_cursor(cursor, ("journal_date", "entry_id")) == ["2026-03-14", 7]
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor({"a": 1}, ("a",)), encode_cursor({"a": 1}, ("a", "b")), "e30"])
+def test_foreign_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, ("a", "b"))
+
+def test_page_size_is_clamped(monkeypatch):
+    assert page_size(None) == 100
+    assert page_size(5) == 5
+    assert page_size(10 ** 6) == 1000
+
+def test_split_page_only_returns_cursor_when_more_rows_exist():
+    rows = [{"id": i} for i in range(3)]
+    assert split_page(rows, 3, ("id",)) == (rows, None)
+    page, cursor = split_page(rows, 2, ("id",))
+    assert page == rows[:2] and decode_cursor(cursor, ("id",)) == [1]
+
+class RecordingQuery:
+    def __init__(self):
+        self.calls = []
+
+    def or_(self, filters):
+        self.calls.append(("or_", filters))
+        return self
+
+    def filter(self, column, op, criteria):
+        self.calls.append(("filter", column, op, criteria))
+        return self
+
+def test_apply_keyset_expands_compound_keys_through_or():
+    query = apply_keyset(RecordingQuery(), ("journal_date", "entry_id"), ["2026-03-14", 7], descending=True)
+    assert query.calls == [("or_", 'journal_date.lt."2026-03-14",and(journal_date.eq."2026-03-14",entry_id.lt."7")')]
+
+def test_apply_keyset_uses_a_plain_filter_for_one_key():
+    assert apply_keyset(RecordingQuery(), ("user_id",), ["u9"]).calls == [("filter", "user_id", "gt", "u9")]
+
+def all_pages(fetch, **kwargs):
+    rows, cursor = fetch(limit=2, **kwargs)
+    while cursor:
+        page, cursor = fetch(limit=2, cursor=cursor, **kwargs)
+        rows += page
+    return rows
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_emotion_pages_do_not_skip_records_sharing_date_and_entry(db, descending):
+    # Re-analysis of the same entry used to leave several records with equal (journal_date, entry_id)
+    for happy in range(5):
+        db.insert_rows("emotions", {"user_id": "u1", "journal_date": "2026-03-14", "entry_id": 1, **scores(happy=happy)})
+    db.insert_rows("emotions", {"user_id": "u1", "journal_date": "2026-03-13", "entry_id": 0, **scores()})
+
+    rows = all_pages(emotions_service.get_emotions_page, user_id="u1", descending=descending)
+
+    assert len(rows) == 6
+    assert len({row["id"] for row in rows}) == 6
+
+def test_journal_pages_cover_every_entry_once(db):
+    ids = [add_entry(db, "u1", f"entry {i}") for i in range(5)]
+    rows = all_pages(journals_service.get_journal_entries_page, user_id="u1")
+    assert sorted(row["entry_id"] for row in rows) == ids
+
+def test_list_endpoint_sends_next_cursor_and_rejects_foreign_ones(db):
+    for i in range(3):
+        add_entry(db, "u1", f"entry {i}")
+    api = TestClient(app)
+
+    first = api.get("/journal-entries/", params={"user_id": "u1", "limit": 2})
+    assert first.status_code == 200 and len(first.json()) == 2
+    second = api.get("/journal-entries/", params={"user_id": "u1", "limit": 2, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert len(second.json()) == 1 and NEXT_CURSOR_HEADER not in second.headers
+
+    assert api.get("/journal-entries/", params={"user_id": "u1", "cursor": "garbage"}).status_code == 400
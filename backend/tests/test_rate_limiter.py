@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from backend.services import rate_limiter
+from backend.services.rate_limiter import RateLimiter, TokenBucket, estimate_tokens
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time.monotonic for the limiter; asyncio.sleep advances it instead of waiting"""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", sleep)
+    return now, sleeps
+
+def test_estimate_tokens_counts_prompt_and_expected_output():
+    assert estimate_tokens("x" * 40) == 11
+    assert estimate_tokens("x" * 40, 60) == 71
+
+def test_bucket_starts_full_and_refills_continuously(clock):
+    now, _ = clock
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0
+
+    bucket.level = 0
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    now[0] += 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    now[0] += 600
+    bucket.refill()
+    assert bucket.level == 60
+
+def test_amounts_above_capacity_wait_for_a_full_bucket(clock):
+    bucket = TokenBucket(60)
+    bucket.level = 30
+    assert bucket.wait_time(1000) == pytest.approx(30.0)
+
+def test_limiter_waits_once_the_request_quota_is_used(clock):
+    _, sleeps = clock
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000)
+
+    async def three_calls():
+        for _ in range(3):
+            await limiter.acquire(10)
+
+    asyncio.run(three_calls())
+
+    assert sleeps == [pytest.approx(30.0)]
+    assert limiter.acquired == 3
+    assert limiter.stats()["total_wait_seconds"] == 30.0
+
+def test_limiter_waits_for_tokens_of_a_large_prompt(clock):
+    _, sleeps = clock
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=600)
+
+    async def calls():
+        await limiter.acquire(600)
+        await limiter.acquire(300)
+
+    asyncio.run(calls())
+
+    assert sum(sleeps) == pytest.approx(30.0)
+
+def test_settle_charges_or_refunds_the_estimate_difference(clock):
+    limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000)
+    asyncio.run(limiter.acquire(100))
+
+    limiter.settle(100, 250)
+    assert limiter.tokens.level == 750
+    limiter.settle(100, 40)
+    assert limiter.tokens.level == 810
+    limiter.settle(100, None)
+    assert limiter.tokens.level == 810
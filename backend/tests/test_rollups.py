@@ -0,0 +1,150 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.fake_supabase import FakeQuery
+from backend.main import app
+from backend.services import base_service
+from backend.services.dashboard_context import DashboardContext, load_dashboard_contexts
+from backend.services.emotions_service import emotions_service
+from backend.services.mood_analytics import EmotionMatrix
+from backend.services.rollup_service import build_rollup_rows, rollup_service
+from backend.tasks.rollup_backfill import get_users_with_emotions
+from backend.tests.fakes import TODAY, add_entry, scores
+
+def emotion_row(user_id: str, journal_date: str, entry_id: int, **overrides) -> dict:
+    return {"user_id": user_id, "journal_date": journal_date, "entry_id": entry_id, **scores(**overrides)}
+
+@pytest.fixture
+def failing_rollups(db, monkeypatch):
+    """Make every daily_mood_rollup upsert fail until the returned switch is turned off"""
+    original = db.upsert_rows
+    failing = [True]
+
+    def upsert_rows(table, payload, on_conflict):
+        if table == "daily_mood_rollup" and failing[0]:
+            raise Exception("connection reset")
+        return original(table, payload, on_conflict)
+
+    monkeypatch.setattr(db, "upsert_rows", upsert_rows)
+    monkeypatch.setattr(rollup_service, "_failed", {})
+    return failing
+
+@pytest.fixture
+def max_rows(monkeypatch):
+    """Cap every select at PAGE_SIZE rows, like PostgREST's max-rows setting"""
+    original = FakeQuery.execute
+
+    def execute(self):
+        response = original(self)
+        if self._op == "select":
+            response.data = response.data[:base_service.PAGE_SIZE]
+        return response
+
+    monkeypatch.setattr(FakeQuery, "execute", execute)
+
+def history(user_id: str, days: int, start: date = date(2020, 1, 1)) -> list:
+    return [emotion_row(user_id, (start + timedelta(days=i)).isoformat(), i, happy=i % 10) for i in range(days)]
+
+def test_build_rollup_rows_keeps_last_row_per_day_in_date_order():
+    rows = build_rollup_rows([
+        emotion_row("u1", "2026-03-14", 3, sad=8),
+        emotion_row("u1", "2026-03-13T00:00:00", 1, happy=9),
+        emotion_row("u1", "2026-03-14", 4, happy=6, stressed=2)
+    ])
+
+    assert [(row["journal_date"], row["entry_id"]) for row in rows] == [("2026-03-13", 1), ("2026-03-14", 4)]
+    assert rows[1]["happy"] == 6 and rows[1]["sad"] == 0
+    assert rows[1]["dominant_emotion"] and rows[1]["positive"] > 0
+
+def test_build_rollup_rows_of_nothing_is_empty():
+    assert build_rollup_rows([]) == []
+
+def test_dashboard_reads_emotions_when_user_has_no_rollups(db):
+    db.insert_rows("emotions", emotion_row("u1", TODAY.isoformat(), 1, happy=7))
+
+    ctx = asyncio.run(DashboardContext("u1", 7, TODAY).load())
+
+    assert [row["happy"] for row in ctx.emotions] == [7]
+
+def test_batch_dashboard_reads_emotions_for_users_without_rollups(db):
+    today = date.today().isoformat()
+    db.insert_rows("emotions", emotion_row("u1", today, 1, happy=7))
+    rollup_service.upsert_from_emotions([emotion_row("u2", today, 2, sad=4)])
+
+    contexts = asyncio.run(load_dashboard_contexts(["u1", "u2"], 7))
+
+    assert [row["happy"] for row in contexts["u1"].emotions] == [7]
+    assert [row["sad"] for row in contexts["u2"].emotions] == [4]
+
+def test_failed_rollup_write_is_queued_and_read_around(db, failing_rollups):
+    emotions_service.upsert_daily_emotion(emotion_row("u1", TODAY.isoformat(), 1, happy=7))
+
+    assert db.tables["daily_mood_rollup"] == []
+    assert rollup_service.has_failed("u1")
+    ctx = asyncio.run(DashboardContext("u1", 7, TODAY).load())
+    assert [row["happy"] for row in ctx.emotions] == [7]
+
+def test_failed_rollup_write_is_repaired(db, failing_rollups):
+    emotions_service.upsert_daily_emotion(emotion_row("u1", TODAY.isoformat(), 1, happy=7))
+    assert rollup_service.repair_failed() == 1
+
+    failing_rollups[0] = False
+
+    assert rollup_service.repair_failed() == 0
+    assert not rollup_service.has_failed("u1")
+    assert [row["happy"] for row in db.tables["daily_mood_rollup"]] == [7]
+
+def test_stored_mood_score_and_dominant_emotion_are_read_back():
+    rows = build_rollup_rows([emotion_row("u1", "2026-03-13", 1, happy=9), emotion_row("u1", "2026-03-14", 2, sad=8)])
+    assert "journaled" not in rows[0]
+
+    stored = EmotionMatrix.from_rows([{**row, "mood_score": 1.5, "dominant_emotion": "angry"} for row in rows])
+    derived = EmotionMatrix.from_rows([emotion_row("u1", "2026-03-13", 1, happy=9), emotion_row("u1", "2026-03-14", 2, sad=8)])
+
+    assert stored.mood_scores().tolist() == [1.5, 1.5] and stored.slice(1, 2).dominant_emotions() == ["angry"]
+    assert EmotionMatrix.from_rows(rows).mood_scores().tolist() == derived.mood_scores().tolist()
+    assert EmotionMatrix.from_rows(rows).dominant_emotions() == derived.dominant_emotions() == ["happy", "sad"]
+
+def test_reads_and_rebuilds_are_not_truncated_at_the_row_cap(db, max_rows):
+    days = base_service.PAGE_SIZE + 200
+    for row in history("u1", days):
+        db.insert_rows("emotions", row)
+    db.insert_rows("emotions", emotion_row("u2", "2020-01-01", 0))
+
+    assert rollup_service.rebuild_user("u1") == days
+    assert len(rollup_service.get_rollups_by_user("u1", projection="analytics")) == days
+    assert get_users_with_emotions() == ["u1", "u2"]
+
+def test_summary_reads_emotions_when_user_has_no_rollups(db):
+    for row in history("u1", 3):
+        db.insert_rows("emotions", row)
+    api = TestClient(app)
+
+    rows = api.get("/emotions/summary/u1", params={"end_date": "2020-01-02"}).json()
+    buckets = api.get("/emotions/summary/u1", params={"bucket": "month"}).json()
+
+    assert [(row["journal_date"], row["happy"]) for row in rows] == [("2020-01-01", 0), ("2020-01-02", 1)]
+    assert rows[1]["dominant_emotion"] == "happy"
+    assert buckets[0]["count"] == 3
+
+def test_summary_reads_around_a_failed_rollup_write(db, failing_rollups):
+    failing_rollups[0] = False
+    rollup_service.upsert_from_emotions([emotion_row("u1", "2020-01-01", 1, happy=2)])
+    failing_rollups[0] = True
+    emotions_service.upsert_daily_emotion(emotion_row("u1", "2020-01-01", 1, happy=8))
+
+    rows = TestClient(app).get("/emotions/summary/u1").json()
+
+    assert [row["happy"] for row in rows] == [8]
+
+def test_similar_days_reads_emotions_when_user_has_no_rollups(db):
+    add_entry(db, "similar-u1", "long run along the river", date(2026, 3, 1))
+    add_entry(db, "similar-u1", "river run in the rain", date(2026, 3, 3))
+    db.insert_rows("emotions", emotion_row("similar-u1", "2026-03-01", 1, happy=6))
+
+    days = TestClient(app).get("/emotions/similar/similar-u1", params={"date": "2026-03-03"}).json()["similar_days"]
+
+    assert days[0]["date"] == "2026-03-01" and days[0]["emotions"]["happy"] == 6
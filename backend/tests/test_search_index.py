@@ -0,0 +1,106 @@
+import pytest
+
+from backend.services import search_index
+from backend.services.data_version import data_version_service
+from backend.services.journals_service import journals_service
+from backend.services.search_index import JournalSearchIndex, UserIndex, tokenize
+from backend.tests.fakes import add_entry
+
+def entry(entry_id: int, text: str, journal_date: str = "2026-03-14", user_id: str = "u1") -> dict:
+    return {"entry_id": entry_id, "user_id": user_id, "journal_date": journal_date, "entry_text": text, "AI_response": ""}
+
+def test_tokenize_drops_stopwords_and_single_characters():
+    assert tokenize("I walked to the Park, a LONG walk!") == ["walked", "park", "long", "walk"]
+    assert tokenize(None) == []
+
+def test_bm25_ranks_rarer_and_more_frequent_terms_higher():
+    index = UserIndex()
+    index.add(entry(1, "work work work meeting"))
+    index.add(entry(2, "work lunch"))
+    index.add(entry(3, "beach holiday"))
+    index.add(entry(4, "work and beach"))
+
+    # Equal scores put the newer entry first
+    assert [entry_id for _, entry_id, _ in index.search(["work"])] == [1, 4, 2]
+    # "holiday" appears once in the history, so it outweighs the common "work"
+    assert index.search(["holiday", "work"])[0][1] == 3
+
+def test_search_filters_by_date_and_forgets_removed_entries():
+    index = UserIndex()
+    index.add(entry(1, "garden", "2026-03-01"))
+    index.add(entry(2, "garden", "2026-03-10"))
+
+    assert [hit[1] for hit in index.search(["garden"], start_date="2026-03-05")] == [2]
+    index.remove(2)
+    assert [hit[1] for hit in index.search(["garden"])] == [1]
+    assert "garden" in index.postings and index.total_length == 1
+
+class Loader:
+    def __init__(self, entries):
+        self.entries = entries
+        self.calls = 0
+
+    def __call__(self, user_id):
+        self.calls += 1
+        return list(self.entries)
+
+def test_index_is_built_once_and_updated_in_place():
+    index = JournalSearchIndex()
+    load = Loader([entry(1, "garden")])
+
+    assert [hit[1] for hit in index.search("u1", "garden", load, data_version="v1")] == [1]
+    index.index_entries([entry(2, "garden party")], {"u1": "v2"})
+
+    assert [hit[1] for hit in index.search("u1", "garden", load, data_version="v2")] == [1, 2]
+    assert load.calls == 1
+
+def test_index_is_rebuilt_when_another_worker_wrote():
+    index = JournalSearchIndex()
+    load = Loader([entry(1, "garden")])
+    index.search("u1", "garden", load, data_version="v1")
+
+    load.entries.append(entry(2, "garden"))
+    assert len(index.search("u1", "garden", load, data_version="v2")) == 2
+    assert load.calls == 2
+
+def test_index_is_rebuilt_after_ttl(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(search_index.time, "monotonic", lambda: clock[0])
+    index = JournalSearchIndex(ttl_seconds=60)
+    load = Loader([entry(1, "garden")])
+    index.search("u1", "garden", load)
+
+    clock[0] = 30.0
+    index.search("u1", "garden", load)
+    assert load.calls == 1
+    clock[0] = 61.0
+    index.search("u1", "garden", load)
+    assert load.calls == 2
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    from backend.services import journals_service as module
+    index = JournalSearchIndex()
+    monkeypatch.setattr(module, "journal_search_index", index)
+    return index
+
+def test_service_search_sees_writes_from_other_workers(db, fresh_index):
+    add_entry(db, "u1", "walked in the garden")
+    assert len(journals_service.search_journal_entries("u1", "garden")[0]) == 1
+
+    # Another worker inserts an entry and moves the user's write token
+    add_entry(db, "u1", "garden again")
+    data_version_service.bump("u1", "journal_version")
+
+    assert len(journals_service.search_journal_entries("u1", "garden")[0]) == 2
+
+def test_service_writes_keep_the_index_current_without_rebuilding(db, fresh_index, monkeypatch):
+    journals_service.create_journal_entry({"user_id": "u1", "entry_text": "garden", "AI_response": "", "journal_date": "2026-03-14"})
+    journals_service.search_journal_entries("u1", "garden")
+    loads = []
+    monkeypatch.setattr(journals_service, "get_search_documents", lambda user_id: loads.append(user_id) or [])
+
+    journals_service.create_journal_entry({"user_id": "u1", "entry_text": "garden shed", "AI_response": "", "journal_date": "2026-03-15"})
+
+    assert len(journals_service.search_journal_entries("u1", "garden")[0]) == 2
+    assert loads == []
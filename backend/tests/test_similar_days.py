@@ -0,0 +1,95 @@
+import pytest
+
+from backend.services.similar_days import SimilarDaysIndex, UserDayMatrix, day_terms, group_by_day
+
+def entry(entry_id: int, journal_date: str, text: str, user_id: str = "u1") -> dict:
+    return {"entry_id": entry_id, "user_id": user_id, "journal_date": journal_date, "entry_text": text, "AI_response": "noted"}
+
+class Loader:
+    """load_entries stand-in over a list of entries, recording the dates asked for"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, user_id, dates=None):
+        self.calls.append(dates)
+        if self.fail:
+            raise Exception("connection reset")
+        return [e for e in self.entries if dates is None or e["journal_date"] in dates]
+
+HISTORY = [
+    entry(1, "2026-03-01", "long run along the river"),
+    entry(2, "2026-03-02", "exam stress and revision"),
+    entry(3, "2026-03-03", "river run in the rain"),
+    entry(4, "2026-03-04", "quiet day")
+]
+
+def test_day_terms_leave_out_speaker_labels():
+    terms = day_terms([entry(1, "2026-03-01", "river run")])
+    assert terms["river"] == 1 and "user" not in terms and "ai" not in terms
+
+def test_group_by_day_keeps_entry_order():
+    days = group_by_day([entry(1, "2026-03-01", "a"), entry(2, "2026-03-02", "b"), entry(3, "2026-03-01", "c")])
+    assert [e["entry_id"] for e in days["2026-03-01"]] == [1, 3]
+
+def test_most_similar_earlier_day_ranks_first():
+    matrix = UserDayMatrix()
+    for day, entries in group_by_day(HISTORY).items():
+        matrix.set_day(day, entries)
+
+    matches = matrix.similar("2026-03-03", 5)
+
+    assert matches[0][0] == "2026-03-01"
+    assert "2026-03-04" not in [day for day, _ in matches]
+    assert matrix.similar("2026-03-01", 5) == []
+
+def test_writes_refresh_only_their_days():
+    index = SimilarDaysIndex()
+    load = Loader(list(HISTORY))
+    index.similar_days("u1", "2026-03-03", 5, load)
+
+    load.entries.append(entry(5, "2026-03-04", "river run at dawn"))
+    index.mark_entries([load.entries[-1]])
+    matches = index.similar_days("u1", "2026-03-04", 5, load)
+
+    assert load.calls == [None, ["2026-03-04"]]
+    assert matches[0][0] in ("2026-03-01", "2026-03-03")
+
+def test_failed_refresh_keeps_days_stale():
+    index = SimilarDaysIndex()
+    load = Loader(list(HISTORY))
+    index.similar_days("u1", "2026-03-03", 5, load)
+    load.entries.append(entry(5, "2026-03-04", "river run at dawn"))
+    index.mark_entries([load.entries[-1]])
+
+    load.fail = True
+    with pytest.raises(Exception):
+        index.similar_days("u1", "2026-03-04", 5, load)
+    load.fail = False
+
+    assert index.similar_days("u1", "2026-03-04", 5, load)[0][0] in ("2026-03-01", "2026-03-03")
+    assert load.calls[-1] == ["2026-03-04"]
+
+def test_matrix_is_rebuilt_when_another_worker_wrote():
+    index = SimilarDaysIndex()
+    load = Loader(list(HISTORY))
+    index.similar_days("u1", "2026-03-03", 5, load, data_version="v1")
+
+    load.entries.append(entry(5, "2026-03-05", "river run again"))
+    matches = index.similar_days("u1", "2026-03-05", 5, load, data_version="v2")
+
+    assert load.calls == [None, None]
+    assert matches
+
+def test_local_writes_keep_the_matrix_without_rebuilding():
+    index = SimilarDaysIndex()
+    load = Loader(list(HISTORY))
+    index.similar_days("u1", "2026-03-03", 5, load, data_version="v1")
+
+    load.entries.append(entry(5, "2026-03-05", "river run again"))
+    index.mark_entries([load.entries[-1]], {"u1": "v2"})
+    index.similar_days("u1", "2026-03-05", 5, load, data_version="v2")
+
+    assert load.calls == [None, ["2026-03-05"]]
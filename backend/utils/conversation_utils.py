@@ -0,0 +1,9 @@
+from typing import Dict, Any, Iterable
+
+def format_conversation(entries: Iterable[Dict[str, Any]]) -> str:
+    """Combine a day's journal entries (oldest first) into the conversation text the analyzer reads"""
+    conversation_text = ""
+    for entry in entries:
+        conversation_text += f"User: {entry['entry_text']}\n"
+        conversation_text += f"AI: {entry['AI_response']}\n"
+    return conversation_text